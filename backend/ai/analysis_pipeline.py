@@ -0,0 +1,223 @@
+"""Async LLM analysis pipeline used by the API.
+
+- Cached results (llm_cache) are returned without touching the model, and
+  concurrent requests for the same text share one pending result.
+- Short articles are micro-batched: the dispatcher waits up to
+  LLM_BATCH_WINDOW_MS for up to LLM_BATCH_SIZE of them, sends them as one
+  chat completion and splits the JSON reply back per article.
+- At most LLM_CONCURRENCY model requests are in flight, and a token bucket
+  keeps the request rate under LLM_RATE_LIMIT_RPS (bursts of
+  LLM_RATE_LIMIT_BURST).
+- A caller waits at most LLM_TIMEOUT_SECONDS, then gets the heuristic score;
+  the model request keeps running and still fills the cache.
+"""
+import asyncio
+import json
+import time
+from config.config import settings
+from ai.event_processing import SYSTEM_PROMPT, analyze_text_heuristic, openai_available
+from ai.llm_cache import cache_key, llm_cache
+
+BATCH_SYSTEM_PROMPT = (
+    "You are a geopolitical risk analyst. The user message is a JSON object "
+    '{"articles": [{"id": ..., "text": ...}]}. Analyze each article for risks (sanctions, war, fraud). '
+    'Return JSON {"results": [{"id": ..., "risk_level": "LOW/MEDIUM/HIGH", "keywords": [...], "summary": ...}]} '
+    "with exactly one entry per article id."
+)
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, holding at most `capacity`."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class AnalysisPipeline:
+    def __init__(self, client=None, concurrency: int = None, batch_size: int = None,
+                 batch_window: float = None, batch_max_chars: int = None, timeout: float = None,
+                 rate: float = None, burst: int = None):
+        self.client = client
+        self.batch_size = batch_size or settings.LLM_BATCH_SIZE
+        self.batch_window = settings.LLM_BATCH_WINDOW_MS / 1000 if batch_window is None else batch_window
+        self.batch_max_chars = batch_max_chars or settings.LLM_BATCH_MAX_CHARS
+        self.timeout = timeout or settings.LLM_TIMEOUT_SECONDS
+        self.stats = {"requests": 0, "articles": 0, "cache_hits": 0, "fallbacks": 0}
+        self._semaphore = asyncio.Semaphore(concurrency or settings.LLM_CONCURRENCY)
+        self._bucket = TokenBucket(rate or settings.LLM_RATE_LIMIT_RPS, burst or settings.LLM_RATE_LIMIT_BURST)
+        self._queue = asyncio.Queue()
+        self._pending = {}   # cache_key -> future shared by identical requests
+        self._tasks = set()
+        self._dispatcher = None
+
+    def _get_client(self):
+        if self.client is None:
+            from openai import AsyncOpenAI
+            self.client = AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                base_url=settings.OPENAI_BASE_URL,
+                timeout=settings.OPENAI_TIMEOUT,
+                max_retries=0,  # the caller's deadline is short; fall back instead
+            )
+        return self.client
+
+    async def analyze(self, text: str):
+        key = cache_key(settings.OPENAI_MODEL, SYSTEM_PROMPT, text)
+        cached = await asyncio.to_thread(llm_cache.get, key)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            return cached
+
+        future = self._pending.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            # Nobody may be awaiting it any more when it fails (callers timed out)
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            self._pending[key] = future
+            self._queue.put_nowait((key, text, future))
+            self._ensure_dispatcher()
+
+        try:
+            # shield: a timed-out caller must not cancel the shared request
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except Exception as e:
+            reason = "timed out" if isinstance(e, asyncio.TimeoutError) else e
+            print(f"LLM analysis {reason}. Falling back to mock.")
+            self.stats["fallbacks"] += 1
+            return analyze_text_heuristic(text)
+
+    def _ensure_dispatcher(self):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch_loop())
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            if len(item[1]) > self.batch_max_chars:
+                self._spawn(self._send([item]))
+                continue
+            batch = [item]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if len(item[1]) > self.batch_max_chars:
+                    self._spawn(self._send([item]))
+                else:
+                    batch.append(item)
+            self._spawn(self._send(batch))
+
+    async def _send(self, batch):
+        try:
+            async with self._semaphore:
+                await self._bucket.acquire()
+                self.stats["requests"] += 1
+                self.stats["articles"] += len(batch)
+                if len(batch) == 1:
+                    results = [await self._complete(SYSTEM_PROMPT, batch[0][1])]
+                else:
+                    results = self._split(batch, await self._complete(
+                        BATCH_SYSTEM_PROMPT,
+                        json.dumps({"articles": [{"id": i, "text": text} for i, (_, text, _) in enumerate(batch)]}),
+                    ))
+        except Exception as e:
+            results = [e] * len(batch)
+
+        to_cache = []
+        for (key, _, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                self._pending.pop(key, None)
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+                to_cache.append((key, result))
+        if to_cache:
+            await asyncio.to_thread(self._store, to_cache)
+        # Resolved futures keep serving repeat requests until the rows are written
+        for key, _ in to_cache:
+            self._pending.pop(key, None)
+
+    @staticmethod
+    def _store(results):
+        for key, result in results:
+            llm_cache.put(key, settings.OPENAI_MODEL, result)
+
+    async def _complete(self, system_prompt: str, content: str):
+        response = await self._get_client().chat.completions.create(
+            model=settings.OPENAI_MODEL,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": content}
+            ],
+            response_format={ "type": "json_object" }
+        )
+        return json.loads(response.choices[0].message.content)
+
+    @staticmethod
+    def _split(batch, payload):
+        by_id = {}
+        for entry in payload.get("results", []):
+            if isinstance(entry, dict) and "id" in entry:
+                by_id[str(entry.pop("id"))] = entry
+        return [by_id.get(str(i)) or ValueError(f"Batched reply missing article {i}") for i in range(len(batch))]
+
+    async def close(self):
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+        for task in list(self._tasks):
+            task.cancel()
+        if self.client is not None:
+            await self.client.close()
+
+
+# Process-wide pipeline, bound to the event loop that created it
+_pipeline = None
+_pipeline_loop = None
+
+
+def get_pipeline():
+    global _pipeline, _pipeline_loop
+    loop = asyncio.get_running_loop()
+    if _pipeline is None or _pipeline_loop is not loop:
+        _pipeline, _pipeline_loop = AnalysisPipeline(), loop
+    return _pipeline
+
+
+async def close_pipeline():
+    global _pipeline
+    pipeline, _pipeline = _pipeline, None
+    if pipeline is not None:
+        await pipeline.close()
+
+
+async def process_text_for_events_async(text: str):
+    """Async counterpart of process_text_for_events for the API."""
+    if settings.OPENAI_API_KEY and openai_available():
+        return await get_pipeline().analyze(text)
+    return analyze_text_heuristic(text)
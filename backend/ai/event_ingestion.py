@@ -0,0 +1,234 @@
+"""Streaming ingestion of news / sanctions-feed events into geo_events.
+
+read_events -> dedup -> score (process_texts_for_events) -> bulk insert
+
+- Input is NDJSON or CSV with at least `title` and `country`; `timestamp`,
+  `type`, `severity`, `description` and `source` are optional.
+- Titles are normalized (case, punctuation, whitespace) and hashed with the
+  country. A two-generation Bloom filter remembers the last
+  INGEST_DEDUP_WINDOW hashes (warmed from the table at start), so repeats
+  are dropped before scoring. Bloom hits are confirmed against the table,
+  so a false positive never drops a new event.
+- Each batch of INGEST_BATCH_SIZE events is inserted with one executemany in
+  one transaction. The unique content_hash index catches repeats older than
+  the window.
+- With rescreen=True, severe new events re-screen the transactions they
+  affect (compliance.rescreening), once per country per batch.
+"""
+import csv
+import hashlib
+import json
+import math
+import re
+import time
+from datetime import datetime, timezone
+from itertools import islice
+from config.config import settings
+from database.database import db_connection
+from database.models import insert_geo_events
+from ai.event_processing import process_texts_for_events
+
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+# First matching keyword decides the event type when the feed does not give one
+_KEYWORD_TYPES = (
+    ("sanction", "sanctions"), ("embargo", "trade"), ("ban", "trade"),
+    ("war", "conflict"), ("laundering", "financial_crime"), ("fraud", "financial_crime"),
+    ("corruption", "financial_crime"), ("violation", "regulatory"),
+)
+
+
+def normalize_title(title: str) -> str:
+    return " ".join(_NON_WORD.sub(" ", title.casefold()).split())
+
+
+def content_hash(title: str, country: str) -> str:
+    key = f"{normalize_title(title)}|{country.strip().casefold()}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+class RecentBloomFilter:
+    """
+    Bloom filter over roughly the last `capacity` keys: two generations of
+    `capacity` keys each; when the current one fills up it replaces the
+    previous one, so old keys age out.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self._current = bytearray((self.bits + 7) // 8)
+        self._previous = bytearray(len(self._current))
+        self._count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    @staticmethod
+    def _test(bits, positions):
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in positions)
+
+    def __contains__(self, key: str):
+        positions = self._positions(key)
+        return self._test(self._current, positions) or self._test(self._previous, positions)
+
+    def add(self, key: str):
+        if self._count >= self.capacity:
+            self._previous, self._current = self._current, bytearray(len(self._current))
+            self._count = 0
+        for p in self._positions(key):
+            self._current[p >> 3] |= 1 << (p & 7)
+        self._count += 1
+
+
+def read_events(stream, fmt: str = "ndjson"):
+    """Yield event dicts from an NDJSON or CSV text stream."""
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            event = json.loads(line)
+        except json.JSONDecodeError:
+            yield None  # counted as invalid
+            continue
+        yield event if isinstance(event, dict) else None
+
+
+def _severity(analysis: dict) -> str:
+    level = str(analysis.get("risk_level", "LOW")).upper()
+    if level == "HIGH" and analysis.get("risk_score", 0) >= 80:
+        return "CRITICAL"
+    return level if level in ("LOW", "MEDIUM", "HIGH") else "LOW"
+
+
+def _event_type(analysis: dict) -> str:
+    keywords = [str(k).lower() for k in analysis.get("keywords") or []]
+    for keyword, event_type in _KEYWORD_TYPES:
+        if any(k.startswith(keyword) for k in keywords):
+            return event_type
+    return "news"
+
+
+class EventIngestor:
+    def __init__(self, batch_size: int = None, workers: int = 1, window: int = None, error_rate: float = None,
+                 rescreen: bool = False):
+        self.batch_size = batch_size or settings.INGEST_BATCH_SIZE
+        self.workers = workers
+        self.rescreen = rescreen
+        self.seen = RecentBloomFilter(window or settings.INGEST_DEDUP_WINDOW,
+                                      error_rate or settings.INGEST_BLOOM_ERROR_RATE)
+        self.stats = {"read": 0, "invalid": 0, "duplicates": 0, "inserted": 0, "rescreens": 0}
+        self._warm()
+
+    def _warm(self):
+        # Start from the most recent stored hashes so a restart does not re-score the feed
+        with db_connection() as conn:
+            rows = conn.execute(
+                "SELECT content_hash FROM geo_events WHERE content_hash IS NOT NULL ORDER BY id DESC LIMIT ?",
+                (self.seen.capacity,),
+            ).fetchall()
+        for row in reversed(rows):
+            self.seen.add(row[0])
+
+    def _dedup(self, batch):
+        """Drop invalid rows and repeats; returns the new events with content_hash set."""
+        fresh = {}
+        maybe_seen = []
+        for event in batch:
+            title = (event or {}).get("title") or ""
+            country = (event or {}).get("country") or ""
+            if not title.strip() or not country.strip():
+                self.stats["invalid"] += 1
+                continue
+            h = content_hash(title, country)
+            if h in fresh:
+                self.stats["duplicates"] += 1
+                continue
+            event["content_hash"] = h
+            if h in self.seen:
+                maybe_seen.append(h)
+            fresh[h] = event
+            self.seen.add(h)
+
+        if maybe_seen:
+            # Confirm Bloom hits so false positives are not dropped
+            with db_connection() as conn:
+                for i in range(0, len(maybe_seen), 500):
+                    chunk = maybe_seen[i:i + 500]
+                    rows = conn.execute(
+                        f"SELECT content_hash FROM geo_events WHERE content_hash IN ({','.join('?' * len(chunk))})",
+                        chunk,
+                    ).fetchall()
+                    for row in rows:
+                        fresh.pop(row[0], None)
+                        self.stats["duplicates"] += 1
+        return list(fresh.values())
+
+    def _score(self, events):
+        texts = [f"{e['title']}. {e.get('description') or ''}".strip() for e in events]
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        rows = []
+        for event, analysis in zip(events, process_texts_for_events(texts, workers=self.workers)):
+            rows.append({
+                "timestamp": event.get("timestamp") or now,
+                "type": event.get("type") or _event_type(analysis),
+                "severity": (event.get("severity") or _severity(analysis)).upper(),
+                "title": event["title"].strip(),
+                "description": event.get("description") or analysis.get("summary"),
+                "country": event["country"].strip(),
+                "affected_transactions": 0,
+                "source": event.get("source"),
+                "content_hash": event["content_hash"],
+            })
+        return rows
+
+    def _rescreen(self, rows):
+        from compliance.rescreening import rescreen_for_events
+        hashes = [r["content_hash"] for r in rows]
+        with db_connection() as conn:
+            stored = conn.execute(
+                f"SELECT id, country, severity, title FROM geo_events WHERE content_hash IN ({','.join('?' * len(hashes))})",
+                hashes,
+            ).fetchall()
+        self.stats["rescreens"] += len(rescreen_for_events([dict(r) for r in stored]))
+
+    def ingest(self, events, progress_every: float = None):
+        """Consume an iterable of event dicts; returns stats including events/s."""
+        events = iter(events)
+        start = time.perf_counter()
+        last_report = start
+        while True:
+            batch = list(islice(events, self.batch_size))
+            if not batch:
+                break
+            self.stats["read"] += len(batch)
+            fresh = self._dedup(batch)
+            if fresh:
+                rows = self._score(fresh)
+                with db_connection() as conn:
+                    inserted = insert_geo_events(conn, rows)
+                self.stats["inserted"] += inserted
+                self.stats["duplicates"] += len(rows) - inserted
+                if self.rescreen and inserted:
+                    self._rescreen(rows)
+            now = time.perf_counter()
+            if progress_every and now - last_report >= progress_every:
+                last_report = now
+                print(f"  {self.stats['read']} read, {self.stats['inserted']} inserted, "
+                      f"{self.stats['read'] / (now - start):.0f} events/s")
+        elapsed = time.perf_counter() - start
+        self.stats["seconds"] = round(elapsed, 3)
+        self.stats["events_per_second"] = round(self.stats["read"] / elapsed, 1) if elapsed else 0.0
+        return self.stats
+
+
+def ingest_events(events, **kwargs):
+    return EventIngestor(**kwargs).ingest(events)
@@ -1,45 +1,37 @@
 from config.config import settings
 import json
-try:
-    from openai import OpenAI
-except ImportError:
-    OpenAI = None
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from ai.keyword_scanner import default_scanner
+from ai.llm_cache import cache_key, llm_cache
 
-def process_text_for_events(text: str):
-    # Check if OpenAI Key is available
-    if settings.OPENAI_API_KEY and OpenAI:
-        try:
-            client = OpenAI(api_key=settings.OPENAI_API_KEY)
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a geopolitical risk analyst. Analyze the text for risks (sanctions, war, fraud). Return JSON with keys: risk_level (LOW/MEDIUM/HIGH), keywords (list), summary."},
-                    {"role": "user", "content": text}
-                ],
-                response_format={ "type": "json_object" }
-            )
-            content = response.choices[0].message.content
-            return json.loads(content)
-        except Exception as e:
-            print(f"OpenAI Error: {e}. Falling back to mock.")
-            
-    # Mock NLP processing (Fallback - But Strong/Technical)
-    # Using TextBlob for Sentiment Analysis & Keyword Density
+# TextBlob's default sentiment analyzer, built once per process
+_sentiment_analyzer = None
+
+def _sentiment(text: str):
+    global _sentiment_analyzer
     try:
-        from textblob import TextBlob
-        blob = TextBlob(text)
-        sentiment = blob.sentiment.polarity # -1.0 (Negative) to 1.0 (Positive)
-        subjectivity = blob.sentiment.subjectivity # 0.0 (Objective) to 1.0 (Subjective)
+        if _sentiment_analyzer is None:
+            from textblob.en.sentiments import PatternAnalyzer
+            _sentiment_analyzer = PatternAnalyzer()
+        result = _sentiment_analyzer.analyze(text)
+        return result.polarity, result.subjectivity # -1.0..1.0, 0.0..1.0
     except ImportError:
-        sentiment = 0.0
-        subjectivity = 0.0
+        return 0.0, 0.0
 
-    risk_keywords = ["sanction", "war", "embargo", "laundering", "fraud", "corruption", "violation", "ban"]
-    detected_keywords = [word for word in risk_keywords if word in text.lower()]
+def analyze_text_heuristic(text: str, scanner=None):
+    # Mock NLP processing (Fallback - But Strong/Technical)
+    # Sentiment Analysis (TextBlob) & single-pass Keyword Scan
+    sentiment, subjectivity = _sentiment(text)
+
+    scanner = scanner or default_scanner
+    detected_keywords = scanner.scan(text)
     
     # Heuristic Logic:
-    # 1. Base risk on keyword count
-    risk_score = len(detected_keywords) * 20 
+    # 1. Base risk on weighted keyword hits
+    risk_score = scanner.score(detected_keywords)
     
     # 2. Adjust for Sentiment (Negative sentiment increases risk)
     if sentiment < -0.1:
@@ -60,3 +52,101 @@ def process_text_for_events(text: str):
         "risk_score": min(risk_score, 100), # Technical Metric
         "summary": text[:100] + "..." if len(text) > 100 else text
     }
+
+SYSTEM_PROMPT = "You are a geopolitical risk analyst. Analyze the text for risks (sanctions, war, fraud). Return JSON with keys: risk_level (LOW/MEDIUM/HIGH), keywords (list), summary."
+
+def openai_available() -> bool:
+    # The SDK is imported on first use: it costs ~0.5 s and only the LLM path needs it
+    try:
+        import openai  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+# One client per process: reuses its HTTP connection pool across calls
+_openai_client = None
+_openai_lock = threading.Lock()
+
+def get_openai_client():
+    global _openai_client
+    if _openai_client is None:
+        with _openai_lock:
+            if _openai_client is None:
+                from openai import OpenAI
+                _openai_client = OpenAI(
+                    api_key=settings.OPENAI_API_KEY,
+                    base_url=settings.OPENAI_BASE_URL,
+                    timeout=settings.OPENAI_TIMEOUT,
+                )
+    return _openai_client
+
+def analyze_text_llm(text: str):
+    response = get_openai_client().chat.completions.create(
+        model=settings.OPENAI_MODEL,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": text}
+        ],
+        response_format={ "type": "json_object" }
+    )
+    content = response.choices[0].message.content
+    return json.loads(content)
+
+def process_text_for_events(text: str):
+    # Check if OpenAI Key is available
+    if settings.OPENAI_API_KEY and openai_available():
+        try:
+            key = cache_key(settings.OPENAI_MODEL, SYSTEM_PROMPT, text)
+            return llm_cache.get_or_compute(key, settings.OPENAI_MODEL, lambda: analyze_text_llm(text))
+        except Exception as e:
+            print(f"OpenAI Error: {e}. Falling back to mock.")
+            
+    return analyze_text_heuristic(text)
+
+# Scoring pools, one per worker count, reused across calls in this process
+_pools = {}
+_pools_pid = None
+_pools_lock = threading.Lock()
+
+def get_event_pool(workers: int):
+    global _pools, _pools_pid
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            _pools, _pools_pid = {}, os.getpid()  # a forked child cannot use its parent's pools
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ProcessPoolExecutor(max_workers=workers)
+        return pool
+
+def shutdown_event_pools():
+    global _pools
+    with _pools_lock:
+        if _pools_pid == os.getpid():
+            for pool in _pools.values():
+                pool.shutdown(wait=True)
+        _pools = {}
+
+def process_texts_for_events(texts, workers: int = None, chunksize: int = 64):
+    """
+    Batch/streaming version of process_text_for_events.
+    Consumes `texts` lazily in windows and spreads each window over a process
+    pool that later calls reuse; yields results in input order. workers=1, and
+    windows of at most EVENT_SCORING_INLINE_MAX texts, run inline.
+    """
+    workers = workers or os.cpu_count() or 1
+    texts = iter(texts)
+    if workers == 1:
+        for text in texts:
+            yield process_text_for_events(text)
+        return
+
+    window = workers * chunksize * 4  # bounded read-ahead for endless feeds
+    while True:
+        batch = list(islice(texts, window))
+        if not batch:
+            break
+        if len(batch) <= settings.EVENT_SCORING_INLINE_MAX:
+            # Cheaper to scan here than to ship the texts to the pool and back
+            yield from map(process_text_for_events, batch)
+        else:
+            yield from get_event_pool(workers).map(process_text_for_events, batch, chunksize=chunksize)
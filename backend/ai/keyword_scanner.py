@@ -0,0 +1,73 @@
+"""Single-pass risk keyword scanner.
+
+All keywords and their inflections are compiled into one case-insensitive
+alternation, so a document is scanned once regardless of how many keywords
+are configured. Matches are whole words, and each keyword only accepts the
+forms listed for it ("sanctions", "banned", "fraudulent"), so it never
+matches inside or as the start of another word ("bank", "warning",
+"warned", "wares").
+"""
+import re
+
+# keyword -> risk points per document it appears in
+DEFAULT_KEYWORD_WEIGHTS = {
+    "sanction": 20,
+    "war": 20,
+    "embargo": 20,
+    "laundering": 20,
+    "fraud": 20,
+    "corruption": 20,
+    "violation": 20,
+    "ban": 20,
+}
+
+# keyword -> other forms that count as the keyword; keywords not listed accept their plural
+DEFAULT_INFLECTIONS = {
+    "sanction": ["sanctions", "sanctioned", "sanctioning"],
+    "war": ["wars", "warring"],
+    "embargo": ["embargoes", "embargoed"],
+    "laundering": ["launder", "laundered"],
+    "fraud": ["frauds", "fraudulent"],
+    "corruption": ["corruptions"],
+    "violation": ["violations"],
+    "ban": ["bans", "banned", "banning"],
+}
+
+
+def _plural(keyword: str) -> str:
+    return keyword + ("es" if keyword.endswith(("s", "x", "z", "ch", "sh")) else "s")
+
+
+class KeywordScanner:
+    def __init__(self, weights: dict = None, inflections: dict = None):
+        self.weights = dict(weights or DEFAULT_KEYWORD_WEIGHTS)
+        inflections = DEFAULT_INFLECTIONS if inflections is None else inflections
+        # One named group per keyword: its stem, then the listed endings. Longest
+        # stems first so overlapping keywords prefer the most specific one
+        keywords = list(self.weights)
+        groups = []
+        initials = set()
+        for i, keyword in sorted(enumerate(keywords), key=lambda ik: len(ik[1]), reverse=True):
+            stem = keyword.lower()
+            forms = {f.lower() for f in inflections.get(keyword, [_plural(keyword)])}
+            endings = sorted({f[len(stem):] for f in forms if f.startswith(stem) and f != stem}, key=len, reverse=True)
+            alternatives = [re.escape(stem) + (f"(?:{'|'.join(map(re.escape, endings))})?" if endings else "")]
+            alternatives += [re.escape(f) for f in sorted(forms) if not f.startswith(stem)]
+            groups.append(f"(?P<k{i}>{'|'.join(alternatives)})")
+            initials.update(f[0] for f in forms | {stem})
+        # The first-letter lookahead lets most words fail before any group is tried
+        first = "".join(re.escape(c) for c in sorted(initials))
+        self.pattern = re.compile(rf"\b(?=[{first}])(?:{'|'.join(groups)})\b", re.IGNORECASE)
+        self._keywords = {f"k{i}": keyword for i, keyword in enumerate(keywords)}
+        self._order = {k: i for i, k in enumerate(self.weights)}
+
+    def scan(self, text: str):
+        """Distinct keywords found in `text`, in configuration order."""
+        found = {self._keywords[m.lastgroup] for m in self.pattern.finditer(text)}
+        return sorted(found, key=self._order.get)
+
+    def score(self, keywords) -> int:
+        return sum(self.weights[k] for k in keywords)
+
+
+default_scanner = KeywordScanner()
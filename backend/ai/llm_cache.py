@@ -0,0 +1,163 @@
+"""Persistent cache for LLM analysis results.
+
+Entries live in the llm_cache table, keyed by a SHA-256 of model + system
+prompt + article text, so every worker process shares them. Entries expire
+after LLM_CACHE_TTL_SECONDS; once the table grows past LLM_CACHE_MAX_ENTRIES
+the least recently used rows are evicted.
+
+Reads stay reads: a hit only records its recency in memory, and only when
+the row's last_used is older than LLM_CACHE_TOUCH_SECONDS. The recorded
+touches are written on the next put, or once LLM_CACHE_TOUCH_BATCH of them
+have built up. Eviction runs on the first put and then every
+LLM_CACHE_EVICT_EVERY puts, so the table can exceed the limit by that many
+rows in between.
+
+Concurrent calls for the same key are coalesced: the first caller runs the
+model request, the others wait for its result instead of sending their own.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from config.config import settings
+from database.database import db_connection
+
+
+def cache_key(model: str, prompt: str, text: str) -> str:
+    h = hashlib.sha256()
+    for part in (model, prompt, text):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class _InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class LLMResponseCache:
+    def __init__(self, ttl: float = None, max_entries: int = None, touch_interval: float = None,
+                 touch_batch: int = None, evict_every: int = None):
+        self.ttl = settings.LLM_CACHE_TTL_SECONDS if ttl is None else ttl
+        self.max_entries = max_entries or settings.LLM_CACHE_MAX_ENTRIES
+        self.touch_interval = settings.LLM_CACHE_TOUCH_SECONDS if touch_interval is None else touch_interval
+        self.touch_batch = touch_batch or settings.LLM_CACHE_TOUCH_BATCH
+        self.evict_every = evict_every or settings.LLM_CACHE_EVICT_EVERY
+        self._inflight = {}  # cache_key -> _InFlight
+        self._touched = {}   # cache_key -> last_used not yet written
+        self._puts = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """Cached result for `key`, or None when missing or expired."""
+        now = time.time()
+        try:
+            with db_connection() as conn:
+                row = conn.execute(
+                    "SELECT response, last_used FROM llm_cache WHERE cache_key = ? AND created_at > ?",
+                    (key, now - self.ttl),
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"LLM cache read error: {e}")
+            return None
+        if row is None:
+            return None
+        if now - (row["last_used"] or 0) >= self.touch_interval:
+            with self._lock:
+                self._touched[key] = now
+                flush = len(self._touched) >= self.touch_batch
+            if flush:
+                try:
+                    with db_connection() as conn:
+                        self._flush_touches(conn)
+                except sqlite3.Error as e:
+                    print(f"LLM cache write error: {e}")
+        return json.loads(row["response"])
+
+    def _flush_touches(self, conn):
+        with self._lock:
+            touched, self._touched = self._touched, {}
+        if touched:
+            conn.executemany(
+                "UPDATE llm_cache SET last_used = ? WHERE cache_key = ? AND last_used < ?",
+                [(used, key, used) for key, used in touched.items()],
+            )
+
+    def put(self, key: str, model: str, result):
+        now = time.time()
+        try:
+            with db_connection() as conn:
+                conn.execute(
+                    """INSERT INTO llm_cache (cache_key, model, response, created_at, last_used)
+                       VALUES (?, ?, ?, ?, ?)
+                       ON CONFLICT(cache_key) DO UPDATE SET
+                           model = excluded.model, response = excluded.response,
+                           created_at = excluded.created_at, last_used = excluded.last_used""",
+                    (key, model, json.dumps(result), now, now),
+                )
+                self._flush_touches(conn)
+                with self._lock:
+                    evict = self._puts % self.evict_every == 0
+                    self._puts += 1
+                if evict:
+                    self._evict(conn, now)
+        except sqlite3.Error as e:
+            print(f"LLM cache write error: {e}")
+
+    def _evict(self, conn, now: float):
+        conn.execute("DELETE FROM llm_cache WHERE created_at <= ?", (now - self.ttl,))
+        excess = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_entries
+        if excess > 0:
+            conn.execute(
+                """DELETE FROM llm_cache WHERE cache_key IN (
+                       SELECT cache_key FROM llm_cache ORDER BY last_used LIMIT ?)""",
+                (excess,),
+            )
+
+    def get_or_compute(self, key: str, model: str, compute):
+        """
+        Cached result for `key`, else compute() (once across concurrent callers)
+        and store it. Exceptions from compute() propagate to every waiter and
+        nothing is cached.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _InFlight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            # A previous leader may have stored the row since our first read
+            flight.result = self.get(key)
+            if flight.result is None:
+                flight.result = compute()
+                self.put(key, model, flight.result)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def clear(self):
+        with db_connection() as conn:
+            conn.execute("DELETE FROM llm_cache")
+
+
+llm_cache = LLMResponseCache()
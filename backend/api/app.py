@@ -1,12 +1,41 @@
+import asyncio
+import sys
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from api.routes import transactions, compliance, users
-from database.database import init_db
+from api.routes import transactions, compliance, users, holders
+from ai.analysis_pipeline import close_pipeline
+from config.config import settings
+from config.startup import init_schema, warm_up
+from database.async_db import adb
+from compliance.screening import shutdown_screening_executor
+from observability.metrics import registry, CONTENT_TYPE
+from api.instrumentation import InstrumentationMiddleware
 
-# Create tables
-init_db()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create / migrate tables, then (optionally) load the lazy dependencies before
+    # the first request. Warm-up finishes before serving: importing xrpl-py from
+    # two threads at once can fail on its circular imports.
+    await asyncio.to_thread(init_schema)
+    if settings.STARTUP_WARMUP:
+        await asyncio.to_thread(warm_up)
+    yield
+    # Release the shared XRPL connection pool (only loaded once the outbox ran) and LLM client
+    xrp_utils = sys.modules.get("xrp_integration.xrp_utils")
+    if xrp_utils is not None:
+        await xrp_utils.close_async_client()
+    await close_pipeline()
+    # Flush queued writes, then stop the DB writer / screening threads
+    await asyncio.to_thread(adb.close)
+    shutdown_screening_executor()
+    # Event scoring pools (only loaded if this process scored event batches)
+    event_processing = sys.modules.get("ai.event_processing")
+    if event_processing is not None:
+        await asyncio.to_thread(event_processing.shutdown_event_pools)
 
-app = FastAPI(title="Politifolio Backend", version="1.0.0")
+app = FastAPI(title="Politifolio Backend", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -15,10 +44,18 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Outermost, so its timings include CORS handling
+app.add_middleware(InstrumentationMiddleware)
 
 app.include_router(transactions.router, prefix="/api/v1/transactions", tags=["transactions"])
 app.include_router(compliance.router, prefix="/api/v1/compliance", tags=["compliance"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
+app.include_router(holders.router, prefix="/api/v1/holders", tags=["holders"])
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    # Prometheus text format: per-stage spans and per-route request latency
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
 
 @app.get("/")
 def read_root():
@@ -0,0 +1,90 @@
+"""
+ASGI middleware timing every request.
+
+- `politifolio_http_request_duration_seconds{method, route, status}` per route template.
+- A `Server-Timing` header with the spans (observability.metrics.span) the
+  request ran before its response started, e.g. `sanctions.check;dur=2.1`.
+- With PROFILE_REQUESTS_ENABLED, a request carrying `X-Profile: 1` is run under
+  the sampling profiler and answered with its collapsed stacks instead of the
+  normal body (the original status is in `X-Profiled-Status`).
+"""
+import time
+from config.config import settings
+from observability.metrics import registry, Histogram, request_spans
+from observability.profiler import SamplingProfiler
+
+HTTP_SECONDS = registry.register(Histogram(
+    "politifolio_http_request_duration_seconds", "API request latency.", ["method", "route", "status"]))
+
+
+def _server_timing(spans, total: float) -> bytes:
+    merged = {}
+    for name, elapsed in spans:
+        merged[name] = merged.get(name, 0.0) + elapsed
+    parts = [f"{name};dur={elapsed * 1000:.2f}" for name, elapsed in merged.items()]
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts).encode("latin-1")
+
+
+def _route_label(scope) -> str:
+    # Route template, not the raw path, to keep the label set bounded. Newer FastAPI
+    # keeps the router-relative route in scope["route"] and the full path in scope["fastapi"].
+    for candidate in ((scope.get("fastapi") or {}).get("effective_route_context"), scope.get("route")):
+        path = getattr(candidate, "path", None)
+        if path:
+            return path
+    return "unmatched"
+
+
+def _wants_profile(scope) -> bool:
+    if not settings.PROFILE_REQUESTS_ENABLED:
+        return False
+    return any(k == b"x-profile" and v not in (b"", b"0") for k, v in scope.get("headers", ()))
+
+
+class InstrumentationMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        spans = []
+        token = request_spans.set(spans)
+        start = time.perf_counter()
+        status = 500
+        profiler = SamplingProfiler(settings.PROFILE_SAMPLE_INTERVAL_MS / 1000) if _wants_profile(scope) else None
+
+        async def send_timed(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", _server_timing(spans, time.perf_counter() - start)))
+                message = {**message, "headers": headers}
+            if profiler is None:
+                await send(message)
+
+        try:
+            if profiler is None:
+                await self.app(scope, receive, send_timed)
+            else:
+                with profiler:
+                    await self.app(scope, receive, send_timed)
+                await self._send_profile(send, profiler, status)
+        finally:
+            request_spans.reset(token)
+            HTTP_SECONDS.observe(time.perf_counter() - start, scope["method"], _route_label(scope), status)
+
+    @staticmethod
+    async def _send_profile(send, profiler, status: int):
+        body = (f"# {profiler.samples} samples every {profiler.interval * 1000:g} ms\n"
+                + profiler.collapsed()).encode()
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", b"text/plain; charset=utf-8"),
+            (b"content-length", str(len(body)).encode()),
+            (b"x-profiled-status", str(status).encode()),
+        ]})
+        await send({"type": "http.response.body", "body": body})
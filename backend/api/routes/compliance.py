@@ -1,8 +1,14 @@
+import asyncio
+import json
+from typing import List
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from compliance.sanctions_check import check_sanction_list
-from compliance.country_risk import get_country_risk
-from ai.event_processing import process_text_for_events
+from config.config import settings
+from database.async_db import adb
+from compliance.risk_refresh import score_change_page
+from compliance.screening import screen, screen_many
+from ai.analysis_pipeline import process_text_for_events_async
 
 router = APIRouter()
 
@@ -10,14 +16,16 @@ class ComplianceCheckRequest(BaseModel):
     name: str
     country: str
 
+class ComplianceBatchRequest(BaseModel):
+    items: List[ComplianceCheckRequest]
+
 class TextAnalysisRequest(BaseModel):
     text: str
 
 @router.post("/check")
-def check_compliance(req: ComplianceCheckRequest):
-    is_sanctioned, reason = check_sanction_list(req.name, req.country)
-    risk_score = get_country_risk(req.country)
-    
+async def check_compliance(req: ComplianceCheckRequest):
+    is_sanctioned, reason, risk_score = await screen(req.name, req.country)
+
     return {
         "sanctioned": is_sanctioned,
         "reason": reason,
@@ -25,7 +33,46 @@ def check_compliance(req: ComplianceCheckRequest):
         "status": "BLOCKED" if is_sanctioned or risk_score > 80 else "CLEARED"
     }
 
+@router.post("/check/batch")
+async def check_compliance_batch(req: ComplianceBatchRequest):
+    """Screen many name/country pairs at once. Streams one JSON object per line (NDJSON), in input order."""
+    pairs = [(item.name, item.country) for item in req.items]
+    size = max(settings.SCREENING_BATCH_CHUNK_SIZE, 1)
+    chunks = [pairs[i:i + size] for i in range(0, len(pairs), size)]
+
+    async def stream():
+        # One executor hop per chunk; the next chunk is screened while this one is sent
+        pending = asyncio.ensure_future(screen_many(chunks[0])) if chunks else None
+        try:
+            for n in range(len(chunks)):
+                screening = await pending
+                pending = asyncio.ensure_future(screen_many(chunks[n + 1])) if n + 1 < len(chunks) else None
+                lines = []
+                for i, ((name, country), (is_sanctioned, reason, risk_score)) in enumerate(
+                        zip(chunks[n], screening), start=n * size):
+                    lines.append(json.dumps({
+                        "index": i,
+                        "name": name,
+                        "country": country,
+                        "sanctioned": is_sanctioned,
+                        "reason": reason,
+                        "country_risk_score": risk_score,
+                        "status": "BLOCKED" if is_sanctioned or risk_score > 80 else "CLEARED"
+                    }) + "\n")
+                yield "".join(lines)
+        finally:
+            # Client went away mid-stream: drop the chunk screened ahead
+            if pending is not None:
+                pending.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@router.get("/risk-changes")
+async def get_risk_changes(after_id: int = 0, limit: int = 500):
+    """Risk score change events after `after_id`, oldest first; pass `next_after_id` back to continue."""
+    return await adb.read(score_change_page, after_id, min(limit, 1000))
+
 @router.post("/analyze-text")
-def analyze_text(req: TextAnalysisRequest):
-    result = process_text_for_events(req.text)
+async def analyze_text(req: TextAnalysisRequest):
+    result = await process_text_for_events_async(req.text)
     return result
@@ -0,0 +1,24 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException
+from database.async_db import adb
+from xrp_integration.holders import get_holder, list_holders, holder_summary
+
+router = APIRouter()
+
+# Served from the local holder index (token_holders); see xrp_integration.holders
+
+@router.get("/")
+async def get_holders(frozen: Optional[bool] = None, min_balance: Optional[float] = None,
+                      limit: int = 100, offset: int = 0):
+    return await adb.read(list_holders, frozen, min_balance, min(limit, 1000), offset)
+
+@router.get("/summary")
+async def get_holder_summary():
+    return await adb.read(holder_summary)
+
+@router.get("/{account}")
+async def get_holder_line(account: str):
+    holder = await adb.read(get_holder, account)
+    if not holder:
+        raise HTTPException(status_code=404, detail="No GEO trust line for this account")
+    return holder
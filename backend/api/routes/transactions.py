@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
-from database.database import get_db
-from database.models import insert_transaction
+import time
+from fastapi import APIRouter, BackgroundTasks, HTTPException
+from database.async_db import adb
+from database.models import row_to_dict
 from pydantic import BaseModel
-from xrp_integration.token_controller import TokenController
-from compliance.sanctions_check import check_sanction_list
-from compliance.country_risk import get_country_risk
+from xrp_integration.outbox import enqueue_payment
+from xrp_integration.holders import get_holder
+from compliance.screening import screen
 
 router = APIRouter()
 
@@ -16,37 +17,58 @@ class TransactionCreate(BaseModel):
     receiver_name: str
     receiver_country: str
 
-@router.post("/")
-def create_transaction(tx: TransactionCreate, db=Depends(get_db)):
-    # 1. Compliance Check
-    is_sanctioned, reason = check_sanction_list(tx.receiver_name, tx.receiver_country)
+# Broker down: skip wake-ups for a while instead of tying up a thread per payment
+_WAKE_BACKOFF_SECONDS = 30.0
+_wake_paused_until = 0.0
+
+def _wake_outbox():
+    """Ask the issuer worker to drain now rather than at the next beat tick (it alone holds the issuer Sequence)."""
+    global _wake_paused_until
+    if time.monotonic() < _wake_paused_until:
+        return
+    from tasks.celery_app import celery_app  # loaded with the first payment, not at API startup
+    try:
+        celery_app.send_task("tasks.outbox_task.drain_outbox_task", retry=False, ignore_result=True)
+    except Exception as e:
+        _wake_paused_until = time.monotonic() + _WAKE_BACKOFF_SECONDS
+        print(f"Outbox wake-up not sent ({e}); the drain-outbox beat picks the row up")
+
+def _fetch_transaction(conn, tx_id: int):
+    return row_to_dict(conn.execute("SELECT * FROM transactions WHERE id = ?", (tx_id,)).fetchone())
+
+@router.post("/", status_code=202)
+async def create_transaction(tx: TransactionCreate, background_tasks: BackgroundTasks):
+    # 1. Compliance Check (fuzzy matching runs on the screening executor, off the event loop)
+    is_sanctioned, reason, risk_score = await screen(tx.receiver_name, tx.receiver_country)
     if is_sanctioned:
         raise HTTPException(status_code=400, detail=f"Transaction blocked: {reason}")
     
-    risk_score = get_country_risk(tx.receiver_country)
     if risk_score > 80:
          raise HTTPException(status_code=400, detail=f"Transaction blocked: High Risk Country ({risk_score})")
 
-    # 2. Issue Token / Transfer on XRPL
-    try:
-        token_controller = TokenController()
-        # In real scenario, sender would sign on frontend, backend might relay or co-sign
-        # Here we simulate the issuer sending tokens or facilitating transfer
-        # For simplicity, let's assume this is a "Mint" or "Payment" from the central treasury
-        xrpl_response = token_controller.issue_token(tx.destination, tx.amount)
-        # Note: In real app, we need to handle async properly and check result code
-        tx_hash = xrpl_response.result.get("tx_json", {}).get("hash", "unknown_hash")
-    except Exception as e:
-        # Log error
-        print(f"XRPL Error: {e}")
-        # For demo purposes, we might proceed or fail. Let's fail if it's a real integration, 
-        # but if config is missing, maybe return a mock success?
-        # raise HTTPException(status_code=500, detail=str(e))
-        tx_hash = "mock_tx_hash_12345"
-
-    # 3. Log to DB
-    db_tx = insert_transaction(
-        db, tx_hash, tx.sender_name, tx.receiver_name, tx.amount, "GEO",
-        "submitted", compliance_check_passed=True, risk_score_at_time=risk_score
+    # Destination frozen by a sanctions enforcement run (local holder index, no ledger call)
+    holder = await adb.read(get_holder, tx.destination)
+    if holder and holder["frozen"]:
+        raise HTTPException(status_code=400, detail="Transaction blocked: destination trust line is frozen")
+
+    # 2. Record in the outbox; XRPL submission happens off the request path
+    # (tasks.outbox_task drains it durably, reconcile_task confirms the ledger result).
+    # The write returns once committed: the row is durable before we answer 202.
+    db_tx = await adb.write(
+        enqueue_payment,
+        tx.destination, tx.amount, tx.sender_name, tx.receiver_name, "GEO",
+        compliance_check_passed=True, risk_score_at_time=risk_score,
+        sender_country=tx.sender_country, receiver_country=tx.receiver_country
     )
+
+    # 3. Wake the issuer worker once the response is sent. The API never signs: a second
+    # local Sequence counter would race the worker's for the issuer's Sequences.
+    background_tasks.add_task(_wake_outbox)
     return db_tx
+
+@router.get("/{tx_id}")
+async def get_transaction(tx_id: int):
+    tx = await adb.read(_fetch_transaction, tx_id)
+    if not tx:
+        raise HTTPException(status_code=404, detail="Transaction not found")
+    return tx
@@ -9,6 +9,6 @@ class UserCreate(BaseModel):
     password: str
 
 @router.post("/")
-def create_user(user: UserCreate):
+async def create_user(user: UserCreate):
     # Dummy implementation
     return {"username": user.username, "status": "created"}
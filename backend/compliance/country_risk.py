@@ -1,6 +1,33 @@
-from ai.risk_assessment import calculate_risk_score
+from ai.risk_assessment import entity_penalty
+from observability.metrics import timed
+from .risk_cache import risk_score_cache
 
-def get_country_risk(country_code: str):
-    # This might fetch from DB, but fall back to AI mock
-    score = calculate_risk_score(country_code)
+# Country names seen in news / sanctions feeds -> codes used by transactions
+COUNTRY_ALIASES = {
+    "united states": "US", "usa": "US", "united kingdom": "UK", "great britain": "UK",
+    "france": "FR", "germany": "DE", "japan": "JP", "china": "CN", "russia": "RU",
+    "russian federation": "RU", "north korea": "NK", "dprk": "NK", "iran": "IR",
+    "venezuela": "VE", "syria": "SY", "cuba": "CU", "belarus": "BY", "afghanistan": "AF",
+    "turkey": "TR", "brazil": "BR", "nigeria": "NG",
+}
+
+def normalize_country(country: str):
+    """Country code for a code or a country name (None when unknown)."""
+    value = (country or "").strip()
+    alias = COUNTRY_ALIASES.get(value.casefold())
+    if alias:
+        return alias
+    return value.upper() if len(value) == 2 else None
+
+@timed("risk.country")
+def get_country_risk(country_code: str, entity_name: str = None):
+    # Served from the score cache (LRU -> risk_scores table -> AI mock on a miss)
+    score = risk_score_cache.get(country_code)
+    if entity_name:
+        score = round(min(score + entity_penalty(entity_name), 100.0), 2)
     return score
+
+@timed("risk.countries")
+def get_country_risks(country_codes):
+    """Scores many countries at once; misses are simulated in one batch. Returns {country_code: score}."""
+    return risk_score_cache.get_many(country_codes)
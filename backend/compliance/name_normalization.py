@@ -0,0 +1,87 @@
+"""Name normalization for sanctions screening.
+
+Applied once to every list name when the snapshot is compiled and once to
+every query:
+
+1. Transliterate Cyrillic, fold Unicode (NFKD, drop combining marks,
+   casefold), so "Müller", "MULLER" and "Мюллер" line up.
+2. Split on anything that is not a letter or digit ("AL-QAIDA" -> AL QAIDA).
+3. Drop honorifics and legal-form words ("Mr", "LLC", "Limited", "The"),
+   unless nothing else would be left.
+4. Sort the tokens, so word order does not lower the score.
+
+phonetic_key() maps a normalized name to a coarse consonant skeleton per
+token ("MOHAMMED" and "MUHAMAD" -> "MT"); names sharing a key are scored
+first, before the bigram index is consulted.
+"""
+import re
+import unicodedata
+
+_CYRILLIC = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e", "ж": "zh", "з": "z",
+    "и": "i", "й": "y", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o", "п": "p", "р": "r",
+    "с": "s", "т": "t", "у": "u", "ф": "f", "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh",
+    "щ": "shch", "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+    "і": "i", "ї": "yi", "є": "ye", "ґ": "g", "ў": "u",
+}
+_TRANSLIT = str.maketrans({**_CYRILLIC, **{k.upper(): v for k, v in _CYRILLIC.items()}})
+
+# Letters NFKD does not decompose
+_SPECIAL = str.maketrans({"ß": "ss", "æ": "ae", "œ": "oe", "ø": "o", "đ": "d", "ð": "d",
+                          "þ": "th", "ł": "l", "ı": "i"})
+
+_SPLIT = re.compile(r"[^0-9a-z]+")
+
+HONORIFICS = {
+    "MR", "MRS", "MS", "MISS", "DR", "PROF", "SIR", "DAME", "LORD", "LADY", "HON", "REV",
+    "GEN", "COL", "MAJ", "CAPT", "LT", "SGT", "SHEIKH", "SHAIKH", "HAJI", "HAJJI", "MULLAH",
+}
+LEGAL_FORMS = {
+    "LLC", "LLP", "LP", "LTD", "LIMITED", "INC", "INCORPORATED", "CORP", "CORPORATION", "CO",
+    "COMPANY", "PLC", "GMBH", "AG", "SA", "SAS", "SARL", "SPA", "SRL", "BV", "NV", "AB", "AS",
+    "OY", "KG", "JSC", "PJSC", "OJSC", "CJSC", "OOO", "ZAO", "OAO", "PAO", "FZE", "FZCO",
+    "PTE", "PTY", "HOLDING", "HOLDINGS",
+}
+CONNECTORS = {"THE", "AND", "OF", "DE", "DU", "DER"}
+STOPWORDS = HONORIFICS | LEGAL_FORMS | CONNECTORS
+
+
+def fold(text: str) -> str:
+    """Transliterate and strip accents; returns lower-case ASCII where possible."""
+    text = text.translate(_TRANSLIT).casefold().translate(_SPECIAL)
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def name_tokens(name: str):
+    """Folded, upper-cased tokens with stopwords removed (kept if that would empty the name)."""
+    tokens = [t.upper() for t in _SPLIT.split(fold(name or "")) if t]
+    kept = [t for t in tokens if t not in STOPWORDS]
+    return kept or tokens
+
+
+def normalize_name(name: str) -> str:
+    return " ".join(sorted(name_tokens(name)))
+
+
+# Rewrites applied to a token before vowels are dropped (order matters)
+_PHONETIC_RULES = [
+    (re.compile(r"PH"), "F"), (re.compile(r"CK|Q"), "K"), (re.compile(r"X"), "KS"),
+    (re.compile(r"C(?=[EIY])"), "S"), (re.compile(r"C"), "K"), (re.compile(r"DH|TH"), "T"),
+    (re.compile(r"KH|GH"), "H"), (re.compile(r"[DT]"), "T"), (re.compile(r"Z"), "S"),
+    (re.compile(r"W"), "V"), (re.compile(r"J"), "Y"),
+]
+_VOWELS = re.compile(r"(?<!^)[AEIOUYH]")
+_REPEATS = re.compile(r"(.)\1+")
+
+
+def _token_key(token: str) -> str:
+    for pattern, repl in _PHONETIC_RULES:
+        token = pattern.sub(repl, token)
+    token = _REPEATS.sub(r"\1", token)
+    return _REPEATS.sub(r"\1", _VOWELS.sub("", token))
+
+
+def phonetic_key(normalized: str) -> str:
+    """Blocking key for a normalize_name() result: sorted per-token consonant skeletons."""
+    return " ".join(sorted(_token_key(t) for t in normalized.split()))
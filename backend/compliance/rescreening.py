@@ -0,0 +1,194 @@
+"""Event-driven re-screening of existing transactions.
+
+A geo event (new sanctions on a country, a named counterparty) only
+re-screens the transactions it can affect: rows whose sender/receiver
+country matches or whose receiver is a named counterparty, found through
+the idx_transactions_*_country / idx_transactions_receiver indexes instead
+of a full-table scan. Each run is recorded as a reconciliation_tasks row
+with the real scanned / flagged counts.
+
+Flagged transactions get a transaction_flags row (one per event and
+transaction, so re-running an event's re-screen adds nothing) and
+compliance_check_passed = 0; ones still waiting in the outbox are moved to
+compliance_hold so they are never submitted.
+"""
+import uuid
+from datetime import datetime, timezone
+from config.config import settings
+from database.database import db_connection
+from .sanctions_check import check_sanction_list_many
+from .country_risk import get_country_risks, normalize_country
+from ai.risk_assessment import entity_penalty
+
+# transactions.status values (see xrp_integration.outbox)
+PENDING = "pending_submission"
+FAILED = "failed"
+HELD = "compliance_hold"  # flagged before submission; the outbox never claims it
+
+# Same cut-off create_transaction uses to block a payment
+BLOCK_RISK_SCORE = 80
+
+SEVERITY_ORDER = {"LOW": 0, "MEDIUM": 1, "HIGH": 2, "CRITICAL": 3}
+
+
+def _now():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _affected_chunk(conn, country, counterparties, after_id: int, limit: int):
+    clauses, params = [], []
+    if country:
+        clauses.append("receiver_country = ? OR sender_country = ?")
+        params += [country, country]
+    if counterparties:
+        clauses.append(f"receiver IN ({','.join('?' * len(counterparties))})")
+        params += list(counterparties)
+    rows = conn.execute(
+        f"""SELECT id, sender, receiver, sender_country, receiver_country, amount, status
+            FROM transactions
+            WHERE ({' OR '.join(clauses)}) AND status != '{FAILED}' AND id > ?
+            ORDER BY id LIMIT ?""",
+        params + [after_id, limit],
+    ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def screen_transactions(rows):
+    """Returns [(row, reason, risk_score)] for the rows that no longer pass compliance."""
+    parties = {}
+    for row in rows:
+        parties[(row["receiver"], row["receiver_country"] or "")] = None
+        if row["sender_country"]:
+            parties[(row["sender"], row["sender_country"])] = None
+    pairs = list(parties)
+    for pair, result in zip(pairs, check_sanction_list_many(pairs)):
+        parties[pair] = result
+    risks = get_country_risks({c for _, c in pairs if c})
+
+    flagged = []
+    for row in rows:
+        receiver = (row["receiver"], row["receiver_country"] or "")
+        sender = (row["sender"], row["sender_country"]) if row["sender_country"] else None
+        reason = None
+        for party in filter(None, (receiver, sender)):
+            sanctioned, why = parties[party]
+            if sanctioned:
+                reason = why
+                break
+        risk = None
+        if row["receiver_country"]:
+            risk = round(min(risks[row["receiver_country"]] + entity_penalty(row["receiver"]), 100.0), 2)
+            if reason is None and risk > BLOCK_RISK_SCORE:
+                reason = f"High Risk Country ({risk})"
+        if reason:
+            flagged.append((row, reason, risk))
+    return flagged
+
+
+def _record_flags(task_id: str, event_id, flagged):
+    if not flagged:
+        return 0.0
+    with db_connection() as conn:
+        conn.executemany(
+            """INSERT OR IGNORE INTO transaction_flags (task_id, transaction_id, geo_event_id, reason, risk_score)
+               VALUES (?, ?, ?, ?, ?)""",
+            [(task_id, row["id"], event_id, reason, risk) for row, reason, risk in flagged],
+        )
+        conn.executemany(
+            f"""UPDATE transactions SET compliance_check_passed = 0, updated_at = CURRENT_TIMESTAMP,
+                   status = CASE WHEN status = '{PENDING}' THEN '{HELD}' ELSE status END
+                WHERE id = ?""",
+            [(row["id"],) for row, _, _ in flagged],
+        )
+    # Value of the payments stopped before they reached the ledger
+    held = 0.0
+    for row, _, _ in flagged:
+        if row["status"] == PENDING:
+            try:
+                held += float(row["amount"])
+            except (TypeError, ValueError):
+                pass
+    return held
+
+
+def rescreen(country: str = None, counterparties=(), event: dict = None, chunk_size: int = None):
+    """
+    Re-screen the transactions touching `country` and/or `counterparties`.
+    `event` (a geo_events row) labels the reconciliation task. Returns a summary dict.
+    """
+    country = normalize_country(country) if country else None
+    counterparties = list(dict.fromkeys(counterparties or ()))
+    if not country and not counterparties:
+        return None
+    chunk_size = chunk_size or settings.RESCREEN_CHUNK_SIZE
+    event = event or {}
+    event_id = event.get("id")
+    task_id = f"REC-{uuid.uuid4().hex[:10].upper()}"
+    label = event.get("title") or f"Re-screen {country or ', '.join(counterparties)}"
+
+    with db_connection() as conn:
+        conn.execute(
+            """INSERT INTO reconciliation_tasks (id, event_type, triggered_by, status, start_time, assigned_to, priority)
+               VALUES (?, ?, ?, 'running', ?, 'AI Engine', ?)""",
+            (task_id, label, f"Geo event #{event_id}" if event_id else "Manual re-screen",
+             _now(), (event.get("severity") or "medium").lower()),
+        )
+
+    scanned = flagged = 0
+    savings = 0.0
+    last_id = 0
+    while True:
+        with db_connection() as conn:
+            rows = _affected_chunk(conn, country, counterparties, last_id, chunk_size)
+        if not rows:
+            break
+        last_id = rows[-1]["id"]
+        hits = screen_transactions(rows)
+        savings += _record_flags(task_id, event_id, hits)
+        scanned += len(rows)
+        flagged += len(hits)
+
+    with db_connection() as conn:
+        conn.execute(
+            """UPDATE reconciliation_tasks SET status = 'completed', transactions_scanned = ?,
+                   transactions_flagged = ?, completion_time = ?, estimated_savings = ?
+               WHERE id = ?""",
+            (scanned, flagged, _now(), round(savings, 2), task_id),
+        )
+        if event_id:
+            conn.execute("UPDATE geo_events SET affected_transactions = ? WHERE id = ?", (flagged, event_id))
+    return {"task_id": task_id, "country": country, "scanned": scanned, "flagged": flagged}
+
+
+def rescreen_for_event(event_id: int):
+    """Re-screen the transactions affected by one geo_events row."""
+    with db_connection() as conn:
+        row = conn.execute("SELECT * FROM geo_events WHERE id = ?", (event_id,)).fetchone()
+    if row is None:
+        print(f"Geo event {event_id} not found")
+        return None
+    event = dict(row)
+    country = normalize_country(event["country"])
+    if not country:
+        print(f"Geo event {event_id}: unknown country {event['country']!r}, nothing to re-screen")
+        return None
+    return rescreen(country, event=event)
+
+
+def rescreen_for_events(events, min_severity: str = None):
+    """
+    Re-screen for a batch of new geo_events rows (dicts with id, country, severity).
+    Events below `min_severity` are skipped and each country is scanned once,
+    labelled with its most severe event.
+    """
+    floor = SEVERITY_ORDER.get((min_severity or settings.RESCREEN_MIN_SEVERITY).upper(), 0)
+    by_country = {}
+    for event in events:
+        rank = SEVERITY_ORDER.get(str(event.get("severity")).upper(), 0)
+        country = normalize_country(event.get("country"))
+        if rank < floor or not country:
+            continue
+        current = by_country.get(country)
+        if current is None or rank > SEVERITY_ORDER.get(str(current.get("severity")).upper(), 0):
+            by_country[country] = event
+    return [rescreen(country, event=event) for country, event in by_country.items()]
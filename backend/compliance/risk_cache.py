@@ -0,0 +1,138 @@
+"""Layered cache for country risk scores.
+
+Lookup order:
+1. In-process LRU (entries expire after RISK_CACHE_TTL_SECONDS)
+2. risk_scores table (rows older than RISK_SCORE_MAX_AGE_SECONDS are stale;
+   a full compliance.risk_refresh run counts as checking every row)
+3. Fresh simulation, written back to risk_scores so other workers share it
+
+Only the base country score is cached; entity heuristics are a fixed
+adjustment applied on top by the caller.
+
+The LRU is per process. A refresh in another process (the Celery risk
+task) bumps the "risk_scores" row of cache_generations, and every cache
+checks that row at most every RISK_CACHE_GENERATION_CHECK_SECONDS and
+drops its entries when it has moved.
+"""
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from config.config import settings
+from database.database import db_connection
+from ai.risk_assessment import calculate_risk_scores
+
+
+GENERATION = "risk_scores"
+
+
+def bump_generation(conn):
+    """Tell every process's cache that risk_scores changed (call in the writing transaction)."""
+    conn.execute(
+        """INSERT INTO cache_generations (name, generation) VALUES (?, 1)
+           ON CONFLICT(name) DO UPDATE SET generation = generation + 1""",
+        (GENERATION,),
+    )
+
+
+class RiskScoreCache:
+    def __init__(self, ttl: float = None, max_entries: int = None, max_age: float = None,
+                 generation_check: float = None):
+        self.ttl = settings.RISK_CACHE_TTL_SECONDS if ttl is None else ttl
+        self.max_entries = max_entries or settings.RISK_CACHE_MAX_ENTRIES
+        self.max_age = settings.RISK_SCORE_MAX_AGE_SECONDS if max_age is None else max_age
+        self.generation_check = (settings.RISK_CACHE_GENERATION_CHECK_SECONDS
+                                 if generation_check is None else generation_check)
+        self._entries = OrderedDict()  # country_code -> (score, expires_at)
+        self._lock = threading.Lock()
+        self._generation = None
+        self._generation_checked = 0.0
+
+    def _check_generation(self, now: float):
+        """Drop every entry if another process has bumped the shared generation."""
+        if now - self._generation_checked < self.generation_check:
+            return
+        self._generation_checked = now
+        try:
+            with db_connection() as conn:
+                row = conn.execute("SELECT generation FROM cache_generations WHERE name = ?", (GENERATION,)).fetchone()
+        except sqlite3.Error:
+            return  # TTL expiry still applies
+        generation = row[0] if row else 0
+        with self._lock:
+            if generation != self._generation:
+                self._entries.clear()
+                self._generation = generation
+
+    def get_many(self, country_codes):
+        """Returns {country_code: score}, going to the DB/simulation only for misses."""
+        codes = list(dict.fromkeys(country_codes))
+        scores = {}
+        now = time.monotonic()
+        self._check_generation(now)
+        with self._lock:
+            for code in codes:
+                hit = self._entries.get(code)
+                if hit and hit[1] > now:
+                    self._entries.move_to_end(code)
+                    scores[code] = hit[0]
+
+        missing = [c for c in codes if c not in scores]
+        if missing:
+            loaded = self._load(missing)
+            self._store(loaded)
+            scores.update(loaded)
+        return scores
+
+    def get(self, country_code: str) -> float:
+        return self.get_many([country_code])[country_code]
+
+    def invalidate(self, country_codes=None):
+        """Drop cached scores (all of them when no codes are given)."""
+        with self._lock:
+            if country_codes is None:
+                self._entries.clear()
+            else:
+                for code in country_codes:
+                    self._entries.pop(code, None)
+
+    def _store(self, scores):
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            for code, score in scores.items():
+                self._entries[code] = (score, expires_at)
+                self._entries.move_to_end(code)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _load(self, codes):
+        """Read fresh rows from risk_scores; simulate and persist the rest."""
+        try:
+            with db_connection() as conn:
+                placeholders = ",".join("?" * len(codes))
+                rows = conn.execute(
+                    f"""SELECT country_code, score,
+                               (julianday('now') - julianday(MAX(last_updated, COALESCE(
+                                   (SELECT MAX(started_at) FROM risk_refresh_runs
+                                    WHERE full_universe = 1 AND finished_at IS NOT NULL), last_updated)))) * 86400 AS age
+                        FROM risk_scores WHERE country_code IN ({placeholders})""",
+                    codes,
+                ).fetchall()
+                scores = {r["country_code"]: r["score"] for r in rows if r["age"] is not None and r["age"] <= self.max_age}
+
+                stale = [c for c in codes if c not in scores]
+                if stale:
+                    fresh = dict(zip(stale, calculate_risk_scores(stale)))
+                    conn.executemany(
+                        """INSERT INTO risk_scores (country_code, score) VALUES (?, ?)
+                           ON CONFLICT(country_code) DO UPDATE SET score = excluded.score, last_updated = CURRENT_TIMESTAMP""",
+                        list(fresh.items()),
+                    )
+                    scores.update(fresh)
+                return scores
+        except sqlite3.Error as e:
+            print(f"Risk cache DB error: {e}. Scoring without persistence.")
+            return dict(zip(codes, calculate_risk_scores(codes)))
+
+
+risk_score_cache = RiskScoreCache()
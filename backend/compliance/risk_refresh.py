@@ -0,0 +1,132 @@
+"""Periodic refresh of the risk_scores table.
+
+refresh_risk_scores() rescores every known jurisdiction in one run:
+
+1. The universe is the knowledge base (COUNTRY_DATA_KB), the codes
+   normalize_country() can produce (COUNTRY_ALIASES), and every code already
+   in risk_scores, e.g. one scored on demand by the cache.
+2. All of them are scored by one vectorized calculate_risk_scores() call.
+3. The stored scores are read with one SELECT. Only new codes and scores
+   that moved by at least RISK_UPDATE_MIN_DELTA are written, with a single
+   upsert executemany. Each written row also gets a risk_score_changes event.
+
+Rows the run checked but left alone keep their last_updated. Once a run
+over the whole universe finishes, its risk_refresh_runs row tells the
+score cache that they are still current. That row is written in the same
+transaction as the scores, so a run that fails leaves no trace. The same
+transaction drops change events and runs older than
+RISK_CHANGE_RETENTION_DAYS.
+
+Consumers page through the events with list_score_changes(after_id).
+Event ids are AUTOINCREMENT, so they are never reused after a prune, and
+score_change_page() tells a consumer when unread events were pruned.
+"""
+import uuid
+from datetime import datetime, timezone
+from config.config import settings
+from database.database import db_connection
+from observability.metrics import timed
+from ai.risk_assessment import COUNTRY_DATA_KB, calculate_risk_scores
+from .country_risk import COUNTRY_ALIASES
+from .risk_cache import bump_generation, risk_score_cache
+
+
+def risk_universe(conn):
+    """Every country code the refresh covers, sorted."""
+    stored = {r[0] for r in conn.execute("SELECT country_code FROM risk_scores").fetchall()}
+    return sorted(set(COUNTRY_DATA_KB) | set(COUNTRY_ALIASES.values()) | stored)
+
+
+def prune_history(conn, retention_days: int):
+    """Delete change events and refresh runs older than `retention_days` (0 keeps everything)."""
+    if retention_days <= 0:
+        return 0
+    cutoff = f"-{int(retention_days)} days"
+    deleted = conn.execute("DELETE FROM risk_score_changes WHERE changed_at < datetime('now', ?)", (cutoff,)).rowcount
+    conn.execute("DELETE FROM risk_refresh_runs WHERE started_at < datetime('now', ?)", (cutoff,))
+    return deleted
+
+
+def score_changes(current: dict, scores: dict, min_delta: float):
+    """[(country_code, old_score, new_score)] for new codes and moves of at least `min_delta`."""
+    changes = []
+    for code, new in scores.items():
+        old = current.get(code)
+        if old is None or abs(new - old) >= min_delta:
+            changes.append((code, old, new))
+    return changes
+
+
+@timed("risk.refresh")
+def refresh_risk_scores(country_codes=None, min_delta: float = None):
+    """
+    Rescore `country_codes` (default: the whole universe) and store the moves.
+    Returns {"run_id", "countries", "changed", "changes": [(code, old, new)]}.
+    """
+    min_delta = settings.RISK_UPDATE_MIN_DELTA if min_delta is None else min_delta
+    run_id = f"RSK-{uuid.uuid4().hex[:10].upper()}"
+    # Rows left alone are vouched for as of the start, before scoring began
+    started_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    if country_codes is not None:
+        codes = sorted(set(country_codes))
+    else:
+        with db_connection() as conn:
+            codes = risk_universe(conn)
+
+    scores = dict(zip(codes, calculate_risk_scores(codes)))
+
+    with db_connection() as conn:
+        stored = {r["country_code"]: r["score"] for r in conn.execute("SELECT country_code, score FROM risk_scores")}
+        current = {code: stored[code] for code in codes if code in stored}
+        changes = score_changes(current, scores, min_delta)
+        conn.executemany(
+            """INSERT INTO risk_scores (country_code, score) VALUES (?, ?)
+               ON CONFLICT(country_code) DO UPDATE SET score = excluded.score, last_updated = CURRENT_TIMESTAMP""",
+            [(code, new) for code, _, new in changes],
+        )
+        conn.executemany(
+            "INSERT INTO risk_score_changes (run_id, country_code, old_score, new_score) VALUES (?, ?, ?, ?)",
+            [(run_id, code, old, new) for code, old, new in changes],
+        )
+        if changes:
+            bump_generation(conn)  # API workers drop their cached scores
+        conn.execute(
+            """INSERT INTO risk_refresh_runs (id, started_at, finished_at, full_universe, countries, changed)
+               VALUES (?, ?, CURRENT_TIMESTAMP, ?, ?, ?)""",
+            (run_id, started_at, int(country_codes is None), len(codes), len(changes)),
+        )
+        prune_history(conn, settings.RISK_CHANGE_RETENTION_DAYS)
+    risk_score_cache.invalidate([code for code, _, _ in changes])
+    return {"run_id": run_id, "countries": len(codes), "changed": len(changes), "changes": changes}
+
+
+def list_score_changes(conn, after_id: int = 0, limit: int = 500):
+    """Change events newer than `after_id`, oldest first (consumers keep the last id they saw)."""
+    rows = conn.execute(
+        """SELECT id, run_id, country_code, old_score, new_score, changed_at FROM risk_score_changes
+           WHERE id > ? ORDER BY id LIMIT ?""",
+        (after_id, limit),
+    ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def first_change_id(conn):
+    """Lowest event id still stored, or the id the next event will get if none is."""
+    row = conn.execute("SELECT MIN(id) FROM risk_score_changes").fetchone()
+    if row[0] is not None:
+        return row[0]
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'risk_score_changes'").fetchone()
+    return (row[0] if row else 0) + 1
+
+
+def score_change_page(conn, after_id: int = 0, limit: int = 500):
+    """
+    list_score_changes plus the cursor for the next call. `missed` is True
+    when events after `after_id` were pruned before this consumer read them.
+    """
+    changes = list_score_changes(conn, after_id, limit)
+    return {
+        "changes": changes,
+        "next_after_id": changes[-1]["id"] if changes else after_id,
+        "missed": after_id + 1 < first_change_id(conn),
+    }
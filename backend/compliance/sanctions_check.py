@@ -1,34 +1,58 @@
-import csv
-import os
-import difflib
-
-# Load Sanctions DB into memory on startup
-SANCTIONS_DB = []
-csv_path = os.path.join(os.path.dirname(__file__), "..", "data", "sanctions.csv")
-if os.path.exists(csv_path):
-    with open(csv_path, "r") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            SANCTIONS_DB.append(row)
+from observability.metrics import timed
+from .sanctions_snapshot import SanctionsStore
 
+# Fuzzy matching threshold (75% similarity required to flag)
+MATCH_THRESHOLD = 0.75
+
+# Sanctions list: compiled mmap snapshot of data/sanctions.csv (SANCTIONS_SOURCES),
+# loaded on first use and hot-swapped when a new snapshot is compiled
+sanctions_store = SanctionsStore(threshold=MATCH_THRESHOLD)
+
+SANCTIONED_COUNTRIES = ["NK", "IR", "SY", "CU", "VE", "RU"]
+
+def _name_result(name: str, match):
+    entry, similarity = match
+    if entry:
+        return True, f"Name Match Detected: '{name}' is {round(similarity*100)}% similar to sanctioned entity '{entry['name']}' ({entry['type']})"
+    return False, "Clear"
+
+@timed("sanctions.check")
 def check_sanction_list(name: str, country: str):
     """
     Performs computational fuzzy matching against a sanctions database.
-    Uses SequenceMatcher to calculate string similarity (0.0 to 1.0).
+    Names are normalized (Unicode folding, honorifics / legal forms dropped,
+    tokens sorted); phonetically identical names are scored first, then
+    SequenceMatcher similarity (0.0 to 1.0) on the bigram index candidates.
     """
     # 1. Check Country Exact Match
-    sanctioned_countries = ["NK", "IR", "SY", "CU", "VE", "RU"]
-    if country.upper() in sanctioned_countries:
+    if country.upper() in SANCTIONED_COUNTRIES:
         return True, f"Country {country} is strictly sanctioned."
 
     # 2. Fuzzy Name Matching (Computational)
-    threshold = 0.75 # 75% similarity required to flag
-    
-    for entry in SANCTIONS_DB:
-        # Calculate similarity ratio
-        similarity = difflib.SequenceMatcher(None, name.upper(), entry["name"].upper()).ratio()
-        
-        if similarity > threshold:
-            return True, f"Name Match Detected: '{name}' is {round(similarity*100)}% similar to sanctioned entity '{entry['name']}' ({entry['type']})"
+    return _name_result(name, sanctions_store.index().best_match(name))
 
-    return False, "Clear"
+@timed("sanctions.check_many")
+def check_sanction_list_many(pairs):
+    """
+    Batch version of check_sanction_list for (name, country) pairs.
+    Repeated pairs are screened once, and names are only fuzzy-matched when
+    the country check does not already block them. Results keep input order.
+    """
+    pairs = list(pairs)
+    unique = list(dict.fromkeys(pairs))
+
+    # 1. Country check per pair; collect names that still need matching
+    results = {}
+    to_match = []
+    for name, country in unique:
+        if country.upper() in SANCTIONED_COUNTRIES:
+            results[(name, country)] = (True, f"Country {country} is strictly sanctioned.")
+        else:
+            to_match.append((name, country))
+
+    # 2. Fuzzy match all remaining names in one pass over the index
+    matches = sanctions_store.index().best_matches([name for name, _ in to_match])
+    for (name, country), match in zip(to_match, matches):
+        results[(name, country)] = _name_result(name, match)
+
+    return [results[pair] for pair in pairs]
@@ -0,0 +1,248 @@
+"""Bigram inverted index for fuzzy sanctions screening.
+
+Names and queries go through compliance.name_normalization first. A query
+is then matched in two steps:
+
+1. Blocking: names with the same phonetic key are scored first. An exact
+   match (ratio 1.0) there wins outright. Any other block hit only raises
+   the floor for step 2.
+2. The index narrows the list down to names that *could* clear the
+   threshold, and each survivor is scored with difflib.SequenceMatcher
+   against that floor. A better name outside the block still wins, so the
+   result is the same as scoring the whole list.
+
+Pruning bound: SequenceMatcher's matching blocks form a common subsequence
+of M chars split into B blocks, and consecutive blocks are separated by at
+least one unmatched char, so B <= (len_a + len_b) - 2M + 1.  Every block of
+length L shares L-1 bigrams, so the two names share at least 3M - T - 1
+bigrams (T = len_a + len_b).  Trigrams give a negative bound at 0.75, which
+is why the postings are keyed on bigrams.
+
+The j-th occurrence of a bigram in a name is posted under its own key
+("AN", then "AN2", ...), so the number of keys a name shares with the query
+is exactly the shared bigram multiset. candidates() gets those counts by
+tallying the probed posting lists and never decodes a name to filter it.
+
+Entries may carry aliases: every alias is indexed as its own name and
+resolves to its entry. The index can also be assembled from prebuilt arrays
+(see compliance.sanctions_snapshot) instead of a list of dicts.
+"""
+import difflib
+from collections import Counter, defaultdict
+from .name_normalization import normalize_name, phonetic_key
+
+
+# Bump when the normalization changes so stored snapshots are rebuilt
+NORMALIZER_VERSION = 2
+
+
+def _bigrams(s: str):
+    return [s[i:i + 2] for i in range(len(s) - 1)]
+
+
+def _gram_keys(s: str):
+    """Posting keys of a normalized name: each bigram, numbered from its second occurrence on."""
+    seen = Counter()
+    keys = []
+    for gram in _bigrams(s):
+        seen[gram] += 1
+        keys.append(gram if seen[gram] == 1 else f"{gram}{seen[gram]}")
+    return keys
+
+
+def _max_ratio(la: int, lb: int) -> float:
+    # Best ratio two strings of these lengths can reach (same formula as difflib)
+    total = la + lb
+    return 2.0 * min(la, lb) / total if total else 1.0
+
+
+def _clears(ratio: float, threshold: float, inclusive: bool) -> bool:
+    return ratio >= threshold if inclusive else ratio > threshold
+
+
+def _ratio_bound(la: int, lb: int, shared=None) -> float:
+    # Best ratio given the lengths and, if known, the shared bigram count (M <= (shared + T + 1) / 3)
+    total = la + lb
+    if not total:
+        return 1.0
+    m = min(la, lb) if shared is None else min(la, lb, (shared + total + 1) // 3)
+    return 2.0 * m / total
+
+
+def _min_matches(total: int, threshold: float, inclusive: bool = False) -> int:
+    """Smallest match count M for which 2M/T clears the threshold (or reaches it, if inclusive)."""
+    if not total:
+        return 0
+    m = int(threshold * total / 2)
+    while not _clears(2.0 * m / total, threshold, inclusive):
+        m += 1
+    while m > 0 and _clears(2.0 * (m - 1) / total, threshold, inclusive):
+        m -= 1
+    return m
+
+
+class SanctionsIndex:
+    def __init__(self, entries, threshold: float = 0.75, key: str = "name", aliases_key: str = "aliases"):
+        self.entries = list(entries)
+        self.threshold = threshold
+        # Normalize once at build time instead of on every comparison
+        self.names = []
+        self.owners = []  # name id -> entry id
+        for idx, entry in enumerate(self.entries):
+            for name in [entry.get(key) or ""] + list(entry.get(aliases_key) or []):
+                self.names.append(normalize_name(name))
+                self.owners.append(idx)
+        self.by_length = defaultdict(list)
+        # gram -> name length -> name ids, so each length bucket can be
+        # probed with its own shared-bigram requirement
+        self.postings = defaultdict(lambda: defaultdict(list))
+        self.blocks = defaultdict(list)  # phonetic key -> name ids
+        for idx, name in enumerate(self.names):
+            self.by_length[len(name)].append(idx)
+            for key in _gram_keys(name):
+                self.postings[key][len(name)].append(idx)
+            self.blocks[phonetic_key(name)].append(idx)
+        # query length -> {candidate length: required shared bigrams}
+        self._requirements = {}
+
+    @classmethod
+    def from_arrays(cls, entries, names, owners, by_length, postings, blocks, threshold: float = 0.75):
+        """
+        Index over prebuilt structures: `names` / `owners` sequences indexed by
+        name id, `by_length` {length: name ids}, `postings`
+        {gram: {length: name ids}} and `blocks` {phonetic key: name ids},
+        id sequences in ascending order.
+        """
+        index = cls.__new__(cls)
+        index.entries = entries
+        index.threshold = threshold
+        index.names = names
+        index.owners = owners
+        index.by_length = by_length
+        index.postings = postings
+        index.blocks = blocks
+        index._requirements = {}
+        return index
+
+    def __len__(self):
+        return len(self.entries)
+
+    def candidates(self, query: str, floor: float = None):
+        """
+        Name ids (in list order) that may clear the threshold against a
+        normalized query, or reach `floor` (a ratio already found) if given.
+        """
+        return sorted(self._candidate_bounds(query, floor))
+
+    def _candidate_bounds(self, query: str, floor: float = None):
+        """{name id: upper bound on its ratio} for the ids candidates() returns."""
+        keys = _gram_keys(query)
+        la = len(query)
+        bounds = {}
+        # 1. Length filter (cached per query length at the threshold)
+        if floor is None:
+            requirements = self._requirements_for(len(query))
+        else:
+            requirements = self._requirements_at(len(query), floor, inclusive=True)
+        for lb, k in requirements.items():
+            if k <= 0:
+                # Short names cannot be pruned by bigrams; take the whole bucket
+                bounds.update(dict.fromkeys(self.by_length.get(lb, ()), _ratio_bound(la, lb)))
+                continue
+            postings = sorted((self._posting(key, lb) for key in keys), key=len)
+            # 2. Prefix filter: a name sharing >= k keys is in one of the
+            # len(keys) - k + 1 rarest posting lists
+            prefix = len(postings) - k + 1
+            if prefix <= 0 or not any(postings[:prefix]):
+                continue
+            # 3. Exact count filter: tally every probed list, then keep the
+            # prefix members that reach k shared bigrams
+            shared = Counter()
+            for posting in postings:
+                shared.update(posting)
+            for posting in postings[:prefix]:
+                for idx in posting:
+                    if shared[idx] >= k and idx not in bounds:
+                        bounds[idx] = _ratio_bound(la, lb, shared[idx])
+        return bounds
+
+    def _requirements_for(self, la: int):
+        """Length filter plus shared-bigram requirement per candidate length, cached per query length."""
+        required = self._requirements.get(la)
+        if required is None:
+            required = self._requirements_at(la, self.threshold)
+            self._requirements[la] = required
+        return required
+
+    def _requirements_at(self, la: int, threshold: float, inclusive: bool = False):
+        required = {}
+        for lb in self.by_length:
+            if not _clears(_max_ratio(la, lb), threshold, inclusive):
+                continue
+            total = la + lb
+            required[lb] = 3 * _min_matches(total, threshold, inclusive) - total - 1
+        return required
+
+    def _posting(self, gram: str, length: int):
+        by_len = self.postings.get(gram)
+        return by_len.get(length, ()) if by_len else ()
+
+    def best_match(self, name: str):
+        """Most similar entry above the threshold (earliest on ties), as (entry, ratio)."""
+        return self._best_match_normalized(normalize_name(name))
+
+    def best_matches(self, names):
+        """best_match for many names; each distinct normalized name is scored once."""
+        results = {}
+        out = []
+        for name in names:
+            query = normalize_name(name)
+            if query not in results:
+                results[query] = self._best_match_normalized(query)
+            out.append(results[query])
+        return out
+
+    def _best_match_normalized(self, query: str):
+        # 1. Exact-key blocking: phonetically identical names
+        block = self.blocks.get(phonetic_key(query))
+        best = self._score(query, block) if block else None
+        # 2. Fuzzy search through the bigram index. A block hit below 1.0 only
+        # seeds the floor; a better name outside the block still wins.
+        if best is None or best[1] < 1.0:
+            bounds = self._candidate_bounds(query, best[1] if best else None)
+            # Most promising names first: the floor rises early and the bounds prune the rest
+            ids = sorted(bounds, key=lambda i: (-bounds[i], i))
+            best = self._score(query, ids, best, bounds)
+        if best is None:
+            return None, 0.0
+        idx, similarity = best
+        return self.entries[self.owners[idx]], similarity
+
+    def _score(self, query: str, ids, best=None, bounds=None):
+        """
+        (name id, ratio) of the best name in `ids` that clears the threshold,
+        else `best`: a (name id, ratio) already found elsewhere, which an
+        equal ratio only displaces from an earlier name id. `bounds` maps ids
+        to ratio upper bounds checked before a name is decoded.
+        """
+        floor = best[1] if best else self.threshold
+        for idx in ids:
+            # Ties go to the earliest name, so an equal ratio only counts before `best`
+            tie_wins = best is not None and idx < best[0]
+            if bounds is not None:
+                bound = bounds[idx]
+                if bound < floor or (bound == floor and not tie_wins):
+                    continue
+            matcher = difflib.SequenceMatcher(None, query, self.names[idx])
+            bound = matcher.real_quick_ratio()
+            if bound < floor or (bound == floor and not tie_wins):
+                continue
+            bound = matcher.quick_ratio()
+            if bound < floor or (bound == floor and not tie_wins):
+                continue
+            similarity = matcher.ratio()
+            if similarity > floor or (similarity == floor and tie_wins):
+                best, floor = (idx, similarity), similarity
+                if similarity == 1.0:
+                    break
+        return best
@@ -0,0 +1,339 @@
+"""Compiled, memory-mapped sanctions list.
+
+`compile_snapshot` turns source CSVs (id, name, country, type and an optional
+`aliases` column, ';'-separated) into one binary file holding the normalized
+names, aliases, entries, the bigram postings and the phonetic blocks of
+SanctionsIndex. Workers
+mmap it read-only: startup does no parsing or index building, and the pages
+are shared by every process on the host through the page cache.
+
+The file is written to a temp path and moved into place with os.replace, so
+readers see either the old or the new snapshot. SanctionsStore re-checks the
+file every SANCTIONS_RELOAD_INTERVAL_SECONDS and swaps to a new one without a
+restart.
+
+Layout (little-endian, u32 unless noted):
+    header   magic(8s) format(u16) normalizer(u16) entries names buckets
+             postings blocks, then u64 offsets of each section below
+    entries  id, name, country, type as (pool offset, byte length) pairs
+    names    pool offset, byte length, entry id       (one per name/alias)
+    buckets  name length, start, count                (into ids)
+    postings gram offset, gram length, name length, start, count
+    blocks   phonetic key offset, key length, start, count
+    ids      name ids, grouped per bucket / posting / block
+    pool     UTF-8 strings
+"""
+import csv
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from collections import defaultdict
+from config.config import settings
+from .sanctions_index import SanctionsIndex, NORMALIZER_VERSION, _gram_keys
+from .name_normalization import normalize_name, phonetic_key
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SNCTSNAP"
+FORMAT_VERSION = 3
+
+_HEADER = struct.Struct("<8sHHIIIII7Q")
+_ENTRY = struct.Struct("<8I")
+_NAME = struct.Struct("<3I")
+_BUCKET = struct.Struct("<3I")
+_POSTING = struct.Struct("<5I")
+_BLOCK = struct.Struct("<4I")
+
+_BASE_DIR = os.path.join(os.path.dirname(__file__), "..")
+
+
+def _resolve(path: str) -> str:
+    return path if os.path.isabs(path) else os.path.normpath(os.path.join(_BASE_DIR, path))
+
+
+def _unpack_header(buf, path: str):
+    if len(buf) < _HEADER.size or buf[:8] != MAGIC or struct.unpack_from("<H", buf, 8)[0] != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a sanctions snapshot (format {FORMAT_VERSION})")
+    return _HEADER.unpack_from(buf)
+
+
+def read_normalizer_version(path: str) -> int:
+    """Normalizer version a snapshot was built with, read from its header alone."""
+    path = _resolve(path)
+    with open(path, "rb") as f:
+        return _unpack_header(f.read(_HEADER.size), path)[2]
+
+
+def read_source(path: str):
+    """Entries from a source CSV as dicts with id, name, country, type, aliases."""
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            name = (row.get("name") or "").strip()
+            if not name:
+                continue
+            yield {
+                "id": (row.get("id") or "").strip(),
+                "name": name,
+                "country": (row.get("country") or "").strip(),
+                "type": (row.get("type") or "").strip(),
+                "aliases": [a.strip() for a in (row.get("aliases") or "").split(";") if a.strip()],
+            }
+
+
+class _Pool:
+    def __init__(self):
+        self.data = bytearray()
+        self._offsets = {}
+
+    def add(self, s: str):
+        off = self._offsets.get(s)
+        raw = s.encode("utf-8")
+        if off is None:
+            off = self._offsets[s] = len(self.data)
+            self.data += raw
+        return off, len(raw)
+
+
+def compile_snapshot(sources, out_path: str):
+    """Compile source CSVs into a snapshot at `out_path` (atomic replace). Returns the entry count."""
+    pool = _Pool()
+    entries = bytearray()
+    names = bytearray()
+    n_entries = n_names = 0
+    by_length = defaultdict(list)
+    postings = defaultdict(lambda: defaultdict(list))
+    blocks = defaultdict(list)
+
+    for source in sources:
+        for entry in read_source(_resolve(source)):
+            fields = []
+            for key in ("id", "name", "country", "type"):
+                fields += pool.add(entry[key])
+            entries += _ENTRY.pack(*fields)
+            for name in [entry["name"]] + entry["aliases"]:
+                normalized = normalize_name(name)
+                names += _NAME.pack(*pool.add(normalized), n_entries)
+                by_length[len(normalized)].append(n_names)
+                for key in _gram_keys(normalized):
+                    postings[key][len(normalized)].append(n_names)
+                blocks[phonetic_key(normalized)].append(n_names)
+                n_names += 1
+            n_entries += 1
+
+    ids = bytearray()
+    buckets = bytearray()
+    n_ids = 0
+    for length in sorted(by_length):
+        members = by_length[length]
+        buckets += _BUCKET.pack(length, n_ids, len(members))
+        ids += struct.pack(f"<{len(members)}I", *members)
+        n_ids += len(members)
+    posting_records = bytearray()
+    n_postings = 0
+    for gram in sorted(postings):
+        gram_off, gram_len = pool.add(gram)
+        for length, members in sorted(postings[gram].items()):
+            posting_records += _POSTING.pack(gram_off, gram_len, length, n_ids, len(members))
+            ids += struct.pack(f"<{len(members)}I", *members)
+            n_ids += len(members)
+            n_postings += 1
+    block_records = bytearray()
+    for key in sorted(blocks):
+        members = blocks[key]
+        block_records += _BLOCK.pack(*pool.add(key), n_ids, len(members))
+        ids += struct.pack(f"<{len(members)}I", *members)
+        n_ids += len(members)
+
+    sections = [entries, names, buckets, posting_records, block_records, ids, pool.data]
+    offsets = []
+    pos = _HEADER.size
+    for section in sections:
+        offsets.append(pos)
+        pos += len(section)
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, NORMALIZER_VERSION,
+                          n_entries, n_names, len(by_length), n_postings, len(blocks), *offsets)
+
+    out_path = _resolve(out_path)
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        for section in sections:
+            f.write(section)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, out_path)
+    return n_entries
+
+
+class _Strings:
+    """Sequence view decoding (offset, length) records from the string pool on access."""
+
+    def __init__(self, snapshot, records, stride: int, count: int):
+        self._s = snapshot
+        self._records = records
+        self._stride = stride
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        base = i * self._stride
+        return self._s.string(self._records[base], self._records[base + 1])
+
+
+class _Entries:
+    """Sequence view building entry dicts on access (only matched entries are materialized)."""
+
+    def __init__(self, snapshot):
+        self._s = snapshot
+
+    def __len__(self):
+        return self._s.n_entries
+
+    def __getitem__(self, i):
+        if not 0 <= i < self._s.n_entries:
+            raise IndexError(i)
+        r = self._s.entry_records
+        base = i * 8
+        return {key: self._s.string(r[base + 2 * k], r[base + 2 * k + 1])
+                for k, key in enumerate(("id", "name", "country", "type"))}
+
+
+class _Owners:
+    def __init__(self, records):
+        self._records = records
+
+    def __len__(self):
+        return len(self._records) // 3
+
+    def __getitem__(self, i):
+        return self._records[i * 3 + 2]
+
+
+class SanctionsSnapshot:
+    def __init__(self, path: str):
+        if sys.byteorder != "little":
+            raise RuntimeError("Sanctions snapshots are little-endian only")
+        self.path = _resolve(path)
+        with open(self.path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mm)
+        (_, _, self.normalizer_version, self.n_entries, self.n_names, n_buckets, n_postings, n_blocks,
+         entries_off, names_off, buckets_off, postings_off, blocks_off, ids_off, pool_off) = _unpack_header(view, self.path)
+
+        def u32(start, count):
+            return view[start:start + 4 * count].cast("I")
+
+        self._pool = view[pool_off:]
+        self.entry_records = u32(entries_off, self.n_entries * 8)
+        self.name_records = u32(names_off, self.n_names * 3)
+        ids = u32(ids_off, (pool_off - ids_off) // 4)
+
+        self.by_length = {}
+        records = u32(buckets_off, n_buckets * 3)
+        for i in range(n_buckets):
+            length, start, count = records[3 * i:3 * i + 3]
+            self.by_length[length] = ids[start:start + count]
+
+        self.postings = {}
+        records = u32(postings_off, n_postings * 5)
+        for i in range(n_postings):
+            gram_off, gram_len, length, start, count = records[5 * i:5 * i + 5]
+            self.postings.setdefault(self.string(gram_off, gram_len), {})[length] = ids[start:start + count]
+
+        self.blocks = {}
+        records = u32(blocks_off, n_blocks * 4)
+        for i in range(n_blocks):
+            key_off, key_len, start, count = records[4 * i:4 * i + 4]
+            self.blocks[self.string(key_off, key_len)] = ids[start:start + count]
+
+    def string(self, offset: int, length: int) -> str:
+        return str(self._pool[offset:offset + length], "utf-8")
+
+    def __len__(self):
+        return self.n_entries
+
+    def index(self, threshold: float) -> SanctionsIndex:
+        return SanctionsIndex.from_arrays(
+            entries=_Entries(self),
+            names=_Strings(self, self.name_records, 3, self.n_names),
+            owners=_Owners(self.name_records),
+            by_length=self.by_length,
+            postings=self.postings,
+            blocks=self.blocks,
+            threshold=threshold,
+        )
+
+
+def _stat_identity(path: str):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+class SanctionsStore:
+    """
+    Process-wide handle on the current snapshot and its index.
+    Loaded on first use; compiled from the sources first when the snapshot
+    is missing, older than a source, or built with another normalizer.
+    """
+
+    def __init__(self, snapshot_path: str = None, sources=None, threshold: float = 0.75,
+                 reload_interval: float = None):
+        self.snapshot_path = _resolve(snapshot_path or settings.SANCTIONS_SNAPSHOT_PATH)
+        self.sources = [_resolve(s) for s in (sources or settings.SANCTIONS_SOURCES.split(","))]
+        self.threshold = threshold
+        self.reload_interval = settings.SANCTIONS_RELOAD_INTERVAL_SECONDS if reload_interval is None else reload_interval
+        self._snapshot = None
+        self._index = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _stale(self):
+        identity = _stat_identity(self.snapshot_path)
+        if identity is None:
+            return True
+        mtime = os.path.getmtime(self.snapshot_path)
+        if any(os.path.exists(s) and os.path.getmtime(s) > mtime for s in self.sources):
+            return True
+        try:
+            # Header only: no mmap to leak for a file that is about to be replaced
+            return read_normalizer_version(self.snapshot_path) != NORMALIZER_VERSION
+        except ValueError:
+            return True
+
+    def _load(self):
+        if self._snapshot is None and self._stale():
+            sources = [s for s in self.sources if os.path.exists(s)]
+            count = compile_snapshot(sources, self.snapshot_path)
+            logger.info("Compiled sanctions snapshot: %d entries -> %s", count, self.snapshot_path)
+        snapshot = SanctionsSnapshot(self.snapshot_path)
+        # Swap both together; queries already running keep the old objects
+        self._snapshot, self._index = snapshot, snapshot.index(self.threshold)
+
+    def index(self) -> SanctionsIndex:
+        now = time.monotonic()
+        if self._index is None or now - self._checked >= self.reload_interval:
+            with self._lock:
+                if self._index is None:
+                    self._load()
+                elif now - self._checked >= self.reload_interval:
+                    if _stat_identity(self.snapshot_path) not in (None, self._snapshot.identity):
+                        self._load()
+                        logger.info("Reloaded sanctions snapshot: %d entries", len(self._snapshot))
+                self._checked = now
+        return self._index
+
+    def reload(self):
+        with self._lock:
+            self._load()
+            self._checked = time.monotonic()
@@ -0,0 +1,83 @@
+"""
+Async front end for compliance screening.
+
+Fuzzy matching is CPU-bound, so the API hands it to a dedicated executor
+instead of running it on the event loop or in Starlette's shared threadpool:
+threads by default (SCREENING_THREADS), or a process pool when
+SCREENING_PROCESSES is set, which lets matching use several cores. Pool
+processes map the same sanctions snapshot, so they share its pages.
+"""
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from config.config import settings
+from .sanctions_check import check_sanction_list, check_sanction_list_many, sanctions_store
+from .country_risk import get_country_risk, get_country_risks
+
+
+def screen_party(name: str, country: str):
+    """(sanctioned, reason, country_risk_score) for one counterparty."""
+    is_sanctioned, reason = check_sanction_list(name, country)
+    return is_sanctioned, reason, get_country_risk(country)
+
+
+def screen_parties(pairs):
+    """screen_party for many (name, country) pairs; risk is scored once per country."""
+    pairs = list(pairs)
+    risk_scores = get_country_risks(country for _, country in pairs)
+    return [(is_sanctioned, reason, risk_scores[country])
+            for (_, country), (is_sanctioned, reason) in zip(pairs, check_sanction_list_many(pairs))]
+
+
+def _warm():
+    # Load the snapshot in each worker up front, not on its first request
+    sanctions_store.index()
+
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def get_screening_executor():
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        with _executor_lock:
+            if _executor is None or _executor_pid != os.getpid():
+                if settings.SCREENING_PROCESSES > 0:
+                    _executor = ProcessPoolExecutor(
+                        settings.SCREENING_PROCESSES, mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_warm)
+                else:
+                    _executor = ThreadPoolExecutor(
+                        settings.SCREENING_THREADS, thread_name_prefix="screening", initializer=_warm)
+                _executor_pid = os.getpid()
+    return _executor
+
+
+async def _run(fn, *args):
+    executor = get_screening_executor()
+    if isinstance(executor, ThreadPoolExecutor):
+        # Keep contextvars so the spans land in the request's Server-Timing
+        fn = functools.partial(contextvars.copy_context().run, fn)
+    return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+
+
+async def screen(name: str, country: str):
+    return await _run(screen_party, name, country)
+
+
+async def screen_many(pairs):
+    return await _run(screen_parties, list(pairs))
+
+
+def shutdown_screening_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None and _executor_pid == os.getpid():
+            _executor.shutdown(wait=True)
+        _executor = None
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict
+from typing import Optional
 
 class Settings(BaseSettings):
     model_config = ConfigDict(env_file=".env", extra="ignore")
@@ -9,11 +10,48 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str = "sqlite:///./politifolio.db"
+    DB_POOL_SIZE: int = 8
+    DB_POOL_MAX_OVERFLOW: int = 16
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_BUSY_TIMEOUT_MS: int = 5000
+    DB_MMAP_SIZE: int = 256 * 1024 * 1024
+    DB_CACHE_SIZE_KB: int = 64 * 1024
+    DB_WRITE_BATCH_MAX: int = 256  # API writes grouped into one commit by the writer thread
 
     # XRP Ledger
     XRPL_NODE_URL: str = "wss://s.altnet.rippletest.net:51233"
     GEO_PULSE_ISSUER_SEED: str = ""
     GEO_PULSE_CURRENCY_CODE: str = "GEO"
+    XRPL_MAX_CONNECTIONS: int = 20
+    XRPL_REQUEST_TIMEOUT: float = 10.0
+
+    # XRPL submission outbox
+    OUTBOX_BATCH_SIZE: int = 50
+    OUTBOX_MAX_ATTEMPTS: int = 10
+    OUTBOX_RETRY_DELAY_SECONDS: int = 5
+
+    # Reconciliation sweep
+    RECONCILE_CHUNK_SIZE: int = 500
+    RECONCILE_CONCURRENCY: int = 16
+    RECONCILE_SCAN_THRESHOLD: int = 50
+    RECONCILE_LLS_WINDOW: int = 20
+    OUTBOX_CLAIM_TIMEOUT_SECONDS: int = 300
+    ISSUER_QUEUE: str = "issuer"  # Celery queue of the one worker process that signs as the issuer
+
+    # Pipelined issuance (xrp_integration.issuance)
+    ISSUANCE_WINDOW: int = 64  # submits in flight at once
+    ISSUANCE_LLS_OFFSET: int = 20  # LastLedgerSequence = current ledger + offset
+    ISSUANCE_MAX_ROUNDS: int = 3  # re-sign rounds for payments whose Sequence was lost
+    ISSUANCE_FEE_TTL_SECONDS: float = 10.0
+    ISSUANCE_LEDGER_TTL_SECONDS: float = 2.0
+    ISSUANCE_MAX_FEE_DROPS: int = 1000
+    ISSUANCE_POLL_SECONDS: float = 0.5
+    ISSUANCE_CONFIRM_TIMEOUT_SECONDS: float = 300.0  # then open payments are reported unconfirmed, not re-signed
+    FREEZE_CHUNK_SIZE: int = 500  # trust lines per bulk freeze batch (progress is saved per batch)
+
+    # GEO holder index (token_holders), followed from the issuer's account_tx
+    HOLDER_INDEX_SYNC_SECONDS: float = 10.0
+    HOLDER_INDEX_MAX_GAP: int = 50000  # ledgers behind beyond which the index is rebuilt instead
 
     # AI / External APIs
     DEDALUS_API_KEY: str = ""
@@ -22,6 +60,71 @@ class Settings(BaseSettings):
     WORLD_NEWS_API_KEY: str = ""
     OPENAI_API_KEY: str = ""
     GEMINI_API_KEY: str = ""
+    OPENAI_BASE_URL: Optional[str] = None  # e.g. a local stub: http://127.0.0.1:5006/v1
+    OPENAI_MODEL: str = "gpt-3.5-turbo"
+    OPENAI_TIMEOUT: float = 30.0
+
+    # LLM response cache (llm_cache table, keyed by a hash of model + prompt + text)
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    LLM_CACHE_MAX_ENTRIES: int = 50000
+    LLM_CACHE_TOUCH_SECONDS: float = 300.0  # a hit refreshes last_used only if it is older than this
+    LLM_CACHE_TOUCH_BATCH: int = 256  # pending last_used updates written together
+    LLM_CACHE_EVICT_EVERY: int = 100  # puts between eviction checks
+
+    # Async LLM pipeline (API path)
+    LLM_CONCURRENCY: int = 8
+    LLM_RATE_LIMIT_RPS: float = 5.0
+    LLM_RATE_LIMIT_BURST: int = 10
+    LLM_BATCH_SIZE: int = 8
+    LLM_BATCH_WINDOW_MS: int = 20
+    LLM_BATCH_MAX_CHARS: int = 2000
+    LLM_TIMEOUT_SECONDS: float = 8.0
+
+    # Risk Engine (Monte Carlo volatility simulation)
+    RISK_SIMULATION_PATHS: int = 1
+    RISK_SIMULATION_DAYS: int = 30
+    RISK_SIMULATION_SEED: int = 0  # combined with the country code to seed its simulation
+
+    # Risk score cache (in-process LRU in front of the risk_scores table)
+    RISK_CACHE_TTL_SECONDS: int = 60
+    RISK_CACHE_MAX_ENTRIES: int = 1024
+    RISK_SCORE_MAX_AGE_SECONDS: int = 3600
+    RISK_CACHE_GENERATION_CHECK_SECONDS: float = 1.0  # how often a worker looks for another process's refresh
+
+    # Periodic refresh of every country's score (compliance.risk_refresh)
+    RISK_REFRESH_SECONDS: float = 300.0
+    RISK_UPDATE_MIN_DELTA: float = 1.0  # smaller moves leave the stored score alone
+    RISK_CHANGE_RETENTION_DAYS: int = 30  # risk_score_changes / risk_refresh_runs kept this long; 0 keeps all
+
+    # geo_events ingestion
+    INGEST_BATCH_SIZE: int = 1000
+    INGEST_DEDUP_WINDOW: int = 100000  # titles remembered by the Bloom filter
+    INGEST_BLOOM_ERROR_RATE: float = 0.001
+    EVENT_SCORING_INLINE_MAX: int = 256  # smaller scoring windows skip the process pool
+
+    # Sanctions list (comma-separated source CSVs compiled into an mmap snapshot)
+    SANCTIONS_SOURCES: str = "data/sanctions.csv"
+    SANCTIONS_SNAPSHOT_PATH: str = "data/sanctions.snapshot"
+    SANCTIONS_RELOAD_INTERVAL_SECONDS: float = 5.0
+
+    # API screening executor (fuzzy matching off the event loop); processes > 0 use a process pool
+    SCREENING_THREADS: int = 4
+    SCREENING_PROCESSES: int = 0
+    SCREENING_BATCH_CHUNK_SIZE: int = 100  # /check/batch items screened per executor hop
+
+    # Event-driven re-screening of existing transactions
+    RESCREEN_CHUNK_SIZE: int = 1000
+    RESCREEN_MIN_SEVERITY: str = "HIGH"  # ingested events below this do not trigger a re-screen
+
+    # Startup: load the sanctions snapshot and lazily imported SDKs before the first
+    # request / task (API lifespan; Celery parent before forking). Off = faster bind,
+    # slower first requests.
+    STARTUP_WARMUP: bool = True
+
+    # Instrumentation (/metrics, Server-Timing) and the per-request profiler
+    PROFILE_REQUESTS_ENABLED: bool = False  # honour the X-Profile header
+    PROFILE_SAMPLE_INTERVAL_MS: float = 5.0
+    WORKER_METRICS_PORT: int = 0  # Celery worker /metrics base port; 0 disables
 
     # Celery
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
@@ -0,0 +1,33 @@
+"""
+Process startup shared by the API (lifespan) and Celery workers (worker_init).
+
+Nothing here runs at import time: importing the app or the task modules only
+defines things. Schema migration runs once per process start, and warm_up()
+optionally does the first-use work that is otherwise deferred to the first
+request or task (sanctions snapshot, NumPy, the XRPL and OpenAI SDKs).
+"""
+import time
+from config.config import settings
+
+
+def init_schema():
+    from database.database import init_db
+    init_db()
+
+
+def warm_up():
+    """Load the lazily imported dependencies and data now. Returns the seconds it took."""
+    start = time.perf_counter()
+    from compliance.sanctions_check import sanctions_store
+    sanctions_store.index()
+    import numpy  # noqa: F401  (risk simulation)
+    # Everything the outbox needs for its first submit
+    import xrpl.models.requests  # noqa: F401
+    import xrpl.asyncio.transaction  # noqa: F401
+    import xrp_integration.issuance  # noqa: F401
+    if settings.OPENAI_API_KEY:
+        from ai.event_processing import openai_available
+        openai_available()
+    elapsed = time.perf_counter() - start
+    print(f"Warm-up done in {elapsed:.2f}s")
+    return elapsed
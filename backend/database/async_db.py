@@ -0,0 +1,182 @@
+"""
+Async access to SQLite for the API.
+
+SQLite allows one writer at a time, so every write goes through a single
+writer thread that owns its own connection. Writes queued while it is busy
+are applied together: each runs in its own SAVEPOINT (a failing write is
+rolled back alone) and the group shares one COMMIT, so a burst of requests
+costs one fsync instead of one per request. Reads run on a small thread pool
+over the regular connection pool (WAL readers do not block the writer).
+
+    row = await adb.read(lambda conn: conn.execute(...).fetchone())
+    tx = await adb.write(enqueue_payment, destination, amount, ...)
+
+Functions receive the connection as their first argument. Both calls keep
+the caller's contextvars, so spans still reach the request's Server-Timing.
+
+If the writer thread dies (e.g. it cannot open its connection), every write
+queued to it fails with that error and the next write() starts a new writer.
+"""
+import asyncio
+import contextvars
+import functools
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config.config import settings
+from .database import db_connection, get_connection
+
+_STOP = object()
+
+
+def _resolve(future, result, error):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class AsyncDatabase:
+    def __init__(self, read_threads: int = None, max_batch: int = None):
+        self.read_threads = read_threads or settings.DB_POOL_SIZE
+        self.max_batch = max_batch or settings.DB_WRITE_BATCH_MAX
+        self._lock = threading.Lock()
+        self._pid = None
+        self._readers = None
+        self._queue = None
+        self._writer = None
+
+    def _start(self):
+        # Threads do not survive a fork; start fresh in each process
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            self._start_locked()
+
+    def _start_locked(self):
+        if self._pid != os.getpid():
+            self._readers = ThreadPoolExecutor(self.read_threads, thread_name_prefix="db-read")
+            self._writer = None
+            self._pid = os.getpid()
+        if self._writer is None:
+            # First write, or the previous writer died: new thread, new queue
+            self._queue = queue.SimpleQueue()
+            self._writer = threading.Thread(target=self._write_loop, args=(self._queue,), name="db-writer",
+                                            daemon=True)
+            self._writer.start()
+
+    async def read(self, fn, *args, **kwargs):
+        """Run fn(conn, *args, **kwargs) on a reader thread."""
+        self._start()
+        ctx = contextvars.copy_context()
+        call = functools.partial(ctx.run, self._read, fn, args, kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self._readers, call)
+
+    @staticmethod
+    def _read(fn, args, kwargs):
+        with db_connection() as conn:
+            return fn(conn, *args, **kwargs)
+
+    async def write(self, fn, *args, **kwargs):
+        """Run fn(conn, *args, **kwargs) on the writer thread; returns once it is committed."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        # Under the lock, so a write never lands on the queue of a writer that just died
+        with self._lock:
+            self._start_locked()
+            self._queue.put((fn, args, kwargs, contextvars.copy_context(), loop, future))
+        return await future
+
+    def _write_loop(self, jobs):
+        conn = None
+        batch = []
+        try:
+            conn = get_connection()
+            while True:
+                item = jobs.get()
+                if item is _STOP:
+                    return
+                batch = [item]
+                while len(batch) < self.max_batch:
+                    try:
+                        item = jobs.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        self._apply(conn, batch)
+                        return
+                    batch.append(item)
+                self._apply(conn, batch)
+                batch = []
+        except Exception as e:
+            print(f"DB writer stopped: {e}")
+            with self._lock:
+                if self._queue is jobs:
+                    self._writer = None  # the next write() starts a fresh writer
+            # Nothing else can reach this queue now: fail what is in it
+            while True:
+                try:
+                    item = jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _STOP:
+                    batch.append(item)
+            self._fail(batch, e)
+        finally:
+            if conn is not None:
+                conn.close()
+
+    @staticmethod
+    def _fail(batch, error):
+        for _, _, _, _, loop, future in batch:
+            try:
+                loop.call_soon_threadsafe(_resolve, future, None, error)
+            except RuntimeError:
+                pass  # caller's loop already closed
+
+    def _apply(self, conn, batch):
+        outcomes = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for fn, args, kwargs, ctx, loop, future in batch:
+                conn.execute("SAVEPOINT write")
+                try:
+                    result = ctx.run(fn, conn, *args, **kwargs)
+                    conn.execute("RELEASE write")
+                    outcomes.append((loop, future, result, None))
+                except Exception as e:
+                    conn.execute("ROLLBACK TO write")
+                    conn.execute("RELEASE write")
+                    outcomes.append((loop, future, None, e))
+            conn.commit()
+        except Exception as e:
+            # BEGIN or COMMIT failed (e.g. busy past the timeout): nothing in the group was written
+            if conn.in_transaction:
+                conn.rollback()
+            print(f"DB writer error: {e}")
+            outcomes = [(loop, future, None, e) for _, _, _, _, loop, future in batch]
+        for loop, future, result, error in outcomes:
+            try:
+                loop.call_soon_threadsafe(_resolve, future, result, error)
+            except RuntimeError:
+                pass  # caller's loop already closed
+
+    def close(self):
+        """Stop the writer after the queued writes and release the reader threads."""
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            writer, readers = self._writer, self._readers
+            if writer is not None:
+                self._queue.put(_STOP)
+            self._writer = None
+            self._pid = None
+        if writer is not None:
+            writer.join()
+        readers.shutdown(wait=True)
+
+
+adb = AsyncDatabase()
@@ -1,109 +1,176 @@
 """SQLite database - no SQLAlchemy."""
+import os
 import sqlite3
+import threading
+import time
 from contextlib import contextmanager
 from config.config import settings
+from .migrations import migrate
 
 # Parse sqlite:///./path.db -> ./path.db
 _db_path = settings.DATABASE_URL.replace("sqlite:///", "").strip("/") or "politifolio.db"
 
 
 def get_connection():
-    return sqlite3.connect(_db_path)
+    """Open a new connection configured for concurrent use (WAL, busy timeout)."""
+    conn = sqlite3.connect(_db_path, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={int(settings.DB_BUSY_TIMEOUT_MS)}")
+    conn.execute(f"PRAGMA mmap_size={int(settings.DB_MMAP_SIZE)}")
+    conn.execute(f"PRAGMA cache_size=-{int(settings.DB_CACHE_SIZE_KB)}")
+    return conn
+
+
+class ConnectionPool:
+    """
+    Bounded pool of SQLite connections.
+    Keeps up to `size` idle connections, opens up to `max_overflow` extra ones
+    under load (closed on release) and blocks for `timeout` seconds beyond that.
+    Each thread gets back the connection it used last when it is still idle,
+    and nested db_connection() blocks in one thread share a single connection.
+    """
+
+    def __init__(self, size: int, max_overflow: int, timeout: float):
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._idle = []  # LIFO so the warmest connection is reused first
+        self._open = 0
+
+    def _check_fork(self):
+        # Connections must not cross a fork (Celery prefork, gunicorn); start over in the child
+        if self._pid != os.getpid():
+            with self._cond:
+                self._reset()
+                self._local = threading.local()
+
+    def acquire(self):
+        self._check_fork()
+        preferred = getattr(self._local, "last", None)
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    if preferred is not None and preferred in self._idle:
+                        self._idle.remove(preferred)
+                        conn = preferred
+                    else:
+                        conn = self._idle.pop()
+                    break
+                if self._open < self.size + self.max_overflow:
+                    self._open += 1
+                    conn = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise sqlite3.OperationalError("database connection pool exhausted")
+                self._cond.wait(remaining)
+
+        conn = self._checkout(conn)
+        self._local.last = conn
+        return conn
+
+    def _checkout(self, conn):
+        if conn is not None:
+            # Health check: replace connections that no longer answer
+            try:
+                conn.execute("SELECT 1")
+                return conn
+            except sqlite3.Error:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+        try:
+            return get_connection()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, conn, commit: bool = True):
+        """Return a connection; commits first unless `commit` is False (then rolls back)."""
+        try:
+            if commit:
+                conn.commit()
+        finally:
+            self._return(conn)
+
+    def _return(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            healthy = True
+        except sqlite3.Error:
+            healthy = False
+        with self._cond:
+            if healthy and len(self._idle) < self.size and self._pid == os.getpid():
+                self._idle.append(conn)
+                conn = None
+            else:
+                self._open -= 1
+            self._cond.notify()
+        if conn is not None:
+            conn.close()
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for this thread; nested calls reuse it and only the outermost commits."""
+        self._check_fork()
+        held = getattr(self._local, "held", None)
+        if held is not None:
+            yield held
+            return
+        conn = self.acquire()
+        self._local.held = conn
+        ok = False
+        try:
+            yield conn
+            ok = True
+        finally:
+            self._local.held = None
+            self.release(conn, commit=ok)
+
+    def close_all(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+        for conn in idle:
+            conn.close()
+
+
+pool = ConnectionPool(settings.DB_POOL_SIZE, settings.DB_POOL_MAX_OVERFLOW, settings.DB_POOL_TIMEOUT)
 
 
 @contextmanager
 def db_connection():
-    """Context manager for scripts (demo, tasks)."""
-    conn = get_connection()
-    conn.row_factory = sqlite3.Row
-    try:
+    """Context manager for scripts (demo, tasks). Pooled; commits on success, rolls back on error."""
+    with pool.connection() as conn:
         yield conn
-        conn.commit()
-    finally:
-        conn.close()
 
 
 def get_db():
-    """FastAPI dependency - yields sqlite3 connection."""
-    conn = get_connection()
-    conn.row_factory = sqlite3.Row
+    """FastAPI dependency - yields a pooled sqlite3 connection."""
+    # Not thread-bound: FastAPI may enter and exit this generator on different threads
+    conn = pool.acquire()
+    ok = False
     try:
         yield conn
-        conn.commit()
+        ok = True
     finally:
-        conn.close()
+        pool.release(conn, commit=ok)
 
 
 def init_db():
-    """Create tables if they don't exist."""
+    """Bring the schema up to date (see database.migrations)."""
     with db_connection() as conn:
-        conn.executescript("""
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                hashed_password TEXT NOT NULL,
-                is_active INTEGER DEFAULT 1
-            );
-            CREATE TABLE IF NOT EXISTS risk_scores (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                country_code TEXT UNIQUE NOT NULL,
-                score REAL NOT NULL,
-                last_updated TEXT DEFAULT CURRENT_TIMESTAMP,
-                details TEXT
-            );
-            CREATE TABLE IF NOT EXISTS sanctions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                entity_name TEXT NOT NULL,
-                country TEXT NOT NULL,
-                list_source TEXT,
-                added_date TEXT DEFAULT CURRENT_TIMESTAMP,
-                active INTEGER DEFAULT 1
-            );
-            CREATE TABLE IF NOT EXISTS transactions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                tx_hash TEXT UNIQUE NOT NULL,
-                sender TEXT NOT NULL,
-                receiver TEXT NOT NULL,
-                amount TEXT NOT NULL,
-                currency TEXT NOT NULL,
-                status TEXT NOT NULL,
-                compliance_check_passed INTEGER DEFAULT 0,
-                risk_score_at_time REAL,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP
-            );
-            CREATE TABLE IF NOT EXISTS geo_events (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                type TEXT NOT NULL,
-                severity TEXT NOT NULL,
-                title TEXT NOT NULL,
-                description TEXT,
-                country TEXT NOT NULL,
-                affected_transactions INTEGER DEFAULT 0,
-                source TEXT
-            );
-            CREATE TABLE IF NOT EXISTS reconciliation_tasks (
-                id TEXT PRIMARY KEY,
-                event_type TEXT NOT NULL,
-                triggered_by TEXT NOT NULL,
-                status TEXT NOT NULL,
-                transactions_scanned INTEGER DEFAULT 0,
-                transactions_flagged INTEGER DEFAULT 0,
-                transactions_reconciled INTEGER DEFAULT 0,
-                start_time TEXT NOT NULL,
-                completion_time TEXT,
-                estimated_savings REAL DEFAULT 0,
-                assigned_to TEXT,
-                priority TEXT
-            );
-            CREATE TABLE IF NOT EXISTS key_events (
-                id TEXT PRIMARY KEY,
-                timestamp TEXT NOT NULL,
-                news TEXT,
-                dedalus TEXT,
-                reasoning TEXT,
-                estimates TEXT,
-                rebalance TEXT
-            );
-        """)
+        migrate(conn)
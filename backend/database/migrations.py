@@ -0,0 +1,277 @@
+"""Versioned schema migrations for the SQLite database.
+
+Each migration is (version, name, sql) and runs at most once; applied
+versions are recorded in schema_migrations. Append new migrations to the
+end of MIGRATIONS with the next version number - never edit one that has
+already shipped.
+"""
+import sqlite3
+
+MIGRATIONS = [
+    (1, "initial schema", """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            hashed_password TEXT NOT NULL,
+            is_active INTEGER DEFAULT 1
+        );
+        CREATE TABLE IF NOT EXISTS risk_scores (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            country_code TEXT UNIQUE NOT NULL,
+            score REAL NOT NULL,
+            last_updated TEXT DEFAULT CURRENT_TIMESTAMP,
+            details TEXT
+        );
+        CREATE TABLE IF NOT EXISTS sanctions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            entity_name TEXT NOT NULL,
+            country TEXT NOT NULL,
+            list_source TEXT,
+            added_date TEXT DEFAULT CURRENT_TIMESTAMP,
+            active INTEGER DEFAULT 1
+        );
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tx_hash TEXT UNIQUE NOT NULL,
+            sender TEXT NOT NULL,
+            receiver TEXT NOT NULL,
+            amount TEXT NOT NULL,
+            currency TEXT NOT NULL,
+            status TEXT NOT NULL,
+            compliance_check_passed INTEGER DEFAULT 0,
+            risk_score_at_time REAL,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE IF NOT EXISTS geo_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            type TEXT NOT NULL,
+            severity TEXT NOT NULL,
+            title TEXT NOT NULL,
+            description TEXT,
+            country TEXT NOT NULL,
+            affected_transactions INTEGER DEFAULT 0,
+            source TEXT
+        );
+        CREATE TABLE IF NOT EXISTS reconciliation_tasks (
+            id TEXT PRIMARY KEY,
+            event_type TEXT NOT NULL,
+            triggered_by TEXT NOT NULL,
+            status TEXT NOT NULL,
+            transactions_scanned INTEGER DEFAULT 0,
+            transactions_flagged INTEGER DEFAULT 0,
+            transactions_reconciled INTEGER DEFAULT 0,
+            start_time TEXT NOT NULL,
+            completion_time TEXT,
+            estimated_savings REAL DEFAULT 0,
+            assigned_to TEXT,
+            priority TEXT
+        );
+        CREATE TABLE IF NOT EXISTS key_events (
+            id TEXT PRIMARY KEY,
+            timestamp TEXT NOT NULL,
+            news TEXT,
+            dedalus TEXT,
+            reasoning TEXT,
+            estimates TEXT,
+            rebalance TEXT
+        );
+    """),
+    (2, "hot path indexes", """
+        -- Reconciliation sweep: only rows still waiting on the ledger
+        CREATE INDEX IF NOT EXISTS idx_transactions_submitted
+            ON transactions (id) WHERE status = 'submitted';
+        -- Dashboards: latest events, optionally per country
+        CREATE INDEX IF NOT EXISTS idx_geo_events_timestamp
+            ON geo_events (timestamp);
+        CREATE INDEX IF NOT EXISTS idx_geo_events_country_timestamp
+            ON geo_events (country, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_reconciliation_tasks_start_time
+            ON reconciliation_tasks (start_time);
+        CREATE INDEX IF NOT EXISTS idx_key_events_timestamp
+            ON key_events (timestamp);
+    """),
+    (3, "transaction outbox", """
+        -- Payment details and signing state for the XRPL submission outbox
+        ALTER TABLE transactions ADD COLUMN destination TEXT;
+        ALTER TABLE transactions ADD COLUMN signed_blob TEXT;
+        ALTER TABLE transactions ADD COLUMN sequence INTEGER;
+        ALTER TABLE transactions ADD COLUMN last_ledger_sequence INTEGER;
+        ALTER TABLE transactions ADD COLUMN submit_attempts INTEGER DEFAULT 0;
+        ALTER TABLE transactions ADD COLUMN last_error TEXT;
+        ALTER TABLE transactions ADD COLUMN updated_at TEXT;
+        CREATE INDEX IF NOT EXISTS idx_transactions_pending_submission
+            ON transactions (id) WHERE status = 'pending_submission';
+        CREATE INDEX IF NOT EXISTS idx_transactions_submitting
+            ON transactions (updated_at) WHERE status = 'submitting';
+    """),
+    (4, "llm response cache", """
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            cache_key TEXT PRIMARY KEY,
+            model TEXT NOT NULL,
+            response TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_used REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache (last_used);
+    """),
+    (5, "geo event dedup", """
+        -- Hash of the normalized title + country; duplicates are dropped on ingest
+        ALTER TABLE geo_events ADD COLUMN content_hash TEXT;
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_geo_events_content_hash
+            ON geo_events (content_hash) WHERE content_hash IS NOT NULL;
+    """),
+    (6, "counterparty screening", """
+        -- Counterparty countries so an event can find the transactions it affects
+        ALTER TABLE transactions ADD COLUMN sender_country TEXT;
+        ALTER TABLE transactions ADD COLUMN receiver_country TEXT;
+        CREATE INDEX IF NOT EXISTS idx_transactions_receiver_country
+            ON transactions (receiver_country);
+        CREATE INDEX IF NOT EXISTS idx_transactions_sender_country
+            ON transactions (sender_country);
+        CREATE INDEX IF NOT EXISTS idx_transactions_receiver
+            ON transactions (receiver);
+        CREATE TABLE IF NOT EXISTS transaction_flags (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_id TEXT NOT NULL,
+            transaction_id INTEGER NOT NULL,
+            geo_event_id INTEGER,
+            reason TEXT NOT NULL,
+            risk_score REAL,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS idx_transaction_flags_transaction
+            ON transaction_flags (transaction_id);
+    """),
+    (7, "token holder index", """
+        -- Local copy of the issuer's trust lines (xrp_integration.holders)
+        CREATE TABLE IF NOT EXISTS token_holders (
+            account TEXT NOT NULL,
+            currency TEXT NOT NULL,
+            balance TEXT NOT NULL,  -- decimal string, from the holder's side
+            frozen INTEGER NOT NULL DEFAULT 0,  -- frozen by the issuer
+            last_ledger INTEGER NOT NULL,  -- validated ledger of the last change
+            PRIMARY KEY (account, currency)
+        );
+        CREATE INDEX IF NOT EXISTS idx_token_holders_frozen
+            ON token_holders (currency, account) WHERE frozen = 1;
+        -- Validated ledger each index reflects; the sync resumes after it
+        CREATE TABLE IF NOT EXISTS holder_index_state (
+            currency TEXT PRIMARY KEY,
+            issuer TEXT NOT NULL,
+            ledger_index INTEGER NOT NULL,
+            rebuilt_at TEXT,
+            updated_at TEXT
+        );
+    """),
+    (8, "risk score refresh", """
+        -- One row per refresh run; a full run's unchanged rows count as fresh as of its started_at
+        CREATE TABLE IF NOT EXISTS risk_refresh_runs (
+            id TEXT PRIMARY KEY,
+            started_at TEXT NOT NULL,
+            finished_at TEXT,
+            full_universe INTEGER DEFAULT 0,
+            countries INTEGER DEFAULT 0,
+            changed INTEGER DEFAULT 0
+        );
+        -- Change events for downstream consumers (poll by id)
+        CREATE TABLE IF NOT EXISTS risk_score_changes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id TEXT NOT NULL,
+            country_code TEXT NOT NULL,
+            old_score REAL,
+            new_score REAL NOT NULL,
+            changed_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS idx_risk_score_changes_country
+            ON risk_score_changes (country_code, id);
+    """),
+    (9, "cache generations", """
+        -- Bumped by writers; in-process caches in every worker drop their entries when it moves
+        CREATE TABLE IF NOT EXISTS cache_generations (
+            name TEXT PRIMARY KEY,
+            generation INTEGER NOT NULL DEFAULT 0
+        );
+    """),
+    (10, "unique event flags", """
+        -- Re-running a re-screen for the same event must not flag a transaction twice
+        DELETE FROM transaction_flags WHERE geo_event_id IS NOT NULL AND id NOT IN (
+            SELECT MIN(id) FROM transaction_flags WHERE geo_event_id IS NOT NULL
+            GROUP BY geo_event_id, transaction_id);
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_transaction_flags_event_transaction
+            ON transaction_flags (geo_event_id, transaction_id);
+    """),
+    (11, "risk change retention", """
+        -- The refresh prunes change events and runs older than RISK_CHANGE_RETENTION_DAYS
+        CREATE INDEX IF NOT EXISTS idx_risk_score_changes_changed_at
+            ON risk_score_changes (changed_at);
+        CREATE INDEX IF NOT EXISTS idx_risk_refresh_runs_started_at
+            ON risk_refresh_runs (started_at);
+    """),
+]
+
+
+def _statements(script: str):
+    """Split a script into single statements so they can run inside one transaction."""
+    buf = ""
+    for line in script.splitlines(keepends=True):
+        buf += line
+        if sqlite3.complete_statement(buf):
+            stmt = buf.strip()
+            if stmt and stmt != ";":
+                yield stmt
+            buf = ""
+    if buf.strip():
+        raise ValueError(f"Incomplete SQL statement in migration: {buf.strip()[:80]}")
+
+
+def current_version(conn) -> int:
+    row = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'schema_migrations'"
+    ).fetchone()
+    if not row:
+        return 0
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations").fetchone()[0]
+
+
+def migrate(conn, migrations=MIGRATIONS):
+    """
+    Apply pending migrations in version order, all in one IMMEDIATE transaction
+    so concurrent workers starting up do not apply the same version twice.
+    Returns the list of versions applied.
+    """
+    if conn.in_transaction:
+        conn.commit()
+    previous_isolation = conn.isolation_level
+    conn.isolation_level = None  # manage BEGIN/COMMIT explicitly
+    applied = []
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    applied_at TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            done = {r[0] for r in conn.execute("SELECT version FROM schema_migrations")}
+            for version, name, sql in sorted(migrations, key=lambda m: m[0]):
+                if version in done:
+                    continue
+                for stmt in _statements(sql):
+                    conn.execute(stmt)
+                conn.execute(
+                    "INSERT INTO schema_migrations (version, name) VALUES (?, ?)", (version, name)
+                )
+                applied.append(version)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.isolation_level = previous_isolation
+    if applied:
+        print(f"Applied database migrations: {applied}")
+    return applied
@@ -1,5 +1,17 @@
 """Schema and helpers for SQLite - no SQLAlchemy."""
-# Tables: users, risk_scores, sanctions, transactions (see database.init_db)
+# Tables: users, risk_scores, sanctions, transactions, geo_events (see database.migrations)
+from observability.metrics import timed
+
+TRANSACTION_COLUMNS = (
+    "tx_hash", "sender", "receiver", "amount", "currency", "status",
+    "compliance_check_passed", "risk_score_at_time", "destination",
+    "sender_country", "receiver_country",
+)
+
+_INSERT_TRANSACTION_SQL = (
+    f"INSERT INTO transactions ({', '.join(TRANSACTION_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(TRANSACTION_COLUMNS))})"
+)
 
 
 def row_to_dict(row):
@@ -7,13 +19,69 @@ def row_to_dict(row):
     return dict(row) if row else None
 
 
+def _transaction_params(tx_hash, sender, receiver, amount, currency, status,
+                        compliance_check_passed=True, risk_score_at_time=None, destination=None,
+                        sender_country=None, receiver_country=None):
+    return (tx_hash, sender, receiver, amount, currency, status,
+            1 if compliance_check_passed else 0, risk_score_at_time, destination,
+            sender_country.upper() if sender_country else None,
+            receiver_country.upper() if receiver_country else None)
+
+
+@timed("db.insert_transaction")
 def insert_transaction(conn, tx_hash, sender, receiver, amount, currency, status,
-                      compliance_check_passed=True, risk_score_at_time=None):
-    conn.execute(
-        """INSERT INTO transactions (tx_hash, sender, receiver, amount, currency, status, compliance_check_passed, risk_score_at_time)
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-        (tx_hash, sender, receiver, amount, currency, status, 1 if compliance_check_passed else 0, risk_score_at_time),
+                      compliance_check_passed=True, risk_score_at_time=None, destination=None,
+                      sender_country=None, receiver_country=None):
+    # Single round trip: RETURNING hands back the generated id and defaults
+    params = _transaction_params(tx_hash, sender, receiver, amount, currency, status,
+                                 compliance_check_passed, risk_score_at_time, destination,
+                                 sender_country, receiver_country)
+    row = conn.execute(
+        _INSERT_TRANSACTION_SQL + " RETURNING id, created_at", params
+    ).fetchone()
+    if not row:
+        return None
+    result = {"id": row[0]}
+    result.update(zip(TRANSACTION_COLUMNS, params))
+    result["created_at"] = row[1]
+    return result
+
+
+@timed("db.insert_transactions")
+def insert_transactions(conn, transactions):
+    """
+    Bulk insert for imports and replays. `transactions` yields dicts with the
+    insert_transaction keyword arguments. All rows go in one executemany in the
+    connection's current transaction (committed by db_connection/get_db).
+    Returns the number of rows inserted.
+    """
+    cur = conn.executemany(
+        _INSERT_TRANSACTION_SQL,
+        (_transaction_params(**tx) for tx in transactions),
     )
-    tid = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
-    row = conn.execute("SELECT * FROM transactions WHERE id = ?", (tid,)).fetchone()
-    return dict(row) if row else None
+    return cur.rowcount
+
+
+GEO_EVENT_COLUMNS = (
+    "timestamp", "type", "severity", "title", "description", "country",
+    "affected_transactions", "source", "content_hash",
+)
+
+_INSERT_GEO_EVENT_SQL = (
+    f"INSERT OR IGNORE INTO geo_events ({', '.join(GEO_EVENT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(GEO_EVENT_COLUMNS))})"
+)
+
+
+@timed("db.insert_geo_events")
+def insert_geo_events(conn, events):
+    """
+    Bulk insert of geo_events dicts (keys from GEO_EVENT_COLUMNS; missing keys
+    are NULL). Rows whose content_hash already exists are skipped.
+    Returns the number of rows inserted.
+    """
+    cur = conn.executemany(
+        _INSERT_GEO_EVENT_SQL,
+        (tuple(e.get(c) for c in GEO_EVENT_COLUMNS) for e in events),
+    )
+    return cur.rowcount
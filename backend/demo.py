@@ -68,7 +68,8 @@ def run_demo():
             from database.models import insert_transaction
             insert_transaction(
                 conn, tx_hash, sender, receiver, "100", "GEO",
-                "submitted", compliance_check_passed=True, risk_score_at_time=risk_score
+                "submitted", compliance_check_passed=True, risk_score_at_time=risk_score,
+                receiver_country=receiver_country
             )
             print("Transaction logged to Database.")
 
@@ -79,7 +80,7 @@ def run_demo():
     print("\n5. Running Reconciliation Logic...")
     with db_connection() as conn:
         pending = conn.execute(
-            "SELECT * FROM transactions WHERE status = ?", ("submitted",)
+            "SELECT * FROM transactions WHERE status = 'submitted'"
         ).fetchall()
         print(f"Found {len(pending)} pending transactions.")
         for row in pending:
@@ -0,0 +1,187 @@
+"""
+In-process latency metrics in the Prometheus text format.
+
+    with span("sanctions.check"):
+        ...
+
+    @timed("risk.calculate_risk_scores")
+    def calculate_risk_scores(...): ...
+
+Every span observes `politifolio_span_duration_seconds{span="..."}` and counts
+`politifolio_span_errors_total` when the block raises. Spans run inside an API
+request are also collected for its `Server-Timing` header (api/instrumentation.py).
+Metrics are per process: the API serves them at /metrics, Celery workers on
+WORKER_METRICS_PORT (tasks/celery_app.py).
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Seconds; covers sub-millisecond index lookups up to ledger validation waits
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 2)
+            series[i] += 1
+            series[-1] += value
+
+    def collect(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            snapshot = {k: list(v) for k, v in self._series.items()}
+        for values, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                le = bound if bound == "+Inf" else repr(float(bound))
+                yield f"{self.name}_bucket{_labels(self.labelnames + ('le',), values + (le,))} {cumulative}"
+            yield f"{self.name}_count{_labels(self.labelnames, values)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, values)} {series[-1]:.6f}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount: float = 1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def collect(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            snapshot = dict(self._values)
+        for values, value in sorted(snapshot.items()):
+            yield f"{self.name}{_labels(self.labelnames, values)} {value}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(line for m in metrics for line in m.collect()) + "\n"
+
+
+registry = Registry()
+
+SPAN_SECONDS = registry.register(Histogram(
+    "politifolio_span_duration_seconds", "Duration of instrumented stages.", ["span"]))
+SPAN_ERRORS = registry.register(Counter(
+    "politifolio_span_errors_total", "Instrumented stages that raised.", ["span"]))
+
+# Spans of the current API request (a list) for the Server-Timing header; None outside requests
+request_spans = contextvars.ContextVar("request_spans", default=None)
+
+
+class span:
+    """Times a block as a named stage. Usable as `with span(name):` in sync and async code."""
+
+    __slots__ = ("name", "_start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._start
+        SPAN_SECONDS.observe(elapsed, self.name)
+        if exc_type is not None:
+            SPAN_ERRORS.inc(self.name)
+        collected = request_spans.get()
+        if collected is not None:
+            collected.append((self.name, elapsed))
+        return False
+
+
+def timed(name: str):
+    """Decorator form of span() for sync and async functions."""
+    def decorate(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0", attempts: int = 1):
+    """
+    Serve this process' metrics over HTTP from a daemon thread (for processes
+    without the API, e.g. Celery workers). Tries `attempts` consecutive ports
+    starting at `port`; returns the bound port, or None if all were taken.
+    """
+    for candidate in range(port, port + attempts):
+        try:
+            server = ThreadingHTTPServer((host, candidate), _MetricsHandler)
+        except OSError:
+            continue
+        threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+        return candidate
+    return None
@@ -0,0 +1,65 @@
+"""
+Opt-in sampling profiler for single API requests.
+
+A daemon thread snapshots every thread's stack (sys._current_frames) each
+PROFILE_SAMPLE_INTERVAL_MS while the request runs and counts the stacks in
+collapsed form ("module:function;module:function count"), which flamegraph.pl
+and speedscope read directly. Sampling sees the whole process, so concurrent
+requests show up too; profile on a quiet instance.
+"""
+import os
+import sys
+import threading
+from collections import Counter
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}"
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = 0.005, max_depth: int = 64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        own = threading.get_ident()
+        while True:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+            if self._stop.wait(self.interval):
+                break
+
+    def start(self):
+        self._thread = threading.Thread(target=self._sample, name="request-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def collapsed(self, limit: int = None) -> str:
+        """Collapsed stacks, most frequent first."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common(limit))
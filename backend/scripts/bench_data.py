@@ -0,0 +1,96 @@
+"""Synthetic data generators for the benchmark suite (scripts/bench_suite.py).
+
+Everything is seeded, so two runs produce the same lists, queries and texts.
+"""
+import csv
+import random
+
+_SYLLABLES = [
+    "al", "an", "ar", "ba", "da", "del", "en", "far", "ga", "ha", "ib", "in", "ka", "kim", "la",
+    "li", "ma", "mo", "mu", "na", "nov", "ol", "ov", "pa", "ra", "ro", "sa", "sha", "son", "ta",
+    "tin", "va", "vich", "wa", "ya", "yu", "za", "zo",
+]
+_ORG_WORDS = ["TRADING", "SHIPPING", "GROUP", "BANK", "HOLDING", "INDUSTRIES", "EXCHANGE", "CAPITAL"]
+_SUFFIXES = ["LLC", "LTD", "JSC", "GMBH", "INC"]
+_COUNTRIES = ["RU", "IR", "NK", "SY", "VE", "CU", "CN", "AF", "BY", "online"]
+_TYPES = ["Individual", "Organization", "Vessel", "Exchange"]
+
+COUNTRY_CODES = ["US", "UK", "FR", "DE", "JP", "CN", "RU", "NK", "IR", "VE", "BR", "TR", "NG", "IN", "MX"]
+
+_HEADLINES = [
+    "New sanctions imposed on {c} energy exports",
+    "{c} central bank announces rate decision",
+    "Money laundering investigation expands in {c}",
+    "Trade embargo on {c} extended for another year",
+    "Election results in {c} spark protests and fears of war",
+    "Record harvest boosts {c} agricultural output",
+    "Corruption probe targets {c} ministry officials",
+    "{c} signs new trade agreement with neighbours",
+]
+
+
+def _word(rng, parts=(2, 3)):
+    return "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(*parts))).upper()
+
+
+def sanctions_rows(n: int, seed: int = 1):
+    """n list entries: person names, organisations with legal suffixes, some aliases."""
+    rng = random.Random(seed)
+    for i in range(n):
+        if rng.random() < 0.6:
+            name = " ".join(_word(rng) for _ in range(rng.randint(2, 3)))
+        else:
+            name = f"{_word(rng)} {rng.choice(_ORG_WORDS)} {rng.choice(_SUFFIXES)}"
+        aliases = [" ".join(reversed(name.split()))] if rng.random() < 0.1 else []
+        yield {"id": str(i + 1), "name": name, "country": rng.choice(_COUNTRIES),
+               "type": rng.choice(_TYPES), "aliases": ";".join(aliases)}
+
+
+def write_sanctions_csv(path: str, n: int, seed: int = 1):
+    rows = list(sanctions_rows(n, seed))
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["id", "name", "country", "type", "aliases"])
+        writer.writeheader()
+        writer.writerows(rows)
+    return rows
+
+
+def screening_queries(rows, n: int, seed: int = 2):
+    """Mix of typo'd list names, reordered list names and names that are not on the list."""
+    rng = random.Random(seed)
+    queries = []
+    for i in range(n):
+        kind = i % 3
+        if kind == 2 or not rows:
+            queries.append(f"{_word(rng)} {_word(rng)}".title())
+            continue
+        name = rng.choice(rows)["name"]
+        if kind == 0:
+            chars = list(name)
+            pos = rng.randrange(len(chars))
+            chars[pos] = rng.choice("AEIOUKSTR")
+            queries.append("".join(chars).title())
+        else:
+            queries.append(" ".join(reversed(name.split())).lower())
+    return queries
+
+
+def transaction_rows(n: int, prefix: str, status: str = "submitted", seed: int = 3):
+    rng = random.Random(seed)
+    for i in range(n):
+        yield {
+            "tx_hash": f"{prefix}_{i}", "sender": "Alice", "receiver": _word(rng).title(),
+            "amount": str(rng.randint(1, 1000)), "currency": "GEO", "status": status,
+            "compliance_check_passed": True, "risk_score_at_time": round(rng.uniform(0, 80), 2),
+            "sender_country": "US", "receiver_country": rng.choice(COUNTRY_CODES),
+        }
+
+
+def news_texts(n: int, seed: int = 4):
+    rng = random.Random(seed)
+    countries = ["Russia", "Iran", "France", "Brazil", "China", "Venezuela", "Japan", "Nigeria"]
+    return [
+        rng.choice(_HEADLINES).format(c=rng.choice(countries))
+        + f". Analysts said the move could affect markets (report {i})."
+        for i in range(n)
+    ]
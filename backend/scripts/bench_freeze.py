@@ -0,0 +1,130 @@
+"""Bulk trust line freeze vs one freeze_trustline call per holder, on the stub ledger.
+
+    python scripts/bench_freeze.py                      # 2000 GEO holders, 500 of them in the sanctioned country
+    python scripts/bench_freeze.py --holders 10000 --affected 3000 --latency 0.05
+
+The stub issuer gets `--holders` trust lines. Transactions link `--affected`
+of them to the sanctioned country, and a tenth of those are already frozen.
+The per-holder baseline (submit_and_wait per line) runs on a small sample and
+is extrapolated. bulk_freeze then freezes the whole country. The script
+checks the final freeze flags on the ledger, that already-frozen lines were
+not touched, and the reconciliation_tasks progress row. Finally it unfreezes
+everything again.
+"""
+import sys
+import os
+import argparse
+import asyncio
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from xrpl.wallet import Wallet
+from stub_rippled import start_stub
+
+COUNTRY = "IR"
+
+
+def setup(args):
+    ledger, server, url = start_stub(close_interval=args.close_interval, latency=args.latency)
+    issuer = Wallet.create()
+    os.chdir(tempfile.mkdtemp(prefix="politifolio-freeze-"))  # DATABASE_URL paths are relative
+    os.environ.update({"DATABASE_URL": "sqlite:///./freeze.db", "XRPL_NODE_URL": url,
+                       "GEO_PULSE_ISSUER_SEED": issuer.seed, "OPENAI_API_KEY": ""})
+    from database.database import init_db, db_connection
+    from database.models import insert_transactions
+    init_db()
+
+    # Addresses only need to be valid; deriving a few thousand wallets is the slow part
+    holders = [Wallet.create().classic_address for _ in range(args.holders)]
+    affected = holders[:args.affected]
+    already_frozen = set(affected[:args.affected // 10])
+    for holder in holders:
+        ledger.add_trust_line(issuer.classic_address, holder, "GEO", balance="100",
+                              freeze=holder in already_frozen)
+    rows = [dict(tx_hash=f"seed_{i}", sender="Issuer", receiver=f"Holder {i}", amount="100", currency="GEO",
+                 status="success", destination=holder, receiver_country=COUNTRY if holder in affected else "FR")
+            for i, holder in enumerate(holders)]
+    with db_connection() as conn:
+        insert_transactions(conn, rows)
+    return ledger, server, issuer, holders, affected, already_frozen
+
+
+def frozen_on_ledger(ledger, issuer: str):
+    with ledger.lock:
+        return {holder for (i, holder, _), line in ledger.lines.items() if i == issuer and line["freeze"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--holders", type=int, default=2000)
+    parser.add_argument("--affected", type=int, default=500)
+    parser.add_argument("--close-interval", type=float, default=1.0, help="stub ledger close interval (s)")
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated round trip to the node (s)")
+    parser.add_argument("--baseline-sample", type=int, default=5, help="holders frozen one call at a time")
+    args = parser.parse_args()
+
+    ledger, server, issuer, holders, affected, already_frozen = setup(args)
+    from database.database import db_connection
+    from xrp_integration.freeze import bulk_freeze
+    from xrp_integration.token_controller import get_token_controller
+    from xrp_integration.xrp_utils import close_async_client
+    controller = get_token_controller()
+    print(f"{args.holders} holders, {args.affected} in {COUNTRY} ({len(already_frozen)} already frozen), "
+          f"ledger close every {args.close_interval}s, {args.latency * 1000:.0f} ms round trip")
+
+    # Baseline: one freeze_trustline (autofill + submit_and_wait) per holder, then undo
+    sample = [h for h in affected if h not in already_frozen][:args.baseline_sample]
+    start = time.perf_counter()
+    for holder in sample:
+        controller.freeze_trustline(holder, True)
+    per_line = (time.perf_counter() - start) / max(len(sample), 1)
+    for holder in sample:
+        controller.freeze_trustline(holder, False)
+    to_change = len(affected) - len(already_frozen)
+    print(f"freeze_trustline:  {per_line:.2f} s per line -> ~{per_line * to_change / 60:.1f} min for {to_change} lines")
+
+    async def run(freeze: bool):
+        try:
+            return await bulk_freeze(country=COUNTRY, freeze=freeze)
+        finally:
+            await close_async_client()
+
+    calls_before = sum(ledger.calls.values())
+    start = time.perf_counter()
+    summary = asyncio.run(run(True))
+    elapsed = time.perf_counter() - start
+    rpcs = sum(ledger.calls.values()) - calls_before
+    print(f"bulk_freeze:       {elapsed:.1f} s for {summary['changed']} lines "
+          f"({summary['changed'] / elapsed:.1f} lines/s, {rpcs} RPCs, "
+          f"{ledger.calls['account_lines']} account_lines pages)")
+    print(f"                   {summary}")
+
+    frozen = frozen_on_ledger(ledger, issuer.classic_address)
+    with db_connection() as conn:
+        task = dict(conn.execute("SELECT * FROM reconciliation_tasks WHERE id = ?", (summary["task_id"],)).fetchone())
+    print(f"                   task {task['id']}: {task['status']}, scanned {task['transactions_scanned']}, "
+          f"flagged {task['transactions_flagged']}, reconciled {task['transactions_reconciled']}")
+    problems = []
+    if frozen != set(affected):
+        problems.append(f"frozen lines differ from the affected set ({len(frozen)} vs {len(affected)})")
+    if summary["targeted"] != to_change:
+        problems.append(f"targeted {summary['targeted']} lines, expected {to_change} (already frozen not skipped?)")
+
+    summary = asyncio.run(run(False))
+    print(f"bulk unfreeze:     {summary}")
+    if frozen_on_ledger(ledger, issuer.classic_address):
+        problems.append("lines still frozen after the bulk unfreeze")
+
+    server.shutdown()
+    ledger.stop()
+    if problems:
+        print("\nFAILED:\n  " + "\n  ".join(problems))
+        sys.exit(1)
+    print("\nOK: exactly the affected lines were frozen, then unfrozen")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Holder index: build, incremental sync and query latency against the stub ledger.
+
+    python scripts/bench_holders.py                     # 5000 GEO holders
+    python scripts/bench_holders.py --holders 20000 --latency 0.05
+
+Seeds the stub issuer with `--holders` trust lines and builds the index with
+one account_lines scan. Then it changes the ledger through the issuance
+engine (GEO payments to existing and new holders, USD payments that must be
+ignored, bulk freezes) and syncs from account_tx. The index must equal the
+ledger's GEO lines after the sync, again after replaying already-indexed
+ledgers, and again after a sync whose account_tx entries lack ledger_index
+(the index's last_ledger column is NOT NULL). Finally, one holder lookup from the index is timed against a live
+account_lines scan.
+"""
+import sys
+import os
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from xrpl.wallet import Wallet
+from stub_rippled import start_stub
+
+
+def drop_ledger_index(ledger, every: int):
+    """Leave ledger_index out of every `every`-th account_tx entry, as some servers do."""
+    handler = ledger.rpc_account_tx
+
+    def without(params):
+        result = handler(params)
+        for i, entry in enumerate(result.get("transactions", [])):
+            if i % every == 0:
+                entry.pop("ledger_index", None)
+        return result
+    ledger.rpc_account_tx = without
+    return handler
+
+
+def ledger_view(ledger, issuer: str):
+    with ledger.lock:
+        return {holder: (format(line["balance"].normalize(), "f"), int(line["freeze"]))
+                for (i, holder, currency), line in ledger.lines.items() if i == issuer and currency == "GEO"}
+
+
+def index_view():
+    from database.database import db_connection
+    with db_connection() as conn:
+        rows = conn.execute("SELECT account, balance, frozen FROM token_holders WHERE currency = 'GEO'").fetchall()
+    return {r["account"]: (format(Decimal(r["balance"]).normalize(), "f"), r["frozen"]) for r in rows}
+
+
+def compare(label, ledger, issuer):
+    expected, actual = ledger_view(ledger, issuer), index_view()
+    wrong = {a for a in expected.keys() | actual.keys() if expected.get(a) != actual.get(a)}
+    print(f"{label:<36} {len(actual)} holders in the index, {len(wrong)} differ from the ledger")
+    return not wrong
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--holders", type=int, default=5000)
+    parser.add_argument("--changes", type=int, default=300, help="payments and freezes between build and sync")
+    parser.add_argument("--close-interval", type=float, default=0.5, help="stub ledger close interval (s)")
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated round trip to the node (s)")
+    args = parser.parse_args()
+
+    ledger, server, url = start_stub(close_interval=args.close_interval, queue_limit=10, latency=args.latency)
+    issuer = Wallet.create()
+    os.chdir(tempfile.mkdtemp(prefix="politifolio-holders-"))  # DATABASE_URL paths are relative
+    os.environ.update({"DATABASE_URL": "sqlite:///./holders.db", "XRPL_NODE_URL": url,
+                       "GEO_PULSE_ISSUER_SEED": issuer.seed, "OPENAI_API_KEY": ""})
+    from database.database import init_db, db_connection
+    init_db()
+    from xrp_integration.holders import rebuild_holder_index, sync_holder_index, get_holder
+    from xrp_integration.issuance import get_issuance_engine
+    from xrp_integration.token_controller import get_token_controller, scan_trust_lines
+    from xrp_integration.xrp_utils import get_async_client, close_async_client
+
+    rng = random.Random(7)
+    holders = [Wallet.create().classic_address for _ in range(args.holders)]
+    for holder in holders:
+        ledger.add_trust_line(issuer.classic_address, holder, "GEO", balance=rng.randint(1, 10_000),
+                              freeze=rng.random() < 0.02)
+    print(f"{args.holders} GEO holders, ledger close every {args.close_interval}s, "
+          f"{args.latency * 1000:.0f} ms round trip")
+
+    async def run():
+        client = await get_async_client()
+        ok = True
+        try:
+            start = time.perf_counter()
+            count = await rebuild_holder_index(client)
+            print(f"{'rebuild (account_lines scan)':<36} {count} holders in {time.perf_counter() - start:.2f} s, "
+                  f"{ledger.calls['account_lines']} pages")
+            ok &= compare("after rebuild", ledger, issuer.classic_address)
+
+            # Ledger activity the index has not seen yet
+            controller = get_token_controller()
+            engine = get_issuance_engine()
+            newcomers = [Wallet.create().classic_address for _ in range(args.changes // 10)]
+            payments = [{"destination": rng.choice(holders), "amount": str(rng.randint(1, 500)), "currency": "GEO"}
+                        for _ in range(args.changes)]
+            payments += [{"destination": n, "amount": "25", "currency": "GEO"} for n in newcomers]
+            payments += [{"destination": rng.choice(holders), "amount": "7", "currency": "USD"}
+                         for _ in range(args.changes // 10)]
+            await engine.issue(payments, client)
+            to_freeze = rng.sample(holders, args.changes // 5)
+            await engine.submit_batch([{"account": a} for a in to_freeze],
+                                      lambda t: controller.build_trust_set(t["account"], True), client)
+
+            start = time.perf_counter()
+            summary = await sync_holder_index(client)
+            print(f"{'sync (account_tx since last ledger)':<36} {summary['transactions']} transactions, "
+                  f"{summary['changes']} line changes in {time.perf_counter() - start:.2f} s")
+            ok &= compare("after sync", ledger, issuer.classic_address)
+
+            # Replaying ledgers that are already indexed must not change anything
+            with db_connection() as conn:
+                conn.execute("UPDATE holder_index_state SET ledger_index = ledger_index - 20")
+            summary = await sync_holder_index(client)
+            ok &= compare(f"after replaying {summary['transactions']} transactions", ledger, issuer.classic_address)
+
+            # Entries without ledger_index still land in the index, in order
+            await engine.issue([{"destination": rng.choice(holders), "amount": str(rng.randint(1, 500)),
+                                 "currency": "GEO"} for _ in range(args.changes // 10)], client)
+            await engine.submit_batch([{"account": a} for a in to_freeze[:args.changes // 20]],
+                                      lambda t: controller.build_trust_set(t["account"], False), client)
+            handler = drop_ledger_index(ledger, 2)
+            try:
+                summary = await sync_holder_index(client)
+            finally:
+                ledger.rpc_account_tx = handler
+            ok &= compare("after a sync lacking ledger_index", ledger, issuer.classic_address)
+
+            # Query latency: index vs ledger
+            target = rng.choice(holders)
+            start = time.perf_counter()
+            for _ in range(100):
+                with db_connection() as conn:
+                    get_holder(conn, target)
+            local = (time.perf_counter() - start) / 100
+            start = time.perf_counter()
+            lines = await scan_trust_lines(client, issuer.classic_address, "GEO")
+            next(line for line in lines if line["account"] == target)
+            live = time.perf_counter() - start
+            print(f"{'holder lookup':<36} index {local * 1e6:.0f} us, live account_lines scan {live * 1000:.0f} ms")
+        finally:
+            await close_async_client()
+        return ok
+
+    ok = asyncio.run(run())
+    server.shutdown()
+    ledger.stop()
+    if not ok:
+        print("\nFAILED: the index does not match the ledger")
+        sys.exit(1)
+    print("\nOK: the index matches the ledger")
+
+
+if __name__ == "__main__":
+    main()
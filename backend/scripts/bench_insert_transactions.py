@@ -0,0 +1,55 @@
+"""Benchmark transaction inserts (rows/sec). Run: python scripts/bench_insert_transactions.py [rows]
+
+Compares the per-request path (insert_transaction + commit per row) with the
+bulk path (insert_transactions, one executemany and one commit). Uses a
+throwaway database, never the configured one.
+"""
+import sys
+import os
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# DATABASE_URL paths are relative, so run from a scratch directory
+_tmp = tempfile.mkdtemp(prefix="politifolio-bench-")
+os.chdir(_tmp)
+os.environ["DATABASE_URL"] = "sqlite:///./bench.db"
+
+from database.database import init_db, db_connection
+from database.models import insert_transaction, insert_transactions
+
+
+def _rows(n, prefix):
+    for i in range(n):
+        yield {
+            "tx_hash": f"{prefix}_{i}", "sender": "Alice", "receiver": "Bob",
+            "amount": "100", "currency": "GEO", "status": "submitted",
+            "compliance_check_passed": True, "risk_score_at_time": 42.0,
+        }
+
+
+def bench_single(n):
+    start = time.perf_counter()
+    for row in _rows(n, "single"):
+        with db_connection() as conn:
+            insert_transaction(conn, **row)
+    return n / (time.perf_counter() - start)
+
+
+def bench_bulk(n):
+    start = time.perf_counter()
+    with db_connection() as conn:
+        insert_transactions(conn, _rows(n, "bulk"))
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    init_db()
+    print(f"--- insert benchmark ({n} rows, db: {_tmp}) ---")
+    print(f"insert_transaction (commit per row): {bench_single(n):,.0f} rows/sec")
+    print(f"insert_transactions (executemany):   {bench_bulk(n):,.0f} rows/sec")
+
+
+if __name__ == "__main__":
+    main()
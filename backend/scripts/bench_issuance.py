@@ -0,0 +1,181 @@
+"""Issuance throughput: serial autofill + submit vs the pipelined IssuanceEngine.
+
+    python scripts/bench_issuance.py                    # 300 payments, 1 s ledgers, 20 ms RTT
+    python scripts/bench_issuance.py --payments 1000 --close-interval 3.5 --latency 0.05
+
+Both runs go against scripts/stub_rippled.py. The serial baseline is what the
+outbox used to do per row: autofill_and_sign, SubmitOnly, and the next row
+only after that. The engine runs twice: on a plain stub, and on one that holds
+out-of-order Sequences (terQUEUED, --queue-limit). During each engine run
+another signer takes a few issuer Sequences (--inject), so the engine also has
+to recover from tefPAST_SEQ. A third engine run fails every `--flaky`-th
+account_tx page, so confirmation must not re-sign payments a partial scan
+missed.
+
+Every run checks that each payment was validated exactly once, and prints
+payments/s, RPCs per payment and how many ledgers the batch spanned.
+"""
+import sys
+import os
+import argparse
+import asyncio
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from xrpl.wallet import Wallet
+from stub_rippled import start_stub
+
+CURRENCIES = ["GEO", "USD", "PULSE"]
+
+
+def make_payments(count: int):
+    destination = Wallet.create().classic_address
+    # Unique amounts make "validated exactly once" checkable from the ledger alone
+    return [{"destination": destination, "amount": str(i + 1), "currency": CURRENCIES[i % len(CURRENCIES)]}
+            for i in range(count)]
+
+
+def inject_foreign_sequences(ledger, account: str, after_submits: int, count: int):
+    """Once `after_submits` submits have arrived, consume `count` Sequences as another signer would."""
+    def run():
+        while ledger.calls["submit"] < after_submits:
+            time.sleep(0.005)
+        with ledger.lock:
+            ledger.sequences[account] = ledger.sequences.setdefault(account, 1) + count
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def make_account_tx_flaky(ledger, every: int):
+    """Fail every `every`-th account_tx request, as a node under load might."""
+    handler = ledger.rpc_account_tx
+
+    def flaky(params):
+        if ledger.calls["account_tx"] % every == 0:
+            return {"error": "tooBusy", "error_message": "The server is too busy to help you now.", "status": "error"}
+        return handler(params)
+    ledger.rpc_account_tx = flaky
+
+
+def verify(ledger, payments, account: str, since_ledger: int):
+    """(missing, duplicated, ledgers spanned) for the validated Payments of this run."""
+    from xrp_integration.token_controller import encode_currency
+    seen = Counter()
+    ledgers = set()
+    with ledger.lock:
+        entries = list(ledger.transactions.values())
+    for entry in entries:
+        tx = entry["tx_json"]
+        if entry["ledger_index"] is None or entry["ledger_index"] < since_ledger or tx["Account"] != account:
+            continue
+        seen[(tx["Amount"]["currency"], tx["Amount"]["value"])] += 1
+        ledgers.add(entry["ledger_index"])
+    expected = Counter((encode_currency(p["currency"]), p["amount"]) for p in payments)
+    missing = sum(1 for key in expected if seen[key] == 0)
+    duplicated = sum(seen[key] - 1 for key in expected if seen[key] > 1)
+    return missing, duplicated, (max(ledgers) - min(ledgers) + 1) if ledgers else 0
+
+
+async def wait_validated(ledger, hashes, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with ledger.lock:
+            if all(ledger.transactions.get(h, {}).get("ledger_index") for h in hashes):
+                return
+        await asyncio.sleep(0.05)
+
+
+async def run_serial(ledger, controller, client, payments):
+    from xrpl.asyncio.transaction import autofill_and_sign
+    from xrpl.models.requests import SubmitOnly
+    hashes = []
+    for p in payments:
+        signed = await autofill_and_sign(
+            controller.build_payment(p["destination"], p["amount"], p["currency"]), client, controller.wallet)
+        await client.request(SubmitOnly(tx_blob=signed.blob()))
+        hashes.append(signed.get_hash())
+    await wait_validated(ledger, hashes)
+
+
+async def run_engine(ledger, controller, client, payments, inject: int, window: int, flaky: int = 0):
+    from xrp_integration.issuance import IssuanceEngine
+    if flaky:
+        make_account_tx_flaky(ledger, flaky)
+    engine = IssuanceEngine(controller, window=window, poll_interval=ledger.close_interval / 5)
+    if inject:
+        inject_foreign_sequences(ledger, controller.wallet.classic_address, len(payments) // 2, inject)
+    results = await engine.issue(payments, client=client)
+    statuses = Counter(r["status"] for r in results)
+    return engine.stats, statuses
+
+
+def measure(label, args, queue_limit: int, runner):
+    from xrp_integration.token_controller import TokenController
+    from xrp_integration.xrp_utils import PooledAsyncJsonRpcClient
+    ledger, server, url = start_stub(close_interval=args.close_interval, queue_limit=queue_limit,
+                                     latency=args.latency)
+    controller = TokenController()
+    controller.wallet = Wallet.create()
+    payments = make_payments(args.payments)
+
+    async def go():
+        client = PooledAsyncJsonRpcClient(url, max_connections=args.window)
+        try:
+            start = time.perf_counter()
+            extra = await runner(ledger, controller, client, payments)
+            return time.perf_counter() - start, extra
+        finally:
+            await client.close()
+
+    since = ledger.validated_index + 1
+    calls_before = sum(ledger.calls.values())
+    elapsed, extra = asyncio.run(go())
+    rpcs = sum(ledger.calls.values()) - calls_before
+    missing, duplicated, spanned = verify(ledger, payments, controller.wallet.classic_address, since)
+    server.shutdown()
+    ledger.stop()
+    print(f"{label:<28} {args.payments / elapsed:>9.1f} {rpcs / args.payments:>8.2f} {spanned:>8} "
+          f"{elapsed:>8.2f} {missing:>8} {duplicated:>6}")
+    if extra:
+        stats, statuses = extra
+        print(f"{'':<28} statuses {dict(statuses)}  stats {stats}")
+    return missing == 0 and duplicated == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--payments", type=int, default=300)
+    parser.add_argument("--close-interval", type=float, default=1.0, help="stub ledger close interval (s)")
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated round trip to the node (s)")
+    parser.add_argument("--queue-limit", type=int, default=10, help="terQUEUED depth for the second engine run")
+    parser.add_argument("--window", type=int, default=64, help="submits in flight for the engine")
+    parser.add_argument("--inject", type=int, default=3, help="issuer Sequences taken by another signer mid-run")
+    parser.add_argument("--flaky", type=int, default=3, help="fail every n-th account_tx in the third engine run")
+    parser.add_argument("--skip-serial", action="store_true")
+    args = parser.parse_args()
+
+    print(f"{args.payments} payments, ledger close every {args.close_interval}s, "
+          f"{args.latency * 1000:.0f} ms round trip")
+    print(f"{'run':<28} {'pay/s':>9} {'RPC/pay':>8} {'ledgers':>8} {'seconds':>8} {'missing':>8} {'dupes':>6}")
+    ok = True
+    if not args.skip_serial:
+        ok &= measure("serial autofill+submit", args, 0, run_serial)
+    ok &= measure("engine", args, 0,
+                  lambda *a: run_engine(*a, inject=args.inject, window=args.window))
+    ok &= measure(f"engine, queue {args.queue_limit}", args, args.queue_limit,
+                  lambda *a: run_engine(*a, inject=args.inject, window=args.window))
+    ok &= measure(f"engine, 1/{args.flaky} account_tx fail", args, 0,
+                  lambda *a: run_engine(*a, inject=args.inject, window=args.window, flaky=args.flaky))
+    if not ok:
+        print("\nFAILED: a payment was lost or validated twice")
+        sys.exit(1)
+    print("\nOK: every payment validated exactly once")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Risk score refresh: per-row SELECT + INSERT/UPDATE loop vs refresh_risk_scores.
+
+    python scripts/bench_risk_refresh.py                # 250 jurisdictions
+    python scripts/bench_risk_refresh.py --countries 1000 --runs 5
+
+risk_scores is seeded with `--countries` codes (the knowledge base plus
+generated ones). The old loop and refresh_risk_scores then each rescore all
+of them `--runs` times. The script checks that:
+- a first refresh writes every score and one change event per write;
+- later refreshes of unchanged inputs write nothing, and never a move
+  below RISK_UPDATE_MIN_DELTA;
+- rows the refresh left alone are still fresh to the score cache;
+- a run that fails while scoring leaves no risk_refresh_runs row;
+- change events older than RISK_CHANGE_RETENTION_DAYS are pruned, and a
+  consumer paging with after_id across the prune sees new events (ids
+  are not reused) and is told when it missed pruned ones.
+"""
+import sys
+import os
+import argparse
+import itertools
+import string
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def legacy_update(conn, countries, scores):
+    """The previous tasks.risk_update_task loop: one SELECT, then an INSERT or UPDATE, per country."""
+    for country, new_score in zip(countries, scores):
+        row = conn.execute("SELECT id FROM risk_scores WHERE country_code = ?", (country,)).fetchone()
+        if not row:
+            conn.execute("INSERT INTO risk_scores (country_code, score) VALUES (?, ?)", (country, new_score))
+        else:
+            conn.execute("UPDATE risk_scores SET score = ?, last_updated = CURRENT_TIMESTAMP WHERE id = ?",
+                         (new_score, row["id"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--countries", type=int, default=250)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="politifolio-risk-"))  # DATABASE_URL paths are relative
+    os.environ.update({"DATABASE_URL": "sqlite:///./risk.db", "OPENAI_API_KEY": ""})
+    from config.config import settings
+    from database.database import init_db, db_connection
+    init_db()
+    from ai.risk_assessment import calculate_risk_scores
+    from compliance.risk_cache import RiskScoreCache
+    from compliance import risk_refresh
+    from compliance.risk_refresh import refresh_risk_scores, risk_universe, score_change_page
+
+    with db_connection() as conn:
+        known = set(risk_universe(conn))
+    extra = ("".join(p) for p in itertools.product(string.ascii_uppercase, repeat=2))
+    generated = [c for c in extra if c not in known][:max(args.countries - len(known), 0)]
+    with db_connection() as conn:
+        conn.executemany("INSERT INTO risk_scores (country_code, score) VALUES (?, 0)", [(c,) for c in generated])
+        universe = risk_universe(conn)
+    # The first legacy run inserts every row; time the steady state after it
+    with db_connection() as conn:
+        conn.execute("DELETE FROM risk_scores")
+    print(f"{len(universe)} jurisdictions, RISK_UPDATE_MIN_DELTA={settings.RISK_UPDATE_MIN_DELTA}")
+
+    problems = []
+    legacy = []
+    for _ in range(args.runs + 1):
+        start = time.perf_counter()
+        scores = calculate_risk_scores(universe)
+        with db_connection() as conn:
+            legacy_update(conn, universe, scores)
+        legacy.append(time.perf_counter() - start)
+    print(f"{'per-row loop':<22} {min(legacy[1:]) * 1000:7.1f} ms per run, {len(universe)} rows written each time")
+
+    with db_connection() as conn:
+        conn.execute("DELETE FROM risk_scores")
+    summary = refresh_risk_scores(universe)  # empty table: name the codes, later runs find them
+    if summary["countries"] != len(universe) or summary["changed"] != len(universe):
+        problems.append(f"first refresh: {summary['changed']} of {summary['countries']} written, "
+                        f"expected all {len(universe)}")
+
+    timings, written = [], []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        summary = refresh_risk_scores()
+        timings.append(time.perf_counter() - start)
+        written.append(summary["changed"])
+        small = [c for c in summary["changes"] if c[1] is not None and abs(c[2] - c[1]) < settings.RISK_UPDATE_MIN_DELTA]
+        if small:
+            problems.append(f"{len(small)} moves below the delta were written")
+    print(f"{'refresh_risk_scores':<22} {min(timings) * 1000:7.1f} ms per run, "
+          f"{sum(written) / len(written):.0f} rows written on average")
+    if any(written):
+        problems.append(f"refreshes of unchanged inputs wrote {written} rows")
+
+    with db_connection() as conn:
+        events = conn.execute("SELECT COUNT(*) FROM risk_score_changes").fetchone()[0]
+        runs = conn.execute("SELECT SUM(changed) FROM risk_refresh_runs").fetchone()[0]
+        # Pretend every row was last written two hours ago; the last full run still vouches for them
+        conn.execute("UPDATE risk_scores SET last_updated = datetime('now', '-2 hours')")
+        stored = {r["country_code"]: r["score"] for r in conn.execute("SELECT country_code, score FROM risk_scores")}
+    if events != runs:
+        problems.append(f"{events} change events for {runs} written rows")
+    cached = RiskScoreCache(max_age=3600).get_many(universe)
+    if cached != stored:
+        problems.append("the score cache re-simulated rows the refresh had checked")
+    print(f"{'change events':<22} {events} rows in risk_score_changes")
+
+    def failing_scores(codes):
+        raise RuntimeError("simulated scoring failure")
+    risk_refresh.calculate_risk_scores, scoring = failing_scores, risk_refresh.calculate_risk_scores
+    try:
+        refresh_risk_scores()
+        problems.append("the simulated scoring failure was not raised")
+    except RuntimeError:
+        pass
+    finally:
+        risk_refresh.calculate_risk_scores = scoring
+    with db_connection() as conn:
+        orphans = conn.execute("SELECT COUNT(*) FROM risk_refresh_runs WHERE finished_at IS NULL").fetchone()[0]
+        runs_before = conn.execute("SELECT COUNT(*) FROM risk_refresh_runs").fetchone()[0]
+        if orphans:
+            problems.append(f"{orphans} unfinished risk_refresh_runs rows")
+        # Two consumers: one read a single page, the other every event
+        behind = score_change_page(conn, 0, 100)["next_after_id"]
+        caught_up = score_change_page(conn, behind, 1000)["next_after_id"]
+        # Age every event and run past the retention window; the next refresh drops them
+        past = f"-{settings.RISK_CHANGE_RETENTION_DAYS + 1} days"
+        conn.execute("UPDATE risk_score_changes SET changed_at = datetime('now', ?)", (past,))
+        conn.execute("UPDATE risk_refresh_runs SET started_at = datetime('now', ?)", (past,))
+    summary = refresh_risk_scores()
+    with db_connection() as conn:
+        kept = conn.execute("SELECT COUNT(*) FROM risk_score_changes").fetchone()[0]
+        runs = conn.execute("SELECT COUNT(*) FROM risk_refresh_runs").fetchone()[0]
+    if kept != summary["changed"] or runs != 1:
+        problems.append(f"retention kept {kept} events and {runs} runs, expected {summary['changed']} and 1")
+    print(f"{'retention':<22} {events} old events and {runs_before} old runs pruned, {kept} new events kept")
+
+    # Move one stored score so the next refresh writes an event after the prune
+    with db_connection() as conn:
+        conn.execute("UPDATE risk_scores SET score = score + 5 WHERE country_code = ?", (universe[0],))
+    refresh_risk_scores()
+    with db_connection() as conn:
+        ahead, late = score_change_page(conn, caught_up), score_change_page(conn, behind)
+    if ahead["missed"] or [c["country_code"] for c in ahead["changes"]] != [universe[0]]:
+        problems.append(f"a caught-up consumer got {ahead} after the prune")
+    if not late["missed"] or late["changes"] != ahead["changes"]:
+        problems.append("a consumer behind the prune was not told it missed events")
+    print(f"{'change paging':<22} new event id {ahead['next_after_id']} after {caught_up} pruned ids; "
+          f"consumer at id {behind} told it missed events: {late['missed']}")
+
+    if problems:
+        print("\nFAILED:\n  " + "\n  ".join(problems))
+        sys.exit(1)
+    print("\nOK: only moved scores were written, with one change event each; failed runs and old events leave no rows, paging survives the prune")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Cold-start import benchmark for the API and Celery entry points.
+
+    python scripts/bench_startup.py              # median of 5 fresh interpreters per target
+    python scripts/bench_startup.py --runs 10 --budget-ms api.app=600
+
+Each target is imported in a new `python -X importtime` process. The script
+prints the median import time, the heaviest direct imports, and any modules
+that must stay lazy but were loaded. It exits 1 if a target exceeds its
+budget or loads one of those modules.
+"""
+import sys
+import os
+import argparse
+import re
+import statistics
+import subprocess
+import tempfile
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# target -> (budget in ms, top-level packages that must not be imported with it)
+TARGETS = {
+    "api.app": (750, ["openai", "xrpl", "numpy", "textblob"]),
+    "tasks.celery_app": (500, ["openai", "fastapi", "textblob"]),
+}
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def import_profile(target: str):
+    """[(depth, module, self_us, cumulative_us)] for one fresh `import target`."""
+    tmp = tempfile.mkdtemp(prefix="politifolio-startup-")
+    env = dict(os.environ, PYTHONPATH=BACKEND, DATABASE_URL="sqlite:///./startup.db")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=tmp, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {target} failed:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            rows.append((len(m.group(3)) // 2, m.group(4), int(m.group(1)), int(m.group(2))))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", action="append", default=[], metavar="TARGET=MS",
+                        help="override a target's budget")
+    parser.add_argument("--top", type=int, default=8, help="heaviest direct imports to list")
+    args = parser.parse_args()
+
+    budgets = {t: b for t, (b, _) in TARGETS.items()}
+    for override in args.budget_ms:
+        target, ms = override.split("=")
+        budgets[target] = float(ms)
+
+    failures = []
+    for target, (_, forbidden) in TARGETS.items():
+        totals = []
+        children = {}
+        loaded = set()
+        for _ in range(args.runs):
+            rows = import_profile(target)
+            total = next(cum for depth, mod, _, cum in rows if depth == 0 and mod == target)
+            totals.append(total / 1000)
+            for depth, mod, _, cum in rows:
+                loaded.add(mod.split(".")[0])
+                if depth == 1:
+                    children.setdefault(mod, []).append(cum / 1000)
+        median = statistics.median(totals)
+        print(f"{target}: median {median:.0f} ms (min {min(totals):.0f}, max {max(totals):.0f}, "
+              f"budget {budgets[target]:.0f} ms)")
+        heaviest = sorted(children.items(), key=lambda kv: -statistics.median(kv[1]))[:args.top]
+        for mod, times in heaviest:
+            print(f"    {statistics.median(times):8.1f} ms  {mod}")
+        eager = sorted(set(forbidden) & loaded)
+        if eager:
+            failures.append(f"{target} imports {', '.join(eager)} at startup (should be lazy)")
+        if median > budgets[target]:
+            failures.append(f"{target} took {median:.0f} ms, budget {budgets[target]:.0f} ms")
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nOK: all targets within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""Benchmark suite for the compliance, risk and transaction hot paths.
+
+    python scripts/bench_suite.py                  # run, compare with scripts/bench_baseline.json
+    python scripts/bench_suite.py --only sanctions # benchmarks whose name contains "sanctions"
+    python scripts/bench_suite.py --full           # include the 1M-name sanctions list
+    python scripts/bench_suite.py --save-baseline  # record this run as the new baseline
+    python scripts/bench_suite.py --fail-on-regression --tolerance 0.25
+
+Each benchmark reports ms per operation (mean / p50 / p95 over its repeats)
+and ops/s. When the 10k and 100k sanctions lists both run, the suite also
+fails if screening cost grows with the list like a scan (see SCALING_SIZES). Runs use a throwaway database, generated data (scripts/bench_data.py),
+the heuristic text scorer and a local stub ledger (scripts/stub_rippled.py),
+never the configured services.
+"""
+import sys
+import os
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# --- isolated environment (must be set before config is imported) ---
+from stub_rippled import start_stub
+from xrpl.wallet import Wallet
+
+_tmp = tempfile.mkdtemp(prefix="politifolio-bench-")
+os.chdir(_tmp)  # DATABASE_URL paths are relative
+_ledger, _server, _stub_url = start_stub(close_interval=0.2)
+_issuer = Wallet.create()
+os.environ.update({
+    "DATABASE_URL": "sqlite:///./bench.db",
+    "SANCTIONS_SNAPSHOT_PATH": os.path.join(_tmp, "sanctions.snapshot"),
+    "OPENAI_API_KEY": "",
+    "RISK_SIMULATION_SEED": "7",
+    "XRPL_NODE_URL": _stub_url,
+    "GEO_PULSE_ISSUER_SEED": _issuer.seed,
+})
+
+import bench_data
+from database.database import init_db, db_connection
+from database.models import insert_transaction, insert_transactions
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+SANCTIONS_SIZES = [10, 1000, 10000, 100000]
+FULL_SANCTIONS_SIZES = SANCTIONS_SIZES + [1000000]
+# 10x more names may cost at most this much more per query; a scan costs ~10x on both
+SCALING_SIZES = (10000, 100000)
+MAX_DECODED_GROWTH = 6.0  # names read and scored per query
+MAX_TIME_GROWTH = 10.0    # ms per query
+
+BENCHMARKS = []  # (name, setup) ; setup() -> (op, ops_per_call, repeats)
+
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+
+def measure(op, ops_per_call: int, repeats: int):
+    op()  # warm-up: caches, lazy imports, first connection
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        op()
+        samples.append((time.perf_counter() - start) * 1000 / ops_per_call)
+    samples.sort()
+    mean = statistics.fmean(samples)
+    return {
+        "mean_ms": round(mean, 4),
+        "p50_ms": round(samples[len(samples) // 2], 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        "ops_per_sec": round(1000 / mean, 1) if mean else None,
+        "repeats": repeats,
+    }
+
+
+# --- compliance ---
+
+_names_decoded = {}  # list size -> names read from the index per query
+
+
+class _CountingNames:
+    def __init__(self, names):
+        self.names = names
+        self.reads = 0
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, i):
+        self.reads += 1
+        return self.names[i]
+
+
+def _count_decoded(index, queries):
+    names, index.names = index.names, _CountingNames(index.names)
+    try:
+        for q in queries:
+            index.best_match(q)
+        return index.names.reads / len(queries)
+    finally:
+        index.names = names
+
+
+def _sanctions_bench(size: int):
+    def setup():
+        from compliance import sanctions_check
+        from compliance.sanctions_snapshot import SanctionsStore
+        source = os.path.join(_tmp, f"sanctions_{size}.csv")
+        rows = bench_data.write_sanctions_csv(source, size)
+        sanctions_check.sanctions_store = SanctionsStore(
+            os.path.join(_tmp, f"sanctions_{size}.snapshot"), [source], threshold=sanctions_check.MATCH_THRESHOLD)
+        index = sanctions_check.sanctions_store.index()  # compile + load outside the timing
+        queries = bench_data.screening_queries(rows, 30)
+        _names_decoded[size] = _count_decoded(index, queries)
+        # Non-sanctioned country so every call goes through name matching
+        return (lambda: [sanctions_check.check_sanction_list(q, "FR") for q in queries]), len(queries), 5
+    return setup
+
+
+def _register_sanctions(sizes):
+    BENCHMARKS[:0] = [(f"sanctions.check_sanction_list[{size}]", _sanctions_bench(size)) for size in sizes]
+
+
+# --- risk ---
+
+@benchmark("risk.calculate_risk_score")
+def _risk_single():
+    from ai.risk_assessment import calculate_risk_score
+    codes = bench_data.COUNTRY_CODES
+    return (lambda: [calculate_risk_score(c, "Acme Trading Ltd") for c in codes]), len(codes), 50
+
+
+@benchmark("risk.calculate_risk_scores[1000]")
+def _risk_batch():
+    from ai.risk_assessment import calculate_risk_scores
+    codes = (bench_data.COUNTRY_CODES * 67)[:1000]
+    return (lambda: calculate_risk_scores(codes)), 1, 50
+
+
+# --- events ---
+
+@benchmark("events.process_text_for_events[heuristic]")
+def _events_heuristic():
+    from ai.event_processing import process_text_for_events
+    texts = bench_data.news_texts(200)
+    return (lambda: [process_text_for_events(t) for t in texts]), len(texts), 10
+
+
+# --- database ---
+
+@benchmark("db.insert_transaction[commit per row]")
+def _insert_single():
+    counter = iter(range(10 ** 9))
+
+    def op():
+        batch = next(counter)
+        for row in bench_data.transaction_rows(200, f"single_{batch}"):
+            with db_connection() as conn:
+                insert_transaction(conn, **row)
+    return op, 200, 10
+
+
+@benchmark("db.insert_transactions[1000 rows]")
+def _insert_bulk():
+    counter = iter(range(10 ** 9))
+
+    def op():
+        with db_connection() as conn:
+            insert_transactions(conn, bench_data.transaction_rows(1000, f"bulk_{next(counter)}"))
+    return op, 1000, 10
+
+
+def _clear_submitted():
+    # Keep the sweep benchmarks independent of rows left by the insert benchmarks
+    with db_connection() as conn:
+        conn.execute("UPDATE transactions SET status = 'success' WHERE status = 'submitted'")
+
+
+# --- reconciliation ---
+
+@benchmark("reconcile.reconcile_pending[500 rows]")
+def _reconcile():
+    from xrp_integration.reconciliation import reconcile_pending
+    from xrp_integration.xrp_utils import close_async_client
+    import hashlib
+
+    _clear_submitted()
+    n = 500
+    validated = _ledger.validated_index
+    hashes = [hashlib.sha256(f"bench-{i}".encode()).hexdigest().upper() for i in range(n)]
+    with _ledger.lock:
+        for i, h in enumerate(hashes):
+            _ledger.transactions[h] = {
+                "tx_json": {"Account": _issuer.classic_address, "TransactionType": "Payment", "hash": h},
+                "ledger_index": validated - (i % 10), "result": "tesSUCCESS",
+            }
+    with db_connection() as conn:
+        conn.executemany(
+            """INSERT INTO transactions (tx_hash, sender, receiver, amount, currency, status, last_ledger_sequence)
+               VALUES (?, 'Alice', 'Bob', '1', 'GEO', 'submitted', ?)""",
+            [(h, validated + 4) for h in hashes],
+        )
+        ids = [r[0] for r in conn.execute(
+            f"SELECT id FROM transactions WHERE tx_hash IN ({','.join('?' * n)})", hashes)]
+
+    async def sweep():
+        try:
+            return await reconcile_pending()
+        finally:
+            await close_async_client()
+
+    def op():
+        with db_connection() as conn:
+            conn.executemany("UPDATE transactions SET status = 'submitted' WHERE id = ?", [(i,) for i in ids])
+        totals = asyncio.run(sweep())
+        assert totals["success"] == n, totals
+    return op, n, 5
+
+
+# --- API ---
+
+@benchmark("api.POST /api/v1/transactions/")
+def _api_create():
+    from fastapi.testclient import TestClient
+    from api.app import app
+
+    client = TestClient(app)
+    client.__enter__()  # keep one event loop for the whole run
+    payload = {"destination": Wallet.create().classic_address, "amount": "10",
+               "sender_name": "Alice", "sender_country": "US",
+               "receiver_name": "Bob Smith", "receiver_country": "FR"}
+
+    def op():
+        for _ in range(20):
+            response = client.post("/api/v1/transactions/", json=payload)
+            assert response.status_code == 202, response.text
+    return op, 20, 10
+
+
+# --- runner ---
+
+def sanctions_scaling(results):
+    """(time growth, decoded growth, problems) between SCALING_SIZES, or None if either did not run."""
+    small, large = (f"sanctions.check_sanction_list[{size}]" for size in SCALING_SIZES)
+    if small not in results or large not in results:
+        return None
+    time_growth = results[large]["mean_ms"] / results[small]["mean_ms"]
+    decoded_growth = _names_decoded[SCALING_SIZES[1]] / max(_names_decoded[SCALING_SIZES[0]], 1)
+    problems = []
+    if time_growth > MAX_TIME_GROWTH:
+        problems.append(f"ms per query grew x{time_growth:.1f} (limit x{MAX_TIME_GROWTH:g})")
+    if decoded_growth > MAX_DECODED_GROWTH:
+        problems.append(f"names scored per query grew x{decoded_growth:.1f} (limit x{MAX_DECODED_GROWTH:g})")
+    return time_growth, decoded_growth, problems
+
+
+def compare(results, baseline, tolerance: float):
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            result["vs_baseline"] = None
+            continue
+        ratio = result["mean_ms"] / base["mean_ms"] if base["mean_ms"] else 1.0
+        result["vs_baseline"] = round(ratio, 3)
+        if ratio > 1 + tolerance:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", help="run benchmarks whose name contains this string")
+    parser.add_argument("--full", action="store_true", help="include the 1M-name sanctions list")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    init_db()
+    _register_sanctions(FULL_SANCTIONS_SIZES if args.full else SANCTIONS_SIZES)
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    print(f"{'benchmark':<48} {'mean ms':>10} {'p95 ms':>10} {'ops/s':>12} {'vs base':>8}")
+    for name, setup in BENCHMARKS:
+        if args.only and args.only not in name:
+            continue
+        op, ops_per_call, repeats = setup()
+        result = results[name] = measure(op, ops_per_call, repeats)
+        compare({name: result}, baseline, args.tolerance)
+        ratio = result["vs_baseline"]
+        print(f"{name:<48} {result['mean_ms']:>10.4f} {result['p95_ms']:>10.4f} "
+              f"{result['ops_per_sec']:>12,.1f} {('x%.2f' % ratio) if ratio else '-':>8}")
+
+    regressions = compare(results, baseline, args.tolerance)
+    scaling = sanctions_scaling(results)
+    if scaling:
+        time_growth, decoded_growth, scaling_problems = scaling
+        print(f"\nsanctions {SCALING_SIZES[0]} -> {SCALING_SIZES[1]} names: x{time_growth:.1f} ms per query, "
+              f"x{decoded_growth:.1f} names scored per query "
+              f"({_names_decoded[SCALING_SIZES[1]]:.0f} of {SCALING_SIZES[1]})")
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        merged = dict(baseline.get("results", {}))
+        merged.update({name: {k: v for k, v in r.items() if k != "vs_baseline"} for name, r in results.items()})
+        with open(args.baseline, "w") as f:
+            json.dump({**report, "results": merged}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+    if regressions:
+        print("\nRegressions (slower than baseline by more than "
+              f"{args.tolerance:.0%}):")
+        for name, ratio in regressions:
+            print(f"  {name}: x{ratio:.2f}")
+        if args.fail_on_regression:
+            sys.exit(1)
+    if scaling and scaling[2]:
+        # Not a baseline comparison: a scan-like slope fails on any machine
+        print("\nFAILED: sanctions screening scales like a scan:\n  " + "\n  ".join(scaling[2]))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
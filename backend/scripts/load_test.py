@@ -0,0 +1,145 @@
+"""Concurrent load test for the API.
+
+    python scripts/load_test.py                       # start uvicorn on a temp DB, 64 clients for 20 s
+    python scripts/load_test.py --concurrency 256 --duration 30
+    python scripts/load_test.py --url http://localhost:8000   # an already running server
+
+The request mix is 70% POST /transactions/, 20% GET /transactions/{id} and
+10% POST /compliance/check. Prints throughput, latency percentiles and
+errors per endpoint. A spawned server uses the mock ledger (no issuer seed)
+and a throwaway database, so only the API itself is measured.
+"""
+import sys
+import os
+import argparse
+import asyncio
+import random
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+import httpx
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+NAMES = ["Bob Smith", "Acme Trading", "Maria Garcia", "Global Shipping", "Chen Wei", "Anna Ivanova"]
+COUNTRIES = ["US", "UK", "FR", "DE", "JP", "BR"]
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(backend: str, workers: int):
+    tmp = tempfile.mkdtemp(prefix="politifolio-load-")
+    port = _free_port()
+    env = dict(os.environ, PYTHONPATH=backend, DATABASE_URL="sqlite:///./load.db",
+               GEO_PULSE_ISSUER_SEED="", OPENAI_API_KEY="",
+               SANCTIONS_SOURCES=os.path.join(backend, "data", "sanctions.csv"),
+               SANCTIONS_SNAPSHOT_PATH=os.path.join(tmp, "sanctions.snapshot"))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.app:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=tmp, env=env, stdout=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url + "/", timeout=1)
+            return proc, url, tmp
+        except httpx.TransportError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("server did not start")
+
+
+def _percentile(values, p):
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+async def run_load(url: str, concurrency: int, duration: float):
+    stats = {}  # endpoint -> (latencies, errors)
+    created = []
+    rng = random.Random(1)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async def client_loop(client, stop_at):
+        while time.monotonic() < stop_at:
+            roll = rng.random()
+            if roll < 0.7:
+                endpoint = "POST /transactions/"
+                request = client.post("/api/v1/transactions/", json={
+                    "destination": "rPT1Sjq2eGrBTHTFdyuJpvQq8m5sF8TVJ", "amount": str(rng.randint(1, 100)),
+                    "sender_name": "Alice", "sender_country": "US",
+                    "receiver_name": rng.choice(NAMES), "receiver_country": rng.choice(COUNTRIES)})
+            elif roll < 0.9 and created:
+                endpoint = "GET /transactions/{id}"
+                request = client.get(f"/api/v1/transactions/{rng.choice(created)}")
+            else:
+                endpoint = "POST /compliance/check"
+                request = client.post("/api/v1/compliance/check",
+                                      json={"name": rng.choice(NAMES), "country": rng.choice(COUNTRIES)})
+            latencies, errors = stats.setdefault(endpoint, ([], [0]))
+            start = time.perf_counter()
+            try:
+                response = await request
+                ok = response.status_code < 500
+                if endpoint.startswith("POST /transactions") and response.status_code == 202:
+                    created.append(response.json()["id"])
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            if not ok:
+                errors[0] += 1
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        start = time.monotonic()
+        await asyncio.gather(*(client_loop(client, start + duration) for _ in range(concurrency)))
+        elapsed = time.monotonic() - start
+    return stats, elapsed
+
+
+def report(stats, elapsed: float):
+    total = sum(len(lat) for lat, _ in stats.values())
+    errors = sum(err[0] for _, err in stats.values())
+    print(f"{'endpoint':<26} {'requests':>9} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    rows = list(stats.items()) + [("all", ([l for lat, _ in stats.values() for l in lat], [errors]))]
+    for endpoint, (latencies, err) in rows:
+        latencies = sorted(latencies)
+        print(f"{endpoint:<26} {len(latencies):>9} {len(latencies) / elapsed:>9.1f} "
+              f"{_percentile(latencies, 0.5) * 1000:>8.1f} {_percentile(latencies, 0.95) * 1000:>8.1f} "
+              f"{_percentile(latencies, 0.99) * 1000:>8.1f} {err[0]:>7}")
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="target server (default: start one)")
+    parser.add_argument("--backend", default=BACKEND, help="backend directory to serve when starting a server")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for a started server")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20.0)
+    args = parser.parse_args()
+
+    proc = tmp = None
+    url = args.url
+    if not url:
+        proc, url, tmp = start_server(args.backend, args.workers)
+    try:
+        # Short warm-up: snapshot load, risk cache, connection pools
+        asyncio.run(run_load(url, min(args.concurrency, 8), 2.0))
+        stats, elapsed = asyncio.run(run_load(url, args.concurrency, args.duration))
+        print(f"{args.concurrency} clients for {elapsed:.1f}s against {url}")
+        report(stats, elapsed)
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
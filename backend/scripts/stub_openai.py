@@ -0,0 +1,105 @@
+"""Local stand-in for the OpenAI chat-completions endpoint. Run: python scripts/stub_openai.py [port]
+
+Point OPENAI_BASE_URL at http://127.0.0.1:<port>/v1 (any OPENAI_API_KEY) to
+exercise the LLM path of ai.event_processing without the real API.
+
+- Replies with the JSON object the analysis prompt asks for, scored with the
+  local keyword scanner so results are deterministic. Batched requests
+  ({"articles": [...]}) get {"results": [...]} back.
+- `latency` seconds of delay per request (to make coalescing visible).
+- Every request is counted in `StubChat.calls`.
+"""
+import sys
+import json
+import os
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from ai.keyword_scanner import default_scanner
+
+
+class StubChat:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = Counter()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def analyze(text: str):
+        keywords = default_scanner.scan(text)
+        score = default_scanner.score(keywords)
+        return {
+            "risk_level": "HIGH" if score > 60 else "MEDIUM" if score > 30 else "LOW",
+            "keywords": keywords,
+            "summary": text[:100],
+        }
+
+    def complete(self, body: dict):
+        with self.lock:
+            self.calls["chat.completions"] += 1
+            n = self.calls["chat.completions"]
+        if self.latency:
+            time.sleep(self.latency)
+        text = next((m["content"] for m in reversed(body.get("messages", [])) if m.get("role") == "user"), "")
+        try:
+            articles = json.loads(text)["articles"]  # batched request
+            content = json.dumps({"results": [{"id": a["id"], **self.analyze(a["text"])} for a in articles]})
+        except (ValueError, TypeError, KeyError):
+            content = json.dumps(self.analyze(text))
+        return {
+            "id": f"chatcmpl-stub-{n}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": len(text.split()), "completion_tokens": 20,
+                      "total_tokens": len(text.split()) + 20},
+        }
+
+
+def make_server(chat: StubChat, host: str = "127.0.0.1", port: int = 0):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if self.path.rstrip("/").endswith("/chat/completions"):
+                status, payload = 200, chat.complete(body)
+            else:
+                status, payload = 404, {"error": {"message": f"Unknown path {self.path}"}}
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def start_stub(latency: float = 0.0, port: int = 0):
+    """Start the server on a background thread. Returns (chat, server, base_url)."""
+    chat = StubChat(latency=latency)
+    server = make_server(chat, port=port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return chat, server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 5006
+    chat, server, url = start_stub(port=port)
+    print(f"Stub chat-completions listening on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
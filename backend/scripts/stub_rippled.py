@@ -0,0 +1,350 @@
+"""Local stand-in for a rippled JSON-RPC server. Run: python scripts/stub_rippled.py [port]
+
+Good enough for xrpl-py's autofill / submit / reliable-submission flow, so the
+XRPL paths can be exercised without Testnet: point XRPL_NODE_URL at
+http://127.0.0.1:<port>/ and use any valid seed as GEO_PULSE_ISSUER_SEED.
+
+- Ledgers close every `close_interval` seconds; a submitted transaction is
+  validated in the next closed ledger.
+- Account sequences are tracked per account: a stale Sequence returns
+  tefPAST_SEQ, a future one terPRE_SEQ. With `queue_limit`, a Sequence up to
+  that far ahead is held and returns terQUEUED (like rippled's TxQ), and is
+  applied once the gap before it is filled.
+- account_tx pages (marker) over validated transactions in a ledger range.
+- Trust lines: issuer Payments credit the holder's line, issuer TrustSets set
+  or clear its freeze flag, and account_lines pages over the issuer's lines
+  (seed holders with `add_trust_line`). Their metadata carries RippleState
+  nodes like rippled's.
+- tx with min_ledger / max_ledger reports searched_all on txnNotFound, like
+  rippled: true only if the whole range is validated and at or after
+  `history_start` (raise it to simulate a node missing old ledgers).
+- Every request is counted in `StubLedger.calls` so harnesses can report RPCs.
+- `latency` adds a network round trip to every request (half before the
+  ledger sees it, half before the reply).
+"""
+import sys
+import hashlib
+import json
+import threading
+import time
+from collections import Counter
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xrpl.core.addresscodec import decode_classic_address
+from xrpl.core.binarycodec import decode
+
+# Transaction hash = SHA-512Half("TXN\0" + signed blob)
+_TXN_PREFIX = "54584E00"
+
+
+def tx_hash(blob: str) -> str:
+    return hashlib.sha512(bytes.fromhex(_TXN_PREFIX + blob)).digest()[:32].hex().upper()
+
+
+class StubLedger:
+    def __init__(self, close_interval: float = 1.0, fee_drops: int = 10, start_ledger: int = 1000,
+                 queue_limit: int = 0, latency: float = 0.0):
+        self.close_interval = close_interval
+        self.latency = latency
+        self.fee_drops = fee_drops
+        self.queue_limit = queue_limit
+        self.validated_index = start_ledger
+        self.history_start = 1    # oldest ledger the node claims to have
+        self.sequences = {}       # account -> next Sequence
+        self.validated_sequences = {start_ledger: {}}  # ledger -> {account: next Sequence} (recent ledgers)
+        self.queued = {}          # (account, Sequence) -> (hash, tx_json) waiting for the gap to fill
+        self.lines = {}           # (issuer, holder, currency) -> {"balance": Decimal, "freeze": bool}
+        self.pending = []         # hashes waiting for the next close
+        self.transactions = {}    # hash -> {"tx_json", "ledger_index", "result"}
+        self.calls = Counter()
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+
+    @property
+    def current_index(self):
+        return self.validated_index + 1
+
+    # --- ledger clock ---
+
+    def close_ledger(self):
+        with self.lock:
+            self.validated_index += 1
+            for h in self.pending:
+                self.transactions[h]["ledger_index"] = self.validated_index
+            self.pending = []
+            self.validated_sequences[self.validated_index] = dict(self.sequences)
+            self.validated_sequences.pop(self.validated_index - 256, None)
+            # Like the TxQ: queued transactions whose turn has come go into the new open ledger
+            for account, seq in sorted(self.queued):
+                if (account, seq) in self.queued and seq == self.sequences.get(account):
+                    h, tx_json = self.queued.pop((account, seq))
+                    if int(tx_json.get("LastLedgerSequence", self.current_index)) >= self.current_index:
+                        self._apply(h, tx_json)
+
+    def run_clock(self):
+        while not self._stop.wait(self.close_interval):
+            self.close_ledger()
+
+    def stop(self):
+        self._stop.set()
+
+    # --- RPC handlers ---
+
+    def handle(self, method: str, params: dict):
+        self.calls[method] += 1
+        handler = getattr(self, f"rpc_{method}", None)
+        if handler is None:
+            return {"error": "unknownCmd", "status": "error"}
+        with self.lock:
+            result = handler(params)
+        result.setdefault("status", "success")
+        return result
+
+    def rpc_server_info(self, params):
+        return {"info": {
+            "build_version": "stub",
+            "server_state": "full",
+            "validated_ledger": {"seq": self.validated_index, "base_fee_xrp": self.fee_drops / 1e6},
+        }}
+
+    def rpc_server_state(self, params):
+        return {"state": {"validated_ledger": {"reserve_inc": 2000000, "reserve_base": 10000000}}}
+
+    def rpc_fee(self, params):
+        fee = str(self.fee_drops)
+        return {
+            "current_ledger_size": "0", "current_queue_size": "0", "expected_ledger_size": "1000",
+            "ledger_current_index": self.current_index, "max_queue_size": "2000",
+            "drops": {"base_fee": fee, "median_fee": "5000", "minimum_fee": fee, "open_ledger_fee": fee},
+            "levels": {"median_level": "128000", "minimum_level": "256", "open_ledger_level": "256", "reference_level": "256"},
+        }
+
+    def rpc_ledger(self, params):
+        index = self.current_index if params.get("ledger_index") == "current" else self.validated_index
+        return {"ledger_index": index, "ledger": {"ledger_index": str(index), "closed": index != self.current_index},
+                "validated": index == self.validated_index}
+
+    def rpc_ledger_current(self, params):
+        return {"ledger_current_index": self.current_index}
+
+    def rpc_account_info(self, params):
+        account = params.get("account")
+        index = params.get("ledger_index", "current")
+        validated = index != "current"
+        if validated:
+            index = self.validated_index if index == "validated" else int(index)
+            if index not in self.validated_sequences:
+                return {"error": "lgrNotFound", "status": "error"}
+            sequence = self.validated_sequences[index].get(account, 1)
+        else:
+            sequence = self.sequences.setdefault(account, 1)
+        result = {
+            "account_data": {"Account": account, "Balance": "100000000000", "Flags": 0,
+                             "OwnerCount": 0, "Sequence": sequence},
+            "validated": validated,
+        }
+        result["ledger_index" if validated else "ledger_current_index"] = index if validated else self.current_index
+        return result
+
+    def add_trust_line(self, issuer: str, holder: str, currency: str, balance="0", freeze: bool = False):
+        """Seed a trust line (harness setup; real lines come from the holder's TrustSet)."""
+        with self.lock:
+            self.lines[(issuer, holder, currency)] = {"balance": Decimal(str(balance)), "freeze": freeze}
+
+    def _trust_line_effects(self, tx_json):
+        """Apply a Payment / TrustSet to the trust lines; returns the metadata AffectedNodes."""
+        account = tx_json["Account"]
+        kind = tx_json.get("TransactionType")
+        key = None
+        created = False
+        if kind == "Payment" and isinstance(tx_json.get("Amount"), dict):
+            amount = tx_json["Amount"]
+            if amount["issuer"] == account:
+                key = (account, tx_json["Destination"], amount["currency"])
+                created = key not in self.lines
+                line = self.lines.setdefault(key, {"balance": Decimal(0), "freeze": False})
+                line["balance"] += Decimal(amount["value"])
+        elif kind == "TrustSet":
+            limit = tx_json["LimitAmount"]
+            key = (account, limit["issuer"], limit["currency"])
+            line = self.lines.get(key)
+            if line is None:
+                key = None
+            else:
+                flags = int(tx_json.get("Flags", 0))
+                if flags & (1 << 20):
+                    line["freeze"] = True
+                elif flags & (1 << 21):
+                    line["freeze"] = False
+        return [self._ripple_state_node(key, created)] if key else []
+
+    def _ripple_state_node(self, key, created: bool):
+        """RippleState metadata as rippled reports it: Balance from the low account's side."""
+        issuer, holder, currency = key
+        line = self.lines[key]
+        issuer_is_low = decode_classic_address(issuer) < decode_classic_address(holder)
+        low, high = (issuer, holder) if issuer_is_low else (holder, issuer)
+        # The holder's balance is what the issuer owes it
+        balance = -line["balance"] if issuer_is_low else line["balance"]
+        flags = (0x00400000 if issuer_is_low else 0x00800000) if line["freeze"] else 0
+        fields = {
+            "Balance": {"currency": currency, "issuer": "rrrrrrrrrrrrrrrrrrrrBZbvji", "value": str(balance)},
+            "Flags": flags,
+            "LowLimit": {"currency": currency, "issuer": low, "value": "0" if issuer_is_low else "1000000000"},
+            "HighLimit": {"currency": currency, "issuer": high, "value": "1000000000" if issuer_is_low else "0"},
+        }
+        if created:
+            return {"CreatedNode": {"LedgerEntryType": "RippleState", "NewFields": fields}}
+        return {"ModifiedNode": {"LedgerEntryType": "RippleState", "FinalFields": fields}}
+
+    def _apply(self, h, tx_json):
+        account = tx_json["Account"]
+        self.sequences[account] = tx_json["Sequence"] + 1
+        self.transactions[h] = {"tx_json": tx_json, "ledger_index": None, "result": "tesSUCCESS",
+                                "nodes": self._trust_line_effects(tx_json)}
+        self.pending.append(h)
+        # Queued successors whose turn it now is
+        while (account, self.sequences[account]) in self.queued:
+            qh, qtx = self.queued.pop((account, self.sequences[account]))
+            if int(qtx.get("LastLedgerSequence", self.current_index)) < self.current_index:
+                break
+            self.sequences[account] = qtx["Sequence"] + 1
+            self.transactions[qh] = {"tx_json": qtx, "ledger_index": None, "result": "tesSUCCESS",
+                                     "nodes": self._trust_line_effects(qtx)}
+            self.pending.append(qh)
+
+    def rpc_account_lines(self, params):
+        account = params.get("account")
+        limit = min(int(params.get("limit") or 200), 400)
+        start = int(params.get("marker") or 0)
+        lines = sorted((holder, currency, line) for (issuer, holder, currency), line in self.lines.items()
+                       if issuer == account)
+        page = lines[start:start + limit]
+        result = {
+            "account": account, "ledger_current_index": self.current_index, "validated": False,
+            "lines": [
+                {"account": holder, "balance": str(-line["balance"]), "currency": currency,
+                 "limit": "0", "limit_peer": "1000000000", "quality_in": 0, "quality_out": 0,
+                 "no_ripple": True, "no_ripple_peer": False, "freeze": line["freeze"]}
+                for holder, currency, line in page
+            ],
+        }
+        if start + limit < len(lines):
+            result["marker"] = str(start + limit)
+        return result
+
+    def rpc_submit(self, params):
+        blob = params["tx_blob"]
+        tx_json = decode(blob)
+        h = tx_hash(blob)
+        tx_json["hash"] = h
+        account = tx_json["Account"]
+        expected = self.sequences.setdefault(account, 1)
+        seq = tx_json.get("Sequence", 0)
+        if h in self.transactions or (account, seq) in self.queued and self.queued[(account, seq)][0] == h:
+            engine = "tefALREADY"
+        elif seq < expected:
+            engine = "tefPAST_SEQ"
+        elif int(tx_json.get("LastLedgerSequence", self.current_index)) < self.current_index:
+            engine = "tefMAX_LEDGER"
+        elif seq > expected + self.queue_limit:
+            engine = "terPRE_SEQ"
+        elif seq > expected:
+            engine = "terQUEUED"
+            self.queued[(account, seq)] = (h, tx_json)
+        else:
+            engine = "tesSUCCESS"
+            self._apply(h, tx_json)
+        return {"engine_result": engine, "engine_result_message": engine, "tx_blob": blob,
+                "tx_json": tx_json, "accepted": engine == "tesSUCCESS", "applied": engine == "tesSUCCESS"}
+
+    def rpc_account_tx(self, params):
+        account = params.get("account")
+        lo = params.get("ledger_index_min", -1)
+        hi = params.get("ledger_index_max", -1)
+        lo = 0 if lo in (-1, None) else lo
+        hi = self.validated_index if hi in (-1, None) else min(hi, self.validated_index)
+        limit = min(int(params.get("limit") or 200), 400)
+        start = int(params.get("marker") or 0)
+        matches = [
+            (h, e) for h, e in self.transactions.items()
+            if e["ledger_index"] is not None and lo <= e["ledger_index"] <= hi
+            and account in (e["tx_json"].get("Account"), e["tx_json"].get("Destination"))
+        ]
+        matches.sort(key=lambda m: m[1]["ledger_index"], reverse=not params.get("forward"))
+        page = matches[start:start + limit]
+        result = {
+            "account": account, "ledger_index_min": lo, "ledger_index_max": hi, "limit": limit,
+            "transactions": [
+                {"hash": h, "ledger_index": e["ledger_index"], "tx_json": e["tx_json"],
+                 "meta": {"TransactionResult": e["result"], "AffectedNodes": e.get("nodes", [])},
+                 "validated": True}
+                for h, e in page
+            ],
+        }
+        if start + limit < len(matches):
+            result["marker"] = start + limit
+        return result
+
+    def rpc_tx(self, params):
+        entry = self.transactions.get(params.get("transaction"))
+        lo, hi = params.get("min_ledger"), params.get("max_ledger")
+        if entry is not None and lo is not None and not (entry["ledger_index"] and lo <= entry["ledger_index"] <= hi):
+            entry = None  # outside the requested range
+        if entry is None:
+            error = {"error": "txnNotFound", "error_message": "Transaction not found.", "status": "error"}
+            if lo is not None:
+                error["searched_all"] = self.history_start <= lo and hi <= self.validated_index
+            return error
+        validated = entry["ledger_index"] is not None
+        result = dict(entry["tx_json"])
+        result["validated"] = validated
+        if validated:
+            result["ledger_index"] = entry["ledger_index"]
+            result["meta"] = {"TransactionResult": entry["result"], "AffectedNodes": entry.get("nodes", [])}
+        return result
+
+
+def make_server(ledger: StubLedger, host: str = "127.0.0.1", port: int = 0):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            params = (body.get("params") or [{}])[0]
+            if ledger.latency:
+                time.sleep(ledger.latency / 2)
+            payload = json.dumps({"result": ledger.handle(body.get("method"), params)}).encode()
+            if ledger.latency:
+                time.sleep(ledger.latency / 2)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def start_stub(close_interval: float = 1.0, port: int = 0, queue_limit: int = 0, latency: float = 0.0):
+    """Start ledger clock + server on background threads. Returns (ledger, server, url)."""
+    ledger = StubLedger(close_interval=close_interval, queue_limit=queue_limit, latency=latency)
+    server = make_server(ledger, port=port)
+    threading.Thread(target=ledger.run_clock, daemon=True).start()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return ledger, server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 5005
+    ledger, server, url = start_stub(port=port)
+    print(f"Stub rippled listening on {url} (ledger closes every {ledger.close_interval}s)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,55 @@
+"""Verify the risk keyword scanner's word boundaries. Run: python scripts/verify_keywords.py"""
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai.keyword_scanner import KeywordScanner, default_scanner
+
+# (text, keywords the default scanner must report)
+CASES = [
+    # Listed inflections count as their keyword
+    ("War breaks out on the border", ["war"]),
+    ("Two wars and warring factions", ["war"]),
+    ("New SANCTIONS announced; more entities sanctioned", ["sanction"]),
+    ("Exports banned, a ban on imports, banning transfers", ["ban"]),
+    ("Fraudulent invoices and wire fraud", ["fraud"]),
+    ("Funds laundered through shell companies; money laundering probe", ["laundering"]),
+    ("Oil embargoes extended", ["embargo"]),
+    ("Repeated violations of export controls", ["violation"]),
+    # Other words that start with, or contain, a keyword do not
+    ("Warning issued for coastal areas", []),
+    ("He warned them twice", []),
+    ("Cheap wares at the market", []),
+    ("Award ceremony in Warsaw moves forward", []),
+    ("The bank abandoned the banner campaign", []),
+    ("A sanctuary for wildlife", []),
+    ("Regional warlords", []),
+]
+
+
+def main():
+    failures = []
+    for text, expected in CASES:
+        found = default_scanner.scan(text)
+        status = "OK" if found == expected else "FAIL"
+        if found != expected:
+            failures.append(text)
+        print(f"  {status:<4} {text!r}: {found}")
+
+    # Keywords without listed inflections accept their plural only
+    custom = KeywordScanner({"tariff": 10, "tax": 5})
+    for text, expected in [("tariffs and taxes", ["tariff", "tax"]), ("taxing tariffed goods", [])]:
+        found = custom.scan(text)
+        if found != expected:
+            failures.append(text)
+        print(f"  {'OK' if found == expected else 'FAIL':<4} {text!r} (custom weights): {found}")
+
+    if failures:
+        print(f"\nFAILED: {len(failures)} case(s)")
+        sys.exit(1)
+    print("\nOK: keywords match whole words and their listed inflections only")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,36 @@ REC_TASKS = [
      1247, 125, 125, "2026-02-06 14:23:00", "2026-02-06 14:23:45", 3200, "AI Engine", "critical"),
 ]
 
+# Hot queries and the index each one must use (checked with EXPLAIN QUERY PLAN)
+HOT_QUERIES = [
+    ("reconciliation sweep",
+     "SELECT id, tx_hash, last_ledger_sequence FROM transactions WHERE status = 'submitted' AND id > ? ORDER BY id LIMIT ?", (0, 500),
+     "idx_transactions_submitted"),
+    ("latest geo events",
+     "SELECT * FROM geo_events ORDER BY timestamp DESC LIMIT 50", (),
+     "idx_geo_events_timestamp"),
+    ("geo events by country",
+     "SELECT * FROM geo_events WHERE country = ? AND timestamp >= ? ORDER BY timestamp DESC", ("Russia", "2026-01-01"),
+     "idx_geo_events_country_timestamp"),
+    ("re-screen by country",
+     "SELECT id FROM transactions WHERE (receiver_country = ? OR sender_country = ?) AND status != 'failed' AND id > ? ORDER BY id LIMIT ?",
+     ("RU", "RU", 0, 1000),
+     "idx_transactions_receiver_country"),
+    ("reconciliation tasks",
+     "SELECT * FROM reconciliation_tasks ORDER BY start_time DESC", (),
+     "idx_reconciliation_tasks_start_time"),
+]
+
+def check_query_plans(conn):
+    """Returns True when every hot query's plan uses its index."""
+    ok = True
+    for label, sql, params, index in HOT_QUERIES:
+        plan = " | ".join(r[3] for r in conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall())
+        uses_index = index in plan
+        ok = ok and uses_index
+        print(f"  {label}: {'OK' if uses_index else 'MISSING ' + index} ({plan})")
+    return ok
+
 def seed_mocks(conn):
     if conn.execute("SELECT COUNT(*) FROM geo_events").fetchone()[0] == 0:
         for row in GEO_EVENTS:
@@ -87,8 +117,14 @@ def main():
     print("  reconciliation_tasks DB uses snake_case (event_type, triggered_by)")
     print("  Express sqlite.service maps to camelCase (eventType, triggeredBy) in getReconciliationTasks()")
 
+    # Index usage on the hot paths
+    print("\nQuery plans:")
+    plans_ok = check_query_plans(conn)
+
     conn.close()
     print("\nVerification complete.")
+    if not plans_ok:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -1,11 +1,17 @@
+import sys
+import time
 from celery import Celery
+from celery.signals import (
+    task_prerun, task_postrun, task_failure, worker_init, worker_process_init, worker_process_shutdown,
+    worker_shutdown,
+)
 from config.config import settings
 
 celery_app = Celery(
     "tasks",
     broker=settings.CELERY_BROKER_URL,
     backend=settings.CELERY_RESULT_BACKEND,
-    include=["tasks.risk_update_task", "tasks.reconcile_task"]
+    include=["tasks.risk_update_task", "tasks.reconcile_task", "tasks.outbox_task", "tasks.rescreen_task", "tasks.freeze_task", "tasks.holder_index_task"]
 )
 
 celery_app.conf.update(
@@ -14,4 +20,71 @@ celery_app.conf.update(
     result_serializer="json",
     timezone="UTC",
     enable_utc=True,
+    # Everything that signs as the issuer runs on one single-process worker
+    # (celery worker -Q issuer --concurrency 1): the local issuer Sequence lives there.
+    task_routes={
+        "tasks.outbox_task.*": {"queue": settings.ISSUER_QUEUE},
+        "tasks.freeze_task.*": {"queue": settings.ISSUER_QUEUE},
+    },
+    beat_schedule={
+        # Outbox: submit payments recorded by the API
+        "drain-outbox": {"task": "tasks.outbox_task.drain_outbox_task", "schedule": 5.0},
+        # Confirm submitted payments against validated ledgers
+        "reconcile-transactions": {"task": "tasks.reconcile_task.reconcile_transactions", "schedule": 30.0},
+        # Follow the issuer's transactions into the local GEO holder index
+        "sync-holder-index": {"task": "tasks.holder_index_task.sync_holder_index_task",
+                              "schedule": settings.HOLDER_INDEX_SYNC_SECONDS},
+        # Rescore every jurisdiction; only moved scores are written
+        "refresh-risk-scores": {"task": "tasks.risk_update_task.update_risk_scores",
+                                "schedule": settings.RISK_REFRESH_SECONDS},
+    },
 )
+
+
+# --- Worker startup: schema and warm-up once in the parent, inherited by the forked pool ---
+@worker_init.connect
+def _prepare_worker(**_):
+    from config.startup import init_schema, warm_up
+    init_schema()
+    if settings.STARTUP_WARMUP:
+        warm_up()
+
+
+# --- Worker shutdown: release the event scoring pools of whichever process ran the tasks ---
+@worker_shutdown.connect
+@worker_process_shutdown.connect
+def _release_event_pools(**_):
+    event_processing = sys.modules.get("ai.event_processing")
+    if event_processing is not None:
+        event_processing.shutdown_event_pools()
+
+
+# --- Instrumentation: one span per task run, metrics served per worker process ---
+from observability.metrics import SPAN_SECONDS, SPAN_ERRORS, start_metrics_server
+
+_task_started = {}
+
+
+@task_prerun.connect
+def _task_prerun(task_id=None, **_):
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def _task_postrun(task_id=None, task=None, **_):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        SPAN_SECONDS.observe(time.perf_counter() - started, f"task.{task.name}")
+
+
+@task_failure.connect
+def _task_failure(sender=None, **_):
+    SPAN_ERRORS.inc(f"task.{sender.name}")
+
+
+@worker_process_init.connect
+def _serve_worker_metrics(**_):
+    # Each pool process takes the next free port from WORKER_METRICS_PORT
+    if settings.WORKER_METRICS_PORT:
+        port = start_metrics_server(settings.WORKER_METRICS_PORT, attempts=64)
+        print(f"Worker metrics on port {port}" if port else "Worker metrics: no free port")
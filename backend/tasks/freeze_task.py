@@ -0,0 +1,26 @@
+import asyncio
+from .celery_app import celery_app
+from database.database import db_connection
+from xrp_integration.freeze import bulk_freeze
+from xrp_integration.xrp_utils import close_async_client
+
+async def _bulk_freeze(**kwargs):
+    try:
+        return await bulk_freeze(**kwargs)
+    finally:
+        # Each task run has its own event loop; don't leak its connection pool
+        await close_async_client()
+
+@celery_app.task
+def bulk_freeze_task(country: str = None, counterparties=None, accounts=None, freeze: bool = True,
+                     event_id: int = None):
+    event = None
+    if event_id:
+        with db_connection() as conn:
+            row = conn.execute("SELECT * FROM geo_events WHERE id = ?", (event_id,)).fetchone()
+        event = dict(row) if row else None
+        country = country or (event or {}).get("country")
+    summary = asyncio.run(_bulk_freeze(
+        accounts=accounts or (), country=country, counterparties=counterparties or (),
+        freeze=freeze, event=event))
+    return f"Bulk {'freeze' if freeze else 'unfreeze'}: {summary}"
@@ -0,0 +1,21 @@
+import asyncio
+from .celery_app import celery_app
+from xrp_integration.holders import rebuild_holder_index, sync_holder_index
+from xrp_integration.xrp_utils import close_async_client
+
+async def _run(job):
+    try:
+        return await job()
+    finally:
+        # Each task run has its own event loop; don't leak its connection pool
+        await close_async_client()
+
+@celery_app.task
+def sync_holder_index_task():
+    summary = asyncio.run(_run(sync_holder_index))
+    return f"Holder index sync: {summary}"
+
+@celery_app.task
+def rebuild_holder_index_task():
+    holders = asyncio.run(_run(rebuild_holder_index))
+    return f"Holder index rebuilt: {holders} holders"
@@ -0,0 +1,16 @@
+import asyncio
+from .celery_app import celery_app
+from xrp_integration.outbox import drain_outbox
+from xrp_integration.xrp_utils import close_async_client
+
+async def _drain():
+    try:
+        return await drain_outbox()
+    finally:
+        # Each task run has its own event loop; don't leak its connection pool
+        await close_async_client()
+
+@celery_app.task
+def drain_outbox_task():
+    counts = asyncio.run(_drain())
+    return f"Outbox drained: {counts}"
@@ -0,0 +1,7 @@
+from .celery_app import celery_app
+from compliance.rescreening import rescreen_for_event
+
+@celery_app.task
+def rescreen_event_task(event_id: int):
+    summary = rescreen_for_event(event_id)
+    return f"Re-screen for geo event {event_id}: {summary}"
@@ -1,24 +1,12 @@
 from .celery_app import celery_app
-from ai.risk_assessment import calculate_risk_score
-from database.database import db_connection
+from compliance.risk_refresh import refresh_risk_scores
+from compliance.rescreening import BLOCK_RISK_SCORE, rescreen
 
 @celery_app.task
 def update_risk_scores():
-    countries = ["US", "CN", "RU", "IR", "NK", "GB", "FR", "DE", "JP", "IN"]
-    with db_connection() as conn:
-        for country in countries:
-            new_score = calculate_risk_score(country)
-            row = conn.execute(
-                "SELECT id FROM risk_scores WHERE country_code = ?", (country,)
-            ).fetchone()
-            if not row:
-                conn.execute(
-                    "INSERT INTO risk_scores (country_code, score) VALUES (?, ?)",
-                    (country, new_score),
-                )
-            else:
-                conn.execute(
-                    "UPDATE risk_scores SET score = ?, last_updated = CURRENT_TIMESTAMP WHERE id = ?",
-                    (new_score, row["id"]),
-                )
-    return "Risk scores updated"
+    summary = refresh_risk_scores()
+    # Countries that crossed the blocking threshold: their transactions are screened again
+    for code, old, new in summary["changes"]:
+        if old is not None and old <= BLOCK_RISK_SCORE < new:
+            rescreen(code, event={"title": f"Risk score {code} {old} -> {new}", "severity": "high"})
+    return f"Risk scores refreshed: {summary['changed']} of {summary['countries']} changed (run {summary['run_id']})"
@@ -0,0 +1,8 @@
+"""Currency code helpers that do not need xrpl-py (usable from the API process)."""
+
+
+def encode_currency(code: str) -> str:
+    """Ledger currency code: 3-character ISO-style codes as is, longer ones as 40-char hex."""
+    if len(code) == 3 or len(code) == 40:
+        return code
+    return code.encode("ascii").hex().upper().ljust(40, "0")
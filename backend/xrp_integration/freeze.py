@@ -0,0 +1,123 @@
+"""Bulk trust line freeze / unfreeze for sanctions enforcement.
+
+freeze_trustline handles one holder and waits for validation each time. A
+sanctions event against a whole country or entity group can touch thousands
+of holders, so bulk_freeze instead:
+
+1. Collects the candidate accounts: explicit addresses, plus the
+   destinations of transactions whose receiver is in `country` or is one
+   of `counterparties`.
+2. Reads every GEO trust line of the issuer with one paginated
+   account_lines scan. Only candidates that actually hold a line are
+   targeted, and lines already in the requested state are skipped.
+3. Sends the TrustSets through the IssuanceEngine in chunks (local
+   Sequences, pipelined submits, confirmation by account_tx).
+
+Each run is a reconciliation_tasks row: transactions_scanned counts the
+trust lines read, transactions_flagged the lines to change, and
+transactions_reconciled the changes validated so far (updated per chunk).
+"""
+import asyncio
+import uuid
+from datetime import datetime, timezone
+from config.config import settings
+from compliance.country_risk import normalize_country
+from database.database import db_connection
+from observability.metrics import timed
+from .issuance import get_issuance_engine
+from .reconciliation import SUCCESS
+from .token_controller import get_token_controller, scan_trust_lines
+from .xrp_utils import get_async_client
+
+
+def _now():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def affected_accounts(country: str = None, counterparties=()):
+    """Ledger addresses we have paid whose receiver is in `country` or is one of `counterparties`."""
+    clauses, params = [], []
+    if country:
+        clauses.append("receiver_country = ?")
+        params.append(country)
+    if counterparties:
+        clauses.append(f"receiver IN ({','.join('?' * len(counterparties))})")
+        params += list(counterparties)
+    if not clauses:
+        return set()
+    with db_connection() as conn:
+        rows = conn.execute(
+            f"SELECT DISTINCT destination FROM transactions WHERE ({' OR '.join(clauses)}) AND destination IS NOT NULL",
+            params,
+        ).fetchall()
+    return {r[0] for r in rows}
+
+
+def _open_task(task_id: str, label: str, triggered_by: str, priority: str):
+    with db_connection() as conn:
+        conn.execute(
+            """INSERT INTO reconciliation_tasks (id, event_type, triggered_by, status, start_time, assigned_to, priority)
+               VALUES (?, ?, ?, 'processing', ?, 'Issuer', ?)""",
+            (task_id, label, triggered_by, _now(), priority),
+        )
+
+
+def _update_task(task_id: str, **fields):
+    assignments = ", ".join(f"{k} = ?" for k in fields)
+    with db_connection() as conn:
+        conn.execute(f"UPDATE reconciliation_tasks SET {assignments} WHERE id = ?", (*fields.values(), task_id))
+
+
+@timed("xrpl.bulk_freeze")
+async def bulk_freeze(accounts=(), country: str = None, counterparties=(), freeze: bool = True,
+                      event: dict = None, chunk_size: int = None, client=None):
+    """
+    Freeze (or with freeze=False, unfreeze) the GEO trust lines of the
+    affected holders. `event` (a geo_events row) labels the reconciliation
+    task. Returns a summary dict.
+    """
+    controller = get_token_controller()
+    if not controller.wallet:
+        raise ValueError("Issuer seed not configured")
+    country = normalize_country(country) if country else None
+    counterparties = list(dict.fromkeys(counterparties or ()))
+    chunk_size = chunk_size or settings.FREEZE_CHUNK_SIZE
+    event = event or {}
+    action = "Freeze" if freeze else "Unfreeze"
+    task_id = f"FRZ-{uuid.uuid4().hex[:10].upper()}"
+    label = f"{action} trust lines: {event.get('title') or country or ', '.join(counterparties) or 'listed accounts'}"
+
+    # SQLite calls go to a thread so a lock wait never stalls the event loop
+    await asyncio.to_thread(
+        _open_task, task_id, label, f"Geo event #{event['id']}" if event.get("id") else f"Manual {action.lower()}",
+        (event.get("severity") or "high").lower())
+
+    try:
+        candidates = set(accounts) | await asyncio.to_thread(affected_accounts, country, counterparties)
+        client = client or await get_async_client()
+        lines = await scan_trust_lines(client, controller.wallet.classic_address, controller.currency_code)
+        targets = [{"account": line["account"]} for line in lines
+                   if line["account"] in candidates and bool(line.get("freeze")) != freeze]
+        await asyncio.to_thread(_update_task, task_id, transactions_scanned=len(lines),
+                                transactions_flagged=len(targets))
+
+        engine = get_issuance_engine()
+        changed = failed = 0
+        for start in range(0, len(targets), chunk_size):
+            results = await engine.submit_batch(
+                targets[start:start + chunk_size], lambda t: controller.build_trust_set(t["account"], freeze), client)
+            for result in results:
+                if result["status"] == SUCCESS:
+                    changed += 1
+                else:
+                    failed += 1
+                    print(f"{action} of {result['account']} failed: {result['engine_result']}")
+            await asyncio.to_thread(_update_task, task_id, transactions_reconciled=changed)
+    except Exception:
+        await asyncio.to_thread(_update_task, task_id, status="failed", completion_time=_now())
+        raise
+
+    await asyncio.to_thread(_update_task, task_id, status="requires_review" if failed else "completed",
+                            completion_time=_now())
+    return {"task_id": task_id, "lines_scanned": len(lines), "candidates": len(candidates),
+            "targeted": len(targets), "changed": changed, "failed": failed}
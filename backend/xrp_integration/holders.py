@@ -0,0 +1,236 @@
+"""Local index of GEO holders: account, balance, frozen flag and last ledger.
+
+Portfolio and compliance queries read the token_holders table instead of
+asking the ledger. The index is:
+
+- built by rebuild_holder_index(): one paginated account_lines scan of the
+  issuer at a validated ledger, which replaces the table's rows;
+- kept current by sync_holder_index(): the issuer's account_tx since the
+  last indexed ledger. The RippleState nodes in each transaction's metadata
+  carry the line's final balance and flags, so replaying a ledger twice is
+  harmless. If the gap is larger than HOLDER_INDEX_MAX_GAP, or the node no
+  longer has that history, it rebuilds instead.
+
+holder_index_state records the validated ledger the index reflects.
+
+The query helpers take a connection (adb.read / db_connection) and do not
+import xrpl-py, so the API can use them without loading the XRPL stack.
+"""
+import asyncio
+from decimal import Decimal
+from config.config import settings
+from database.database import db_connection
+from observability.metrics import timed
+from .currency import encode_currency
+
+# RippleState flags: the low / high account has frozen the line
+LSF_LOW_FREEZE = 0x00400000
+LSF_HIGH_FREEZE = 0x00800000
+
+
+def _currency():
+    return encode_currency(settings.GEO_PULSE_CURRENCY_CODE)
+
+
+def _amount(value) -> str:
+    text = format(Decimal(value).normalize(), "f")
+    return "0" if text in ("-0", "0") else text
+
+
+def _index_state(conn, currency: str):
+    row = conn.execute("SELECT * FROM holder_index_state WHERE currency = ?", (currency,)).fetchone()
+    return dict(row) if row else None
+
+
+def _read_state(currency: str):
+    with db_connection() as conn:
+        return _index_state(conn, currency)
+
+
+def line_changes(meta: dict, issuer: str, currency: str):
+    """
+    (holder, balance, frozen) for each trust line between `issuer` and a
+    holder that a transaction's metadata touched. For a deleted line,
+    balance and frozen are None. Balances are from the holder's side.
+    """
+    changes = []
+    for node in meta.get("AffectedNodes", []):
+        kind, body = next(iter(node.items()))
+        if body.get("LedgerEntryType") != "RippleState":
+            continue
+        fields = body.get("FinalFields") or body.get("NewFields") or {}
+        low, high = fields.get("LowLimit", {}).get("issuer"), fields.get("HighLimit", {}).get("issuer")
+        if issuer not in (low, high) or fields.get("Balance", {}).get("currency") != currency:
+            continue
+        issuer_is_low = low == issuer
+        holder = high if issuer_is_low else low
+        if kind == "DeletedNode":
+            changes.append((holder, None, None))
+            continue
+        # Balance is from the low account's side: positive means low holds high's tokens
+        balance = Decimal(fields["Balance"]["value"])
+        flags = int(fields.get("Flags", 0))
+        frozen = bool(flags & (LSF_LOW_FREEZE if issuer_is_low else LSF_HIGH_FREEZE))
+        changes.append((holder, _amount(-balance if issuer_is_low else balance), frozen))
+    return changes
+
+
+@timed("holders.rebuild")
+async def rebuild_holder_index(client=None):
+    """Replace the index with one account_lines scan at the latest validated ledger. Returns the holder count."""
+    from xrpl.asyncio.ledger import get_latest_validated_ledger_sequence
+    from .token_controller import get_token_controller, scan_trust_lines
+    from .xrp_utils import get_async_client
+    controller = get_token_controller()
+    if not controller.wallet:
+        print("Holder index: issuer seed not configured, nothing to index")
+        return 0
+    issuer = controller.wallet.classic_address
+    currency = _currency()
+    client = client or await get_async_client()
+    ledger_index = await get_latest_validated_ledger_sequence(client)
+    lines = await scan_trust_lines(client, issuer, currency, ledger_index=ledger_index)
+    rows = [(line["account"], currency, _amount(-Decimal(line["balance"])), int(bool(line.get("freeze"))),
+             ledger_index) for line in lines]
+    # SQLite calls go to a thread so a lock wait never stalls the event loop
+    await asyncio.to_thread(_replace_index, currency, issuer, ledger_index, rows)
+    return len(rows)
+
+
+def _replace_index(currency: str, issuer: str, ledger_index: int, rows):
+    with db_connection() as conn:
+        conn.execute("DELETE FROM token_holders WHERE currency = ?", (currency,))
+        conn.executemany(
+            "INSERT INTO token_holders (account, currency, balance, frozen, last_ledger) VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+        conn.execute(
+            """INSERT INTO holder_index_state (currency, issuer, ledger_index, rebuilt_at, updated_at)
+               VALUES (?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+               ON CONFLICT (currency) DO UPDATE SET issuer = excluded.issuer, ledger_index = excluded.ledger_index,
+                   rebuilt_at = excluded.rebuilt_at, updated_at = excluded.updated_at""",
+            (currency, issuer, ledger_index),
+        )
+
+
+def _apply_changes(currency: str, changes, ledger_index: int):
+    """Write [(holder, balance, frozen, ledger)] and move the index to `ledger_index`, in one transaction."""
+    upserts = [(holder, currency, balance, int(frozen), ledger)
+               for holder, balance, frozen, ledger in changes if balance is not None]
+    deletes = [(holder, currency, ledger) for holder, balance, _, ledger in changes if balance is None]
+    with db_connection() as conn:
+        conn.executemany(
+            """INSERT INTO token_holders (account, currency, balance, frozen, last_ledger) VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT (account, currency) DO UPDATE SET balance = excluded.balance, frozen = excluded.frozen,
+                   last_ledger = excluded.last_ledger
+               WHERE excluded.last_ledger >= token_holders.last_ledger""",
+            upserts,
+        )
+        conn.executemany(
+            "DELETE FROM token_holders WHERE account = ? AND currency = ? AND last_ledger <= ?", deletes)
+        conn.execute(
+            "UPDATE holder_index_state SET ledger_index = ?, updated_at = CURRENT_TIMESTAMP WHERE currency = ?",
+            (ledger_index, currency),
+        )
+
+
+@timed("holders.sync")
+async def sync_holder_index(client=None):
+    """
+    Apply the issuer's validated transactions since the indexed ledger.
+    Returns {"ledger": validated index, "transactions": n, "changes": n, "rebuilt": bool}.
+    """
+    from xrpl.asyncio.ledger import get_latest_validated_ledger_sequence
+    from xrpl.models.requests import AccountTx
+    from .token_controller import get_token_controller
+    from .xrp_utils import get_async_client
+    controller = get_token_controller()
+    if not controller.wallet:
+        return {"ledger": None, "transactions": 0, "changes": 0, "rebuilt": False}
+    issuer = controller.wallet.classic_address
+    currency = _currency()
+    client = client or await get_async_client()
+    state = await asyncio.to_thread(_read_state, currency)
+    validated = await get_latest_validated_ledger_sequence(client)
+
+    def rebuilt(count):
+        return {"ledger": validated, "transactions": 0, "changes": count, "rebuilt": True}
+
+    if state is None or state["issuer"] != issuer or validated - state["ledger_index"] > settings.HOLDER_INDEX_MAX_GAP:
+        return rebuilt(await rebuild_holder_index(client))
+    if validated <= state["ledger_index"]:
+        return {"ledger": state["ledger_index"], "transactions": 0, "changes": 0, "rebuilt": False}
+
+    changes = []
+    transactions = 0
+    marker = None
+    # account_tx runs forward, so an entry without ledger_index is at least at the last one seen;
+    # that keeps its change ordered against the index (last_ledger is NOT NULL)
+    last_ledger = state["ledger_index"] + 1
+    while True:
+        response = await client.request(AccountTx(
+            account=issuer, ledger_index_min=state["ledger_index"] + 1, ledger_index_max=validated,
+            forward=True, limit=400, marker=marker,
+        ))
+        if not response.is_successful():
+            # Typically history the node no longer has
+            print(f"Holder index: account_tx failed ({response.result.get('error')}), rebuilding")
+            return rebuilt(await rebuild_holder_index(client))
+        for entry in response.result.get("transactions", []):
+            meta = entry.get("meta") or entry.get("metaData") or {}
+            if isinstance(meta, str):
+                continue  # binary metadata was not requested
+            transactions += 1
+            ledger = entry.get("ledger_index") or (entry.get("tx") or entry.get("tx_json") or {}).get("ledger_index")
+            ledger = last_ledger = ledger or last_ledger
+            changes.extend((holder, balance, frozen, ledger)
+                           for holder, balance, frozen in line_changes(meta, issuer, currency))
+        marker = response.result.get("marker")
+        if marker is None:
+            break
+    await asyncio.to_thread(_apply_changes, currency, changes, validated)
+    return {"ledger": validated, "transactions": transactions, "changes": len(changes), "rebuilt": False}
+
+
+# --- queries (no ledger round trip) ---
+
+def get_holder(conn, account: str, currency: str = None):
+    """The indexed trust line of `account`, or None if it holds no line."""
+    row = conn.execute(
+        "SELECT account, currency, balance, frozen, last_ledger FROM token_holders WHERE account = ? AND currency = ?",
+        (account, currency or _currency()),
+    ).fetchone()
+    return dict(row) if row else None
+
+
+def list_holders(conn, frozen: bool = None, min_balance: float = None, limit: int = 100, offset: int = 0,
+                 currency: str = None):
+    """Holders by balance, largest first."""
+    clauses, params = ["currency = ?"], [currency or _currency()]
+    if frozen is not None:
+        clauses.append("frozen = ?")
+        params.append(int(frozen))
+    if min_balance is not None:
+        clauses.append("CAST(balance AS REAL) >= ?")
+        params.append(min_balance)
+    rows = conn.execute(
+        f"""SELECT account, currency, balance, frozen, last_ledger FROM token_holders
+            WHERE {' AND '.join(clauses)} ORDER BY CAST(balance AS REAL) DESC, account LIMIT ? OFFSET ?""",
+        params + [limit, offset],
+    ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def holder_summary(conn, currency: str = None):
+    """Holder count, frozen count, circulating supply and the ledger the index reflects."""
+    currency = currency or _currency()
+    row = conn.execute(
+        """SELECT COUNT(*) AS holders, COALESCE(SUM(frozen), 0) AS frozen,
+                  COALESCE(SUM(CAST(balance AS REAL)), 0) AS supply
+           FROM token_holders WHERE currency = ?""",
+        (currency,),
+    ).fetchone()
+    state = _index_state(conn, currency)
+    return {"currency": currency, "holders": row["holders"], "frozen": row["frozen"],
+            "supply": round(row["supply"], 6), "ledger_index": state["ledger_index"] if state else None,
+            "updated_at": state["updated_at"] if state else None}
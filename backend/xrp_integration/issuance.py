@@ -0,0 +1,317 @@
+"""Pipelined issuance (and other batches of issuer transactions) from the GEO issuer account.
+
+autofill_and_sign costs three RPCs per transaction (account_info, fee,
+ledger_current), and reading the Sequence from the node means the next
+payment cannot be signed until the previous one has been applied. Here the
+issuer's Sequence is tracked locally, while the fee and the current ledger
+index are cached for a few seconds. So signing is local, and many payments
+can go out in the same ledger.
+
+IssuanceEngine.issue() sends a list of payments (any currency) in rounds:
+
+1. Sign every outstanding payment with consecutive local Sequences and one
+   shared LastLedgerSequence, then submit them with up to ISSUANCE_WINDOW
+   submits in flight. Those that overtook a predecessor (terPRE_SEQ) are
+   resent in Sequence order afterwards; terQUEUED means the node holds the
+   transaction until its turn.
+2. Follow each validated ledger with one account_tx scan, and match the
+   round's hashes.
+3. A payment is a dead candidate once its Sequence is below the account's
+   validated Sequence without its hash having been validated (tefPAST_SEQ:
+   someone else used the Sequence), or once LastLedgerSequence has passed.
+   It is dead, and its old blob can never apply, only when a Tx lookup over
+   the round's ledgers returns searched_all without finding it. Dead
+   payments are re-signed in the next round, after a resync from
+   account_info. A failed account_tx page settles nothing, and payments
+   still open after ISSUANCE_CONFIRM_TIMEOUT_SECONDS are reported
+   unconfirmed rather than re-signed. Nothing is paid twice.
+
+submit_batch() does the same for any issuer transaction (the bulk trust
+line freezes in xrp_integration.freeze use it).
+"""
+import asyncio
+import dataclasses
+import time
+from xrpl.models.requests import AccountInfo, Fee, LedgerCurrent, SubmitOnly
+from xrpl.asyncio.ledger import get_latest_validated_ledger_sequence
+from xrpl.transaction import sign
+from config.config import settings
+from observability.metrics import span, timed
+from .reconciliation import scan_account_tx, lookup_in_range, ScanIncomplete, FAILED, EXPIRED
+from .token_controller import get_token_controller
+from .xrp_utils import get_async_client
+
+# Results after which the transaction may still be validated: follow it by hash
+_IN_FLIGHT = {"tesSUCCESS", "terQUEUED", "tefALREADY", "tefPAST_SEQ", "terPRE_SEQ", "unknown"}
+# Submitted but neither validated nor proven dead before the confirm deadline
+UNCONFIRMED = "unconfirmed"
+
+
+class LedgerInfoCache:
+    """Open-ledger fee and current ledger index, each cached for a short TTL."""
+
+    def __init__(self, fee_ttl: float = None, ledger_ttl: float = None):
+        self.fee_ttl = settings.ISSUANCE_FEE_TTL_SECONDS if fee_ttl is None else fee_ttl
+        self.ledger_ttl = settings.ISSUANCE_LEDGER_TTL_SECONDS if ledger_ttl is None else ledger_ttl
+        self._fee = (None, 0.0)
+        self._current = (None, 0.0)
+
+    async def fee(self, client) -> str:
+        value, fetched = self._fee
+        if value is None or time.monotonic() - fetched > self.fee_ttl:
+            response = await client.request(Fee())
+            drops = response.result["drops"]
+            value = str(max(int(drops["open_ledger_fee"]), int(drops["minimum_fee"])))
+            value = str(min(int(value), settings.ISSUANCE_MAX_FEE_DROPS))
+            self._fee = (value, time.monotonic())
+        return value
+
+    async def current_index(self, client) -> int:
+        value, fetched = self._current
+        if value is None or time.monotonic() - fetched > self.ledger_ttl:
+            response = await client.request(LedgerCurrent())
+            value = int(response.result["ledger_current_index"])
+            self._current = (value, time.monotonic())
+        return value
+
+    def invalidate(self):
+        self._fee = (None, 0.0)
+        self._current = (None, 0.0)
+
+
+class SequenceAllocator:
+    """Next Sequence for one account, read from the node once and then counted locally."""
+
+    def __init__(self, account: str):
+        self.account = account
+        self._next = None
+        self._lock = None
+        self._loop = None
+
+    def _get_lock(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._lock, self._loop = asyncio.Lock(), loop
+        return self._lock
+
+    async def next(self, client) -> int:
+        async with self._get_lock():
+            if self._next is None:
+                self._next = await account_sequence(client, self.account, "current")
+            value, self._next = self._next, self._next + 1
+            return value
+
+    async def reserve(self, client, count: int):
+        """`count` consecutive Sequences (first, ..., first + count - 1)."""
+        async with self._get_lock():
+            if self._next is None:
+                self._next = await account_sequence(client, self.account, "current")
+            first, self._next = self._next, self._next + count
+            return range(first, first + count)
+
+    def invalidate(self):
+        """Re-read the Sequence from the node on next use (after tefPAST_SEQ / terPRE_SEQ)."""
+        self._next = None
+
+
+async def account_sequence(client, account: str, ledger_index="current") -> int:
+    response = await client.request(AccountInfo(account=account, ledger_index=ledger_index))
+    if not response.is_successful():
+        raise RuntimeError(f"account_info failed: {response.result.get('error')}")
+    return int(response.result["account_data"]["Sequence"])
+
+
+class IssuanceEngine:
+    def __init__(self, controller=None, window: int = None, lls_offset: int = None,
+                 max_rounds: int = None, poll_interval: float = None, confirm_timeout: float = None):
+        self.controller = controller or get_token_controller()
+        if not self.controller.wallet:
+            raise ValueError("Issuer seed not configured")
+        self.wallet = self.controller.wallet
+        self.window = window or settings.ISSUANCE_WINDOW
+        self.lls_offset = lls_offset or settings.ISSUANCE_LLS_OFFSET
+        self.max_rounds = max_rounds or settings.ISSUANCE_MAX_ROUNDS
+        self.poll_interval = settings.ISSUANCE_POLL_SECONDS if poll_interval is None else poll_interval
+        self.confirm_timeout = confirm_timeout or settings.ISSUANCE_CONFIRM_TIMEOUT_SECONDS
+        self.sequences = SequenceAllocator(self.wallet.classic_address)
+        self.ledger = LedgerInfoCache()
+        self.stats = {"signed": 0, "submitted": 0, "pre_seq_resubmits": 0, "queued": 0,
+                      "past_seq": 0, "resyncs": 0, "rounds": 0, "unconfirmed": 0}
+
+    async def sign(self, unsigned_tx, client, sequence: int = None, last_ledger_sequence: int = None):
+        """Sign with a local Sequence and the cached fee / ledger index (no per-transaction autofill)."""
+        fee = await self.ledger.fee(client)
+        if last_ledger_sequence is None:
+            last_ledger_sequence = await self.ledger.current_index(client) + self.lls_offset
+        if sequence is None:
+            sequence = await self.sequences.next(client)
+        filled = dataclasses.replace(unsigned_tx, sequence=sequence, fee=fee,
+                                     last_ledger_sequence=last_ledger_sequence)
+        self.stats["signed"] += 1
+        # Off the event loop, so earlier submits keep moving while this one is signed
+        return await asyncio.to_thread(sign, filled, self.wallet)
+
+    async def _submit(self, client, blob: str, semaphore=None):
+        try:
+            if semaphore is None:
+                with span("xrpl.submit"):
+                    response = await client.request(SubmitOnly(tx_blob=blob))
+            else:
+                async with semaphore:
+                    with span("xrpl.submit"):
+                        response = await client.request(SubmitOnly(tx_blob=blob))
+        except Exception as e:
+            # Unknown whether it reached the node: follow it by hash like any other
+            print(f"Issuance submit error: {e}")
+            return "unknown"
+        return response.result.get("engine_result", response.result.get("error", "unknown"))
+
+    async def _submit_item(self, client, item, previous, semaphore):
+        """
+        Submit one signed transaction. Concurrent submits can overtake each
+        other, and a node need not hold a transaction whose predecessor has not
+        arrived yet (terPRE_SEQ): such a one is resent once the previous
+        Sequence has been submitted.
+        """
+        try:
+            if previous is not None and previous.get("stalled"):
+                # Sending now would only overtake it again
+                await previous["done"].wait()
+            item["result"] = await self._submit(client, item["blob"], semaphore)
+            if item["result"] == "terPRE_SEQ" and previous is not None:
+                item["stalled"] = True
+                await previous["done"].wait()
+                self.stats["pre_seq_resubmits"] += 1
+                item["result"] = await self._submit(client, item["blob"], semaphore)
+        finally:
+            item["done"].set()
+
+    async def _submit_round(self, client, entries, build):
+        """
+        Sign and submit one round. Returns ([{entry, sequence, hash, result, ...}], LastLedgerSequence).
+        Each submit starts as soon as its transaction is signed, so signing
+        overlaps with the submits already on the wire.
+        """
+        lls = await self.ledger.current_index(client) + self.lls_offset
+        sequences = await self.sequences.reserve(client, len(entries))
+        semaphore = asyncio.Semaphore(self.window)
+        items, tasks = [], []
+        for entry, sequence in zip(entries, sequences):
+            tx = await self.sign(build(entry), client, sequence=sequence, last_ledger_sequence=lls)
+            item = {"entry": entry, "sequence": sequence, "blob": tx.blob(), "hash": tx.get_hash(),
+                    "done": asyncio.Event()}
+            tasks.append(asyncio.create_task(self._submit_item(client, item, items[-1] if items else None, semaphore)))
+            items.append(item)
+        await asyncio.gather(*tasks)
+        results = [item["result"] for item in items]
+        self.stats["submitted"] += len(items)
+        self.stats["queued"] += results.count("terQUEUED")
+        self.stats["past_seq"] += results.count("tefPAST_SEQ")
+        return items, lls
+
+    async def _confirm(self, client, items, lls: int, start_ledger: int):
+        """
+        Follow validated ledgers until every in-flight transaction of the round
+        is validated or proven dead, or the confirm deadline passes. Returns
+        ({hash: success|failed}, [dead entries], {hashes still unconfirmed}).
+        """
+        account = self.wallet.classic_address
+        waiting = {item["hash"]: item for item in items if item["result"] in _IN_FLIGHT}
+        outcomes = {}
+        dead = []
+        scanned_to = start_ledger - 1
+        deadline = time.monotonic() + self.confirm_timeout
+        while waiting and time.monotonic() < deadline:
+            validated = await get_latest_validated_ledger_sequence(client)
+            if validated > scanned_to:
+                try:
+                    found = await scan_account_tx(client, account, scanned_to + 1, validated, set(waiting))
+                except ScanIncomplete as e:
+                    # Nothing is settled from a partial scan; try the same range again
+                    print(f"Issuance confirm: {e}")
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                for h, outcome in found.items():
+                    if outcome:
+                        outcomes[h] = outcome
+                        waiting.pop(h, None)
+                # Read at the same ledger as the scan: a Sequence below this was used by something else
+                account_seq = await account_sequence(client, account, validated)
+                candidates = [item for item in waiting.values() if item["sequence"] < account_seq or validated > lls]
+                # The scan says they are missing; only the node's searched_all proves it
+                semaphore = asyncio.Semaphore(self.window)
+
+                async def check(item):
+                    async with semaphore:
+                        return await lookup_in_range(client, item["hash"], start_ledger, min(validated, lls))
+                checked = await asyncio.gather(*(check(item) for item in candidates), return_exceptions=True)
+                for item, outcome in zip(candidates, checked):
+                    if outcome == EXPIRED:
+                        dead.append(item["entry"])
+                        del waiting[item["hash"]]
+                    elif isinstance(outcome, str):
+                        outcomes[item["hash"]] = outcome
+                        del waiting[item["hash"]]
+                scanned_to = validated
+            if waiting:
+                await asyncio.sleep(self.poll_interval)
+        return outcomes, dead, set(waiting)
+
+    async def submit_batch(self, entries, build, client=None):
+        """
+        Sign and submit one issuer transaction per entry, `build(entry)`
+        giving the unsigned transaction. Returns one dict per entry, in input
+        order: the entry plus status (success / failed), tx_hash and engine_result.
+        """
+        client = client or await get_async_client()
+        results = [dict(e) for e in entries]
+        outstanding = list(range(len(results)))
+        for _ in range(self.max_rounds):
+            if not outstanding:
+                break
+            self.stats["rounds"] += 1
+            start_ledger = await get_latest_validated_ledger_sequence(client) + 1
+            items, lls = await self._submit_round(
+                client, [dict(results[i], index=i) for i in outstanding], build)
+            for item in items:
+                results[item["entry"]["index"]].update(
+                    tx_hash=item["hash"], engine_result=item["result"],
+                    # tem / tel / tec before applying: final for this entry
+                    status=None if item["result"] in _IN_FLIGHT else FAILED)
+            outcomes, dead, unconfirmed = await self._confirm(client, items, lls, start_ledger)
+            for item in items:
+                if item["hash"] in outcomes:
+                    results[item["entry"]["index"]]["status"] = outcomes[item["hash"]]
+                elif item["hash"] in unconfirmed:
+                    # May still validate: never re-signed, left for the caller to reconcile by hash
+                    results[item["entry"]["index"]]["status"] = UNCONFIRMED
+                    self.stats["unconfirmed"] += 1
+            if dead or any(item["result"] == "tefPAST_SEQ" for item in items):
+                # Another signer used our Sequences, or a gap stranded the later ones: resync
+                self.sequences.invalidate()
+                self.ledger.invalidate()
+                self.stats["resyncs"] += 1
+            outstanding = [e["index"] for e in dead]
+        for i in outstanding:
+            results[i].update(status=FAILED, engine_result="expired")
+        for result in results:
+            result.pop("index", None)
+        return results
+
+    @timed("xrpl.issue_batch")
+    async def issue(self, payments, client=None):
+        """Issue `payments` (dicts with destination, amount and optional currency). See submit_batch."""
+        return await self.submit_batch(
+            payments, lambda p: self.controller.build_payment(p["destination"], p["amount"], p.get("currency")),
+            client)
+
+
+_engine = None
+
+
+def get_issuance_engine():
+    """Process-wide engine (shares the local Sequence with the outbox)."""
+    global _engine
+    if _engine is None:
+        _engine = IssuanceEngine()
+    return _engine
@@ -0,0 +1,177 @@
+"""Durable outbox for XRPL payments.
+
+The API only records a `pending_submission` row; drain_outbox() later signs
+and submits it, and tasks.reconcile_task confirms the ledger outcome.
+
+Row lifecycle:
+    pending_submission -> submitting (claimed) -> submitted -> success / failed
+
+The signed blob, Sequence and LastLedgerSequence are stored *before* the
+first submit, so a retry re-sends the exact same transaction (same hash)
+and can never pay twice. A row is only re-signed once reconciliation has
+seen its LastLedgerSequence pass without the hash being validated.
+
+Only unsigned rows and tem* (malformed) results end up `failed` here. A
+signed row that runs out of submit attempts may still validate until its
+LastLedgerSequence, so it goes to `submitted` and reconciliation decides.
+
+xrpl-py is imported on the first submit, not with this module: the API
+imports enqueue_payment and should not pay for the XRPL stack at startup.
+"""
+import asyncio
+import uuid
+from config.config import settings
+from database.database import db_connection
+from database.models import insert_transaction
+from observability.metrics import span, timed
+
+PENDING = "pending_submission"
+SUBMITTING = "submitting"
+SUBMITTED = "submitted"
+FAILED = "failed"
+
+# Engine results meaning "the ledger has it (or will)": hand over to reconciliation.
+# tefPAST_SEQ / tefMAX_LEDGER on a stored blob may mean an earlier attempt already
+# got in, so reconciliation decides those by hash as well.
+_HANDOFF_RESULTS = {"tesSUCCESS", "terQUEUED", "tefALREADY", "tefPAST_SEQ", "tefMAX_LEDGER"}
+# Sequences come from the issuance engine's local counter; these mean it is out of step
+_RESYNC_RESULTS = {"tefPAST_SEQ", "terPRE_SEQ"}
+
+
+def enqueue_payment(conn, destination, amount, sender, receiver, currency,
+                    compliance_check_passed=True, risk_score_at_time=None,
+                    sender_country=None, receiver_country=None):
+    """Record a payment for later submission. The hash is a placeholder until the row is signed."""
+    return insert_transaction(
+        conn, f"pending_{uuid.uuid4().hex}", sender, receiver, amount, currency, PENDING,
+        compliance_check_passed=compliance_check_passed, risk_score_at_time=risk_score_at_time,
+        destination=destination, sender_country=sender_country, receiver_country=receiver_country,
+    )
+
+
+@timed("outbox.claim_batch")
+def claim_batch(limit: int = None):
+    """
+    Atomically move up to `limit` rows to `submitting`, including claims
+    abandoned by a dead worker. Failed attempts wait OUTBOX_RETRY_DELAY_SECONDS.
+    """
+    limit = limit or settings.OUTBOX_BATCH_SIZE
+    stale = f"-{int(settings.OUTBOX_CLAIM_TIMEOUT_SECONDS)} seconds"
+    backoff = f"-{int(settings.OUTBOX_RETRY_DELAY_SECONDS)} seconds"
+    with db_connection() as conn:
+        rows = conn.execute(
+            f"""UPDATE transactions SET status = '{SUBMITTING}', updated_at = CURRENT_TIMESTAMP
+                WHERE id IN (SELECT id FROM transactions WHERE status = '{PENDING}'
+                             AND (submit_attempts = 0 OR updated_at < datetime('now', ?))
+                             ORDER BY id LIMIT ?)
+                   OR id IN (SELECT id FROM transactions WHERE status = '{SUBMITTING}'
+                             AND updated_at < datetime('now', ?) LIMIT ?)
+                RETURNING *""",
+            (backoff, limit, stale, limit),
+        ).fetchall()
+    return sorted((dict(r) for r in rows), key=lambda r: r["id"])
+
+
+def _update(row_id, **fields):
+    assignments = "".join(f"{k} = ?, " for k in fields)
+    with db_connection() as conn:
+        conn.execute(
+            f"UPDATE transactions SET {assignments}updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (*fields.values(), row_id),
+        )
+
+
+async def _retry_or_fail(row, error: str, signed: bool):
+    """Back to pending for another try; out of attempts, failed - unless a signed blob may still land."""
+    attempts = (row.get("submit_attempts") or 0) + 1
+    if attempts < settings.OUTBOX_MAX_ATTEMPTS:
+        status = PENDING
+    else:
+        status = SUBMITTED if signed else FAILED
+    await asyncio.to_thread(_update, row["id"], status=status, submit_attempts=attempts, last_error=error[:500])
+    return status
+
+
+@timed("xrpl.sign")
+async def _sign_and_persist(row, controller, client):
+    """Sign under the issuer lock (local Sequence, cached fee) and store the blob before anything is sent."""
+    from .issuance import get_issuance_engine
+    payment_tx = controller.build_payment(row["destination"], row["amount"], row.get("currency"))
+    signed_tx = await get_issuance_engine().sign(payment_tx, client)
+    blob = signed_tx.blob()
+    await asyncio.to_thread(
+        _update, row["id"], tx_hash=signed_tx.get_hash(), signed_blob=blob,
+        sequence=signed_tx.sequence, last_ledger_sequence=signed_tx.last_ledger_sequence,
+    )
+    return blob
+
+
+@timed("outbox.submit_row")
+async def submit_row(row, controller=None, client=None):
+    """Submit one claimed row. Returns its new status."""
+    from xrpl.models.requests import SubmitOnly
+    from .token_controller import get_token_controller
+    from .xrp_utils import get_async_client
+    controller = controller or get_token_controller()
+    if not controller.wallet:
+        # Mock ledger: nothing to sign, hand straight to reconciliation
+        result = controller.mock_issue(row["destination"], row["amount"]).result
+        await asyncio.to_thread(_update, row["id"], status=SUBMITTED, tx_hash=result["tx_json"]["hash"])
+        return SUBMITTED
+
+    blob = row.get("signed_blob")
+    fresh = not blob
+    try:
+        client = client or await get_async_client()
+        if blob:
+            # Retry: same blob, same hash - idempotent on the ledger
+            with span("xrpl.submit"):
+                response = await client.request(SubmitOnly(tx_blob=blob))
+        else:
+            # Sequence assignment and first submit stay together so rows get consecutive sequences
+            async with controller.submit_lock():
+                blob = await _sign_and_persist(row, controller, client)
+                with span("xrpl.submit"):
+                    response = await client.request(SubmitOnly(tx_blob=blob))
+    except Exception as e:
+        print(f"Outbox submit error for tx {row['id']}: {e}")
+        # `blob` is set once it is stored, even if the submit itself then failed
+        return await _retry_or_fail(row, str(e), signed=bool(blob))
+
+    engine = response.result.get("engine_result", response.result.get("error", "unknown"))
+    if engine in _RESYNC_RESULTS or (fresh and engine not in _HANDOFF_RESULTS and not engine.startswith("tec")):
+        # The local Sequence disagrees with the ledger, or this Sequence was not used: re-read it
+        from .issuance import get_issuance_engine
+        get_issuance_engine().sequences.invalidate()
+    if engine in _HANDOFF_RESULTS or engine.startswith("tec"):
+        await asyncio.to_thread(
+            _update, row["id"], status=SUBMITTED,
+            submit_attempts=(row.get("submit_attempts") or 0) + 1, last_error=None,
+        )
+        return SUBMITTED
+    if engine.startswith("tem"):
+        # Malformed: retrying the same blob can never succeed
+        await asyncio.to_thread(_update, row["id"], status=FAILED, last_error=engine)
+        return FAILED
+    return await _retry_or_fail(row, engine, signed=True)
+
+
+async def drain_outbox(limit: int = None, max_batches: int = None):
+    """Claim and submit pending rows until the outbox is empty. Returns {status: count}."""
+    counts = {}
+    from .token_controller import get_token_controller
+    from .xrp_utils import get_async_client
+    controller = get_token_controller()
+    client = await get_async_client() if controller.wallet else None
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        # SQLite calls go to a thread so a lock wait never stalls the event loop
+        rows = await asyncio.to_thread(claim_batch, limit)
+        if not rows:
+            break
+        batches += 1
+        # Signing is serialized by the issuer lock; network waits overlap
+        statuses = await asyncio.gather(*(submit_row(r, controller, client) for r in rows))
+        for status in statuses:
+            counts[status] = counts.get(status, 0) + 1
+    return counts
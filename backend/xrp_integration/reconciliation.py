@@ -0,0 +1,206 @@
+"""Reconciliation engine for submitted XRPL payments.
+
+Pages through `submitted` rows in id order (RECONCILE_CHUNK_SIZE at a time)
+and resolves each chunk against validated ledgers:
+
+1. Range scan: when a chunk has enough signed rows, page through the
+   issuer's account_tx over the ledgers their LastLedgerSequence windows
+   cover - one RPC matches up to 400 hashes.
+2. Lookups: hashes the scan did not settle get individual Tx requests,
+   at most RECONCILE_CONCURRENCY in flight.
+
+A row is only expired (and re-signed by the outbox) when a Tx lookup
+bounded to the ledgers it could have landed in comes back txnNotFound with
+searched_all: the node must prove it has that whole history. An
+incomplete account_tx scan never settles anything on its own.
+
+Status changes are written per chunk with executemany in one transaction.
+"""
+import asyncio
+import re
+from xrpl.asyncio.ledger import get_latest_validated_ledger_sequence
+from xrpl.models.requests import AccountTx, Tx
+from config.config import settings
+from database.database import db_connection
+from observability.metrics import timed
+from .token_controller import get_token_controller
+from .xrp_utils import get_async_client
+
+_LEDGER_HASH = re.compile(r"^[0-9A-Fa-f]{64}$")
+
+SUCCESS = "success"
+FAILED = "failed"
+EXPIRED = "expired"  # never validated and past LastLedgerSequence: requeue in the outbox
+
+
+class ScanIncomplete(Exception):
+    """An account_tx page failed, so hashes missing from the scan may still be on the ledger."""
+
+
+def _fetch_chunk(after_id: int, limit: int):
+    with db_connection() as conn:
+        rows = conn.execute(
+            """SELECT id, tx_hash, last_ledger_sequence FROM transactions
+               WHERE status = 'submitted' AND id > ? ORDER BY id LIMIT ?""",
+            (after_id, limit),
+        ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def _apply_outcomes(rows, outcomes):
+    by_status = {SUCCESS: [], FAILED: [], EXPIRED: []}
+    for row in rows:
+        status = outcomes.get(row["tx_hash"])
+        if status in by_status:
+            by_status[status].append((row["id"],))
+    with db_connection() as conn:
+        for status in (SUCCESS, FAILED):
+            if by_status[status]:
+                conn.executemany(
+                    f"UPDATE transactions SET status = '{status}', updated_at = CURRENT_TIMESTAMP "
+                    "WHERE id = ? AND status = 'submitted'",
+                    by_status[status],
+                )
+        if by_status[EXPIRED]:
+            conn.executemany(
+                """UPDATE transactions SET status = 'pending_submission', signed_blob = NULL,
+                       sequence = NULL, last_ledger_sequence = NULL, updated_at = CURRENT_TIMESTAMP
+                   WHERE id = ? AND status = 'submitted'""",
+                by_status[EXPIRED],
+            )
+    return {status: len(ids) for status, ids in by_status.items()}
+
+
+def _entry_outcome(entry):
+    """success/failed for a validated tx entry (Tx result or account_tx item), else None."""
+    if not entry.get("validated"):
+        return None
+    meta = entry.get("meta") or entry.get("metaData") or {}
+    return SUCCESS if meta.get("TransactionResult") == "tesSUCCESS" else FAILED
+
+
+async def scan_account_tx(client, account: str, ledger_min: int, ledger_max: int, wanted):
+    """
+    Page through account_tx for [ledger_min, ledger_max]; returns {hash: outcome}
+    for hashes in `wanted`. Raises ScanIncomplete if a page fails.
+    """
+    found = {}
+    marker = None
+    while True:
+        response = await client.request(AccountTx(
+            account=account, ledger_index_min=ledger_min, ledger_index_max=ledger_max,
+            forward=True, limit=400, marker=marker,
+        ))
+        if not response.is_successful():
+            raise ScanIncomplete(f"account_tx failed for {ledger_min}-{ledger_max}: {response.result.get('error')}")
+        for entry in response.result.get("transactions", []):
+            h = entry.get("hash") or (entry.get("tx") or entry.get("tx_json") or {}).get("hash")
+            if h in wanted:
+                found[h] = _entry_outcome({**entry, "validated": entry.get("validated", True)})
+        marker = response.result.get("marker")
+        if marker is None or len(found) == len(wanted):
+            break
+    return found
+
+
+def search_window(last_ledger_sequence: int):
+    """
+    (min_ledger, max_ledger) a transaction with this LastLedgerSequence can be in.
+    It was signed at LastLedgerSequence - ISSUANCE_LLS_OFFSET at the latest;
+    the wider of the two offsets keeps the lower bound at or before that.
+    """
+    offset = max(settings.ISSUANCE_LLS_OFFSET, settings.RECONCILE_LLS_WINDOW)
+    return max(last_ledger_sequence - offset, 1), last_ledger_sequence
+
+
+async def lookup_in_range(client, tx_hash: str, min_ledger: int, max_ledger: int):
+    """
+    success/failed if validated in [min_ledger, max_ledger]; EXPIRED if the
+    node searched that whole range without finding it (searched_all); else None.
+    """
+    response = await client.request(Tx(transaction=tx_hash, min_ledger=min_ledger, max_ledger=max_ledger))
+    if response.is_successful():
+        return _entry_outcome(response.result)
+    if response.result.get("error") == "txnNotFound" and response.result.get("searched_all") is True:
+        return EXPIRED
+    return None
+
+
+async def lookup(client, tx_hash: str, last_ledger_sequence=None, validated_index: int = None):
+    """
+    success/failed once validated; EXPIRED only if the node searched every
+    ledger up to LastLedgerSequence without finding it; otherwise None.
+    """
+    if last_ledger_sequence and validated_index and validated_index > last_ledger_sequence:
+        return await lookup_in_range(client, tx_hash, *search_window(last_ledger_sequence))
+    response = await client.request(Tx(transaction=tx_hash))
+    return _entry_outcome(response.result) if response.is_successful() else None
+
+
+async def _lookup(client, semaphore, tx_hash: str, last_ledger_sequence, validated_index: int):
+    async with semaphore:
+        try:
+            return await lookup(client, tx_hash, last_ledger_sequence, validated_index)
+        except Exception as e:
+            print(f"Error reconciling tx {tx_hash}: {e}")
+            return None
+
+
+@timed("reconcile.resolve_chunk")
+async def resolve_chunk(rows, client, validated_index: int, issuer: str = None):
+    """Returns {tx_hash: success|failed|expired} for the rows that are final."""
+    rows = [r for r in rows if r["tx_hash"] and _LEDGER_HASH.match(r["tx_hash"])]
+    outcomes = {}
+
+    # 1. One account_tx scan over the ledgers these transactions could land in
+    signed = [r for r in rows if r["last_ledger_sequence"]]
+    if issuer and validated_index and len(signed) >= settings.RECONCILE_SCAN_THRESHOLD:
+        ledger_min = min(r["last_ledger_sequence"] for r in signed) - settings.RECONCILE_LLS_WINDOW
+        ledger_max = min(max(r["last_ledger_sequence"] for r in signed), validated_index)
+        try:
+            found = await scan_account_tx(client, issuer, max(ledger_min, 1), ledger_max,
+                                          {r["tx_hash"] for r in signed})
+            outcomes.update({h: o for h, o in found.items() if o})
+        except ScanIncomplete as e:
+            # Partial pages prove nothing; the per-hash lookups below decide every row
+            print(f"Reconciliation scan incomplete, falling back to lookups: {e}")
+
+    # 2. Bounded-concurrency Tx lookups for whatever is left
+    semaphore = asyncio.Semaphore(settings.RECONCILE_CONCURRENCY)
+    remaining = [r for r in rows if r["tx_hash"] not in outcomes]
+    results = await asyncio.gather(*(
+        _lookup(client, semaphore, r["tx_hash"], r["last_ledger_sequence"], validated_index)
+        for r in remaining
+    ))
+    for row, outcome in zip(remaining, results):
+        if outcome:
+            outcomes[row["tx_hash"]] = outcome
+    return outcomes
+
+
+@timed("reconcile.sweep")
+async def reconcile_pending(chunk_size: int = None, client=None):
+    """Sweep every `submitted` row once. Returns counts per outcome."""
+    chunk_size = chunk_size or settings.RECONCILE_CHUNK_SIZE
+    client = client or await get_async_client()
+    controller = get_token_controller()
+    issuer = controller.wallet.classic_address if controller.wallet else None
+    try:
+        validated_index = await get_latest_validated_ledger_sequence(client)
+    except Exception as e:
+        print(f"Could not fetch validated ledger index: {e}")
+        validated_index = None
+
+    totals = {"scanned": 0, SUCCESS: 0, FAILED: 0, EXPIRED: 0}
+    last_id = 0
+    while True:
+        rows = await asyncio.to_thread(_fetch_chunk, last_id, chunk_size)
+        if not rows:
+            break
+        last_id = rows[-1]["id"]
+        outcomes = await resolve_chunk(rows, client, validated_index, issuer)
+        counts = await asyncio.to_thread(_apply_outcomes, rows, outcomes)
+        totals["scanned"] += len(rows)
+        for status, n in counts.items():
+            totals[status] += n
+    return totals
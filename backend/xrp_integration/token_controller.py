@@ -1,9 +1,35 @@
+import asyncio
 from xrpl.models.transactions import Payment, TrustSet
 from xrpl.transaction import submit_and_wait, autofill_and_sign
 from xrpl.models.amounts import IssuedCurrencyAmount
 from xrpl.models.requests import AccountLines
+from .currency import encode_currency
 from .xrp_utils import get_client, get_wallet_from_seed
 from config.config import settings
+from observability.metrics import timed
+
+
+async def scan_trust_lines(client, issuer: str, currency: str = None, limit: int = 400, ledger_index="validated"):
+    """
+    Every trust line to `issuer` (optionally one currency) as of `ledger_index`,
+    paging through account_lines. Returns [{account, balance, freeze, ...}] as the ledger
+    reports them from the issuer's side: `freeze` means the issuer froze it,
+    and balances are negative (what the issuer owes the holder).
+    """
+    currency = encode_currency(currency) if currency else None
+    lines = []
+    marker = None
+    while True:
+        response = await client.request(AccountLines(account=issuer, ledger_index=ledger_index,
+                                                     limit=limit, marker=marker))
+        if not response.is_successful():
+            raise RuntimeError(f"account_lines failed: {response.result.get('error')}")
+        lines.extend(line for line in response.result.get("lines", [])
+                     if currency is None or line.get("currency") == currency)
+        marker = response.result.get("marker")
+        if marker is None:
+            return lines
+
 
 class TokenController:
     def __init__(self):
@@ -20,70 +46,88 @@ class TokenController:
             self.wallet = None
 
         self.currency_code = settings.GEO_PULSE_CURRENCY_CODE
+        self._submit_lock = None
+        self._submit_lock_loop = None
 
-    def issue_token(self, destination: str, amount: str):
-        if not self.wallet:
-            # Mock Response for Demo/Fallback
-            print(f"[Mock Ledger] Issuing {amount} {self.currency_code} to {destination}")
-            import uuid
-            class MockResult:
-                def __init__(self):
-                    self.result = {
-                        "tx_json": {"hash": "mock_" + str(uuid.uuid4())},
-                        "engine_result": "tesSUCCESS"
-                    }
-            return MockResult()
-        
+    def mock_issue(self, destination: str, amount: str):
+        # Mock Response for Demo/Fallback
+        print(f"[Mock Ledger] Issuing {amount} {self.currency_code} to {destination}")
+        import uuid
+        class MockResult:
+            def __init__(self):
+                self.result = {
+                    "tx_json": {"hash": "mock_" + str(uuid.uuid4())},
+                    "engine_result": "tesSUCCESS"
+                }
+        return MockResult()
+
+    def build_payment(self, destination: str, amount: str, currency: str = None):
         issue_amount = IssuedCurrencyAmount(
-            currency=self.currency_code,
+            currency=encode_currency(currency or self.currency_code),
             issuer=self.wallet.classic_address,
             value=amount
         )
 
-        payment_tx = Payment(
+        return Payment(
             account=self.wallet.classic_address,
             amount=issue_amount,
             destination=destination
         )
+
+    @timed("xrpl.issue_token")
+    def issue_token(self, destination: str, amount: str):
+        if not self.wallet:
+            return self.mock_issue(destination, amount)
+
+        payment_tx = self.build_payment(destination, amount)
         
         # Sign and submit
         signed_tx = autofill_and_sign(payment_tx, self.client, self.wallet)
         response = submit_and_wait(signed_tx, self.client)
         return response
 
-    def freeze_trustline(self, target_account: str, freeze: bool = True):
-        # To freeze a trustline, the issuer sends a TrustSet transaction
-        # setting the SetFlag to tfSetFreeze (or ClearFlag to tfClearFreeze)
-        # Note: This freezes the individual trustline from the issuer's side.
-        
-        if not self.wallet:
-            raise ValueError("Issuer seed not configured")
+    def submit_lock(self):
+        """Lock serializing sequence assignment for the issuer account (one per event loop)."""
+        loop = asyncio.get_running_loop()
+        if self._submit_lock_loop is not loop:
+            self._submit_lock, self._submit_lock_loop = asyncio.Lock(), loop
+        return self._submit_lock
 
-        # Flag for freezing is 0x00200000 (tfSetFreeze)
-        # But we use the TrustSet flags property.
-        # Actually in xrpl-py, we set flags on the TrustSet object.
-        # For individual freeze, we set the 'Freeze' flag on the trust line.
-        
-        # However, it's easier to just use the flag integer.
-        # tfSetFreeze = 6
-        # tfClearFreeze = 7
-        
-        flags = 0
-        if freeze:
-            flags = 1 << 20 # tfSetFreeze
-        else:
-            flags = 1 << 21 # tfClearFreeze
-
-        trust_set_tx = TrustSet(
+    def build_trust_set(self, target_account: str, freeze: bool = True, currency: str = None):
+        """
+        Issuer-side TrustSet that freezes (tfSetFreeze) or unfreezes
+        (tfClearFreeze) the target's trust line. Freezing individual lines
+        from the issuer's side only; the limit is required but ignored.
+        """
+        flags = 1 << 20 if freeze else 1 << 21  # tfSetFreeze / tfClearFreeze
+        return TrustSet(
             account=self.wallet.classic_address,
             limit_amount=IssuedCurrencyAmount(
-                currency=self.currency_code,
+                currency=encode_currency(currency or self.currency_code),
                 issuer=target_account, # The other party
-                value="0" # Limit doesn't matter for freezing, but required
+                value="0"
             ),
             flags=flags
         )
 
+    @timed("xrpl.freeze_trustline")
+    def freeze_trustline(self, target_account: str, freeze: bool = True):
+        # One line, waiting for validation; xrp_integration.freeze does many at once
+        if not self.wallet:
+            raise ValueError("Issuer seed not configured")
+
+        trust_set_tx = self.build_trust_set(target_account, freeze)
         signed_tx = autofill_and_sign(trust_set_tx, self.client, self.wallet)
         response = submit_and_wait(signed_tx, self.client)
         return response
+
+
+_token_controller = None
+
+
+def get_token_controller():
+    """Process-wide TokenController (wallet derived once, shared async client)."""
+    global _token_controller
+    if _token_controller is None:
+        _token_controller = TokenController()
+    return _token_controller
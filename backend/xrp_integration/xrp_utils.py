@@ -1,10 +1,87 @@
+import asyncio
+from json import JSONDecodeError
+import httpx
 from xrpl.clients import JsonRpcClient
+from xrpl.asyncio.clients import AsyncJsonRpcClient, AsyncWebsocketClient, XRPLRequestFailureException
+from xrpl.asyncio.clients.utils import json_to_response, request_to_json_rpc
 from xrpl.wallet import Wallet, generate_faucet_wallet
 from config.config import settings
 
 def get_client():
     return JsonRpcClient(settings.XRPL_NODE_URL)
 
+
+class PooledAsyncJsonRpcClient(AsyncJsonRpcClient):
+    """
+    AsyncJsonRpcClient that reuses one httpx connection pool.
+    (xrpl-py opens a fresh httpx.AsyncClient - and TLS handshake - per request.)
+    """
+
+    def __init__(self, url: str, max_connections: int = None, timeout: float = None):
+        super().__init__(url)
+        max_connections = max_connections or settings.XRPL_MAX_CONNECTIONS
+        self._http = httpx.AsyncClient(
+            timeout=timeout or settings.XRPL_REQUEST_TIMEOUT,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def _request_impl(self, request, *, timeout: float = None):
+        kwargs = {"timeout": timeout} if timeout else {}
+        response = await self._http.post(self.url, json=request_to_json_rpc(request), **kwargs)
+        try:
+            return json_to_response(response.json())
+        except JSONDecodeError:
+            raise XRPLRequestFailureException({
+                "error": response.status_code,
+                "error_message": response.text,
+            })
+
+    async def close(self):
+        await self._http.aclose()
+
+
+# Process-wide async client, bound to the event loop that created it
+_async_client = None
+_async_client_loop = None
+_async_client_lock = None
+
+
+async def get_async_client():
+    """
+    Shared async XRPL client for the whole process.
+    http(s) URLs get a pooled JSON-RPC client; ws(s) URLs share one
+    websocket, reopened if it drops.
+    """
+    global _async_client, _async_client_loop, _async_client_lock
+    loop = asyncio.get_running_loop()
+    if _async_client_loop is not loop:
+        # New event loop (worker restart, asyncio.run in scripts): the old pool is unusable
+        _async_client, _async_client_loop, _async_client_lock = None, loop, asyncio.Lock()
+
+    async with _async_client_lock:
+        url = settings.XRPL_NODE_URL
+        if _async_client is None:
+            if url.startswith(("ws://", "wss://")):
+                _async_client = AsyncWebsocketClient(url)
+            else:
+                _async_client = PooledAsyncJsonRpcClient(url)
+        if isinstance(_async_client, AsyncWebsocketClient) and not _async_client.is_open():
+            await _async_client.open()
+    return _async_client
+
+
+async def close_async_client():
+    global _async_client
+    client, _async_client = _async_client, None
+    if client is None:
+        return
+    if isinstance(client, AsyncWebsocketClient):
+        if client.is_open():
+            await client.close()
+    else:
+        await client.close()
+
+
 def get_wallet_from_seed(seed: str = None):
     client = get_client()
     if seed: